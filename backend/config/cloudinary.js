@@ -7,7 +7,9 @@ dotenv.config();
 cloudinary.config({
   cloud_name: process.env.CLOUDINARY_CLOUD_NAME,
   api_key: process.env.CLOUDINARY_API_KEY,
-  api_secret: process.env.CLOUDINARY_API_SECRET
+  api_secret: process.env.CLOUDINARY_API_SECRET,
+  // Load tests point uploads at tests/locust/cloudinary_stub.py instead of api.cloudinary.com
+  ...(process.env.CLOUDINARY_UPLOAD_PREFIX && { upload_prefix: process.env.CLOUDINARY_UPLOAD_PREFIX })
 });
 
 // Export the whole pkg so multer-storage-cloudinary can access .v2
@@ -1,5 +1,6 @@
 import express from 'express';
 import os from 'os';
+import crypto from 'crypto';
 import cors from 'cors';
 import helmet from 'helmet';
 import {rateLimit} from 'express-rate-limit';
@@ -17,6 +18,7 @@ import { borrowRoutes } from './modules/borrowing/index.js';
 import { userRoutes } from './modules/users/index.js';
 import { notificationRoutes } from './modules/notifications/index.js';
 import { scheduleDueDateNotifications } from './shared/utils/cronJobs.js';
+import testRoutes from './shared/utils/testRoutes.js';
 import { 
   metricsEndpoint, 
   rateLimitBlocked, 
@@ -46,8 +48,12 @@ const app = express();
 
 app.use((req, res, next) => {
     const serverName = os.hostname();
+    // Request ID from nginx (or generated) so client-side outliers can be found in these logs
+    const requestId = req.get('X-Request-Id') || crypto.randomUUID();
+    res.setHeader('X-Request-Id', requestId);
+    res.setHeader('X-Served-By', serverName);
     // Dùng console.error để tránh bị buffer (in ra ngay lập tức)
-    console.error(`👉 [${serverName}] Request: ${req.method} ${req.url}`);
+    console.error(`👉 [${serverName}] Request: ${req.method} ${req.url} (${requestId})`);
     next(); 
 });
 
@@ -57,7 +63,7 @@ const PORT = process.env.PORT || 3000;
 app.use(cors({
   origin: process.env.FRONTEND_URL, // domain frontend
   credentials: true,               // cho phep gui cookie
-  exposedHeaders: ['RateLimit', 'RateLimit-Policy', 'Retry-After'], // Expose rate limit headers
+  exposedHeaders: ['RateLimit', 'RateLimit-Policy', 'Retry-After', 'X-Request-Id', 'X-Served-By', 'Server-Timing'], // Expose rate limit + tracing headers
 }));
 
 // Register metrics endpoint BEFORE rate limiter (so it's never rate limited)
@@ -169,11 +175,24 @@ app.use((req, res, next) => {
   const originalSend = res.send;
   const originalJson = res.json;
   
+  // res.json() calls res.send() internally, so guard against recording twice
+  let recorded = false;
   const recordMetrics = function() {
+    if (recorded) return;
+    recorded = true;
+
     const duration = Date.now() - start;
-    const route = req.route?.path || req.path || 'unknown';
+    // Full route template (router mount path + route path), e.g. /books/:id
+    const route = req.route
+      ? (req.baseUrl + req.route.path).replace(/(.)\/$/, '$1')
+      : (req.path || 'unknown');
     const method = req.method;
     const status = res.statusCode;
+
+    // Time spent in Express, for client-side timing breakdowns
+    if (!res.headersSent) {
+      res.setHeader('Server-Timing', `app;dur=${duration}`);
+    }
     
     // Increment HTTP request counters with instance label
     httpRequestsTotal.inc({ 
@@ -268,6 +287,12 @@ app.get('/health', async (req, res) => {
 
 // Prometheus metrics endpoint already registered before rate limiter (see line ~33)
 
+// Load-test only endpoints (seed borrows, trigger background jobs) - never enable in production
+if (process.env.ENABLE_TEST_ENDPOINTS === 'true') {
+  app.use('/test', testRoutes);
+  console.log('⚠️  Test endpoints enabled under /test');
+}
+
 app.use((req, res, next) => {
   res.status(404);
   next(new Error('Route not found'));
@@ -1,54 +1,80 @@
 import cron from 'node-cron';
+import os from 'os';
 import Borrow from '../../modules/borrowing/domain/Borrow.model.js';
 import { notifyDueSoon, notifyOverdue } from './notificationService.js';
+import { cronJobDuration, cronJobNotifications } from './metrics.js';
 
 /**
- * Cron job chạy hàng ngày lúc 9:00 sáng
- * Kiểm tra và gửi thông báo cho:
+ * Quét các borrow đang được mượn và gửi thông báo:
  * - Sách sắp đến hạn (3 ngày trước)
  * - Sách quá hạn
+ * Dùng chung cho cron, kiểm tra thủ công và test endpoint; trả về thống kê lần chạy
+ */
+export const runDueDateCheck = async (trigger = 'cron') => {
+  const startedAt = new Date();
+  const started = process.hrtime.bigint();
+  const now = new Date();
+  const threeDaysFromNow = new Date(now.getTime() + 3 * 24 * 60 * 60 * 1000);
+
+  const borrows = await Borrow.find({
+    status: 'accepted',
+    dueDate: { $exists: true }
+  }).populate('bookId borrowerId');
+
+  let overdueCount = 0;
+  let dueSoonCount = 0;
+
+  for (const borrow of borrows) {
+    const dueDate = new Date(borrow.dueDate);
+
+    // Kiểm tra quá hạn
+    if (dueDate < now) {
+      overdueCount++;
+      await notifyOverdue(
+        borrow.borrowerId._id,
+        borrow.bookId?.title,
+        borrow._id
+      );
+    }
+    // Kiểm tra sắp đến hạn (3 ngày)
+    else if (dueDate <= threeDaysFromNow) {
+      dueSoonCount++;
+      await notifyDueSoon(
+        borrow.borrowerId._id,
+        borrow.bookId?.title,
+        dueDate,
+        borrow._id
+      );
+    }
+  }
+
+  const durationMs = Number(process.hrtime.bigint() - started) / 1e6;
+  cronJobDuration.observe({ job: 'due_date', trigger }, durationMs);
+  cronJobNotifications.inc({ job: 'due_date', type: 'overdue' }, overdueCount);
+  cronJobNotifications.inc({ job: 'due_date', type: 'due_soon' }, dueSoonCount);
+
+  return {
+    trigger,
+    instance: os.hostname(),
+    startedAt: startedAt.toISOString(),
+    durationMs,
+    borrowsScanned: borrows.length,
+    overdue: overdueCount,
+    dueSoon: dueSoonCount
+  };
+};
+
+/**
+ * Cron job chạy hàng ngày lúc 9:00 sáng
  */
 export const scheduleDueDateNotifications = () => {
   // Chạy mỗi ngày lúc 9:00 sáng
   cron.schedule('0 9 * * *', async () => {
     console.log('🔔 Running due date notification check...');
-    
-    try {
-      const now = new Date();
-      const threeDaysFromNow = new Date(now.getTime() + 3 * 24 * 60 * 60 * 1000);
-
 
-      const borrows = await Borrow.find({ 
-        status: 'accepted',
-        dueDate: { $exists: true }
-      }).populate('bookId borrowerId');
-
-      for (const borrow of borrows) {
-        const dueDate = new Date(borrow.dueDate);
-        
-        // Kiểm tra quá hạn
-        if (dueDate < now) {
-          console.log(`📕 Book overdue: ${borrow.bookId?.title}`);
-          await notifyOverdue(
-            borrow.borrowerId._id,
-            borrow.bookId?.title,
-            borrow._id
-          );
-        }
-        // Kiểm tra sắp đến hạn (3 ngày)
-        else if (dueDate <= threeDaysFromNow) {
-          const daysLeft = Math.ceil((dueDate - now) / (1000 * 60 * 60 * 24));
-          console.log(`📙 Book due soon: ${borrow.bookId?.title} (${daysLeft} days)`);
-          await notifyDueSoon(
-            borrow.borrowerId._id,
-            borrow.bookId?.title,
-            dueDate,
-            borrow._id
-          );
-        }
-      }
-
-      console.log('✅ Due date notification check completed');
+    try {
+      const stats = await runDueDateCheck('cron');
+      console.log(`✅ Due date notification check completed (${stats.overdue} overdue, ${stats.dueSoon} due soon, ${Math.round(stats.durationMs)}ms)`);
     } catch (error) {
       console.error('❌ Error in due date notification cron:', error);
     }
@@ -62,43 +88,12 @@ export const scheduleDueDateNotifications = () => {
  */
 export const checkDueDateNotificationsNow = async () => {
   console.log('🔔 Manually checking due date notifications...');
-  
-  try {
-    const now = new Date();
-    const threeDaysFromNow = new Date(now.getTime() + 3 * 24 * 60 * 60 * 1000);
-
-    const borrows = await Borrow.find({ 
-      status: 'accepted',
-      dueDate: { $exists: true }
-    }).populate('bookId borrowerId');
-
-    let overdueCount = 0;
-    let dueSoonCount = 0;
 
-    for (const borrow of borrows) {
-      const dueDate = new Date(borrow.dueDate);
-      
-      if (dueDate < now) {
-        overdueCount++;
-        await notifyOverdue(
-          borrow.borrowerId._id,
-          borrow.bookId?.title,
-          borrow._id
-        );
-      }
-      else if (dueDate <= threeDaysFromNow) {
-        dueSoonCount++;
-        await notifyDueSoon(
-          borrow.borrowerId._id,
-          borrow.bookId?.title,
-          dueDate,
-          borrow._id
-        );
-      }
-    }
-
-    console.log(`✅ Sent ${overdueCount} overdue notifications`);
-    console.log(`✅ Sent ${dueSoonCount} due soon notifications`);
+  try {
+    const stats = await runDueDateCheck('manual');
+    console.log(`✅ Sent ${stats.overdue} overdue notifications`);
+    console.log(`✅ Sent ${stats.dueSoon} due soon notifications`);
+    return stats;
   } catch (error) {
     console.error('❌ Error checking due dates:', error);
   }
@@ -0,0 +1,25 @@
+import nodemailer from "nodemailer";
+
+/**
+ * Transport dùng chung cho mọi email
+ * SMTP_HOST/SMTP_PORT trỏ tới SMTP server nội bộ (vd. tests/locust/smtp_sink.py khi load test),
+ * mặc định gửi qua Gmail
+ */
+export const createMailTransport = () => {
+  if (process.env.SMTP_HOST) {
+    return nodemailer.createTransport({
+      host: process.env.SMTP_HOST,
+      port: parseInt(process.env.SMTP_PORT || "25", 10),
+      secure: false,
+      ignoreTLS: true
+    });
+  }
+
+  return nodemailer.createTransport({
+    service: "gmail",
+    auth: {
+      user: process.env.EMAIL_USER,
+      pass: process.env.EMAIL_PASS
+    }
+  });
+};
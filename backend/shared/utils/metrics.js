@@ -66,6 +66,20 @@ export const cqrsQueryExecuted = new client.Counter({
   labelNames: ['query']
 });
 
+// Background job metrics
+export const cronJobDuration = new client.Histogram({
+  name: 'cron_job_duration_ms',
+  help: 'Background job run duration in milliseconds',
+  labelNames: ['job', 'trigger'],
+  buckets: [100, 500, 1000, 5000, 15000, 60000, 300000]
+});
+
+export const cronJobNotifications = new client.Counter({
+  name: 'cron_job_notifications_total',
+  help: 'Notifications created by background jobs',
+  labelNames: ['job', 'type']
+});
+
 register.registerMetric(httpRequestsTotal);
 register.registerMetric(httpRequestDuration);
 register.registerMetric(cacheHits);
@@ -74,6 +88,8 @@ register.registerMetric(rateLimitBlocked);
 register.registerMetric(rateLimitAllowed);
 register.registerMetric(cqrsCommandExecuted);
 register.registerMetric(cqrsQueryExecuted);
+register.registerMetric(cronJobDuration);
+register.registerMetric(cronJobNotifications);
 
 export function metricsEndpoint(req, res) {
   res.setHeader('Content-Type', register.contentType);
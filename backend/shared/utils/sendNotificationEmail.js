@@ -1,4 +1,4 @@
-import nodemailer from "nodemailer";
+import { createMailTransport } from "./mailTransport.js";
 import User from "../../modules/users/domain/User.model.js";
 
 /**
@@ -13,13 +13,7 @@ export const sendNotificationEmail = async (userId, { type, title, message, book
       return;
     }
 
-    const transporter = nodemailer.createTransport({
-      service: "gmail",
-      auth: {
-        user: process.env.EMAIL_USER,
-        pass: process.env.EMAIL_PASS
-      }
-    });
+    const transporter = createMailTransport();
 
     // Template email dựa trên loại notification
     const emailTemplates = {
@@ -1,13 +1,7 @@
-import nodemailer from "nodemailer";
+import { createMailTransport } from "./mailTransport.js";
 
 export const sendVerifyEmail = async (email, token, userData) => {
-  const transporter = nodemailer.createTransport({
-    service: "gmail",
-    auth: {
-      user: process.env.EMAIL_USER,
-      pass: process.env.EMAIL_PASS
-    }
-  });
+  const transporter = createMailTransport();
 
   // Mã hóa thông tin user
   const userInfo = Buffer.from(JSON.stringify(userData)).toString("base64");
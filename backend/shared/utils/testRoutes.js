@@ -0,0 +1,128 @@
+import { Router } from 'express';
+import validateToken from '../middlewares/validateTokenHandler.js';
+import Book from '../../modules/books/domain/Book.model.js';
+import Borrow from '../../modules/borrowing/domain/Borrow.model.js';
+import Notification from '../../modules/notifications/domain/Notification.model.js';
+import cache from './cache.js';
+import { runDueDateCheck } from './cronJobs.js';
+
+/**
+ * Endpoint chỉ dùng cho load test (tests/locust/cron_interference.py)
+ * Chỉ được mount khi ENABLE_TEST_ENDPOINTS=true, không bật ở production
+ */
+
+const SEED_PREFIX = 'Cron Seed ';
+const DUE_TYPES = ['borrow_due_soon', 'borrow_overdue'];
+const HOUR = 60 * 60 * 1000;
+
+const router = Router();
+router.use(validateToken);
+
+/**
+ * POST /test/borrows/seed - Tạo `count` borrow đang mượn, sắp đến hạn hoặc quá hạn
+ * Người dùng hiện tại vừa là chủ sách vừa là người mượn
+ */
+router.post('/borrows/seed', async (req, res) => {
+  try {
+    const count = Math.min(parseInt(req.body.count || 100, 10), 50000);
+    const overdueShare = Math.min(Math.max(parseFloat(req.body.overdueShare ?? 0.2), 0), 1);
+    if (!(count > 0)) {
+      return res.status(400).json({ message: 'count must be a positive number' });
+    }
+
+    const userId = req.user._id;
+    const batch = Date.now().toString(36);
+    const overdue = Math.round(count * overdueShare);
+    const now = Date.now();
+
+    const books = await Book.insertMany(Array.from({ length: count }, (_, i) => ({
+      title: `${SEED_PREFIX}${batch}-${i + 1}`,
+      authors: ['Cron Seed'],
+      ownerId: userId,
+      available: false
+    })));
+
+    // Quá hạn: 1-48 giờ trước; sắp đến hạn: trải đều trong 3 ngày tới
+    await Borrow.insertMany(books.map((book, i) => ({
+      bookId: book._id,
+      borrowerId: userId,
+      ownerId: userId,
+      status: 'accepted',
+      dueDate: i < overdue
+        ? new Date(now - (1 + (i % 48)) * HOUR)
+        : new Date(now + (1 + ((i - overdue) % 70)) * HOUR)
+    })));
+
+    res.status(201).json({ batch, seeded: count, overdue, dueSoon: count - overdue });
+  } catch (err) {
+    console.error('seedBorrows ERROR:', err);
+    res.status(500).json({ message: 'Server error', error: err.message });
+  }
+});
+
+/**
+ * DELETE /test/borrows/seed - Xoá sách, borrow và notification đã seed của người dùng hiện tại
+ */
+router.delete('/borrows/seed', async (req, res) => {
+  try {
+    const userId = req.user._id;
+    const bookIds = await Book.find({ ownerId: userId, title: { $regex: `^${SEED_PREFIX}` } }).distinct('_id');
+    const borrowIds = await Borrow.find({ bookId: { $in: bookIds } }).distinct('_id');
+
+    const [notifications, borrows, books] = await Promise.all([
+      Notification.deleteMany({ relatedId: { $in: borrowIds } }),
+      Borrow.deleteMany({ _id: { $in: borrowIds } }),
+      Book.deleteMany({ _id: { $in: bookIds } })
+    ]);
+    await cache.delPattern(`notifications:*:${userId}*`);
+
+    res.status(200).json({
+      books: books.deletedCount,
+      borrows: borrows.deletedCount,
+      notifications: notifications.deletedCount
+    });
+  } catch (err) {
+    console.error('clearSeedBorrows ERROR:', err);
+    res.status(500).json({ message: 'Server error', error: err.message });
+  }
+});
+
+/**
+ * POST /test/jobs/due-date - Chạy job kiểm tra hạn trả ngay trên replica này
+ */
+router.post('/jobs/due-date', async (req, res) => {
+  try {
+    const stats = await runDueDateCheck('test');
+    res.status(200).json(stats);
+  } catch (err) {
+    console.error('runDueDateCheck ERROR:', err);
+    res.status(500).json({ message: 'Server error', error: err.message });
+  }
+});
+
+/**
+ * GET /test/jobs/due-date/notifications?since=<ISO> - Notification hạn trả tạo từ `since`, theo borrow
+ * duplicates > 0 nghĩa là nhiều replica cùng gửi cho một borrow
+ */
+router.get('/jobs/due-date/notifications', async (req, res) => {
+  try {
+    const since = new Date(req.query.since || 0);
+    if (isNaN(since.getTime())) {
+      return res.status(400).json({ message: 'Invalid since' });
+    }
+
+    const [result] = await Notification.aggregate([
+      { $match: { type: { $in: DUE_TYPES }, createdAt: { $gte: since } } },
+      { $group: { _id: '$relatedId', count: { $sum: 1 } } },
+      { $group: { _id: null, borrows: { $sum: 1 }, notifications: { $sum: '$count' }, maxPerBorrow: { $max: '$count' } } }
+    ]);
+    const { borrows = 0, notifications = 0, maxPerBorrow = 0 } = result || {};
+
+    res.status(200).json({ borrows, notifications, duplicates: notifications - borrows, maxPerBorrow });
+  } catch (err) {
+    console.error('dueDateNotifications ERROR:', err);
+    res.status(500).json({ message: 'Server error', error: err.message });
+  }
+});
+
+export default router;
@@ -0,0 +1,183 @@
+"""
+Auth Churn Report
+For AuthChurnUser (scenarios.py): relates the latency of ordinary authenticated
+requests to the size of the JWT logout blacklist and to the logout rate.
+
+Every logout blacklists the access token in Redis until the token expires (15 min
+after login), so the live blacklist size at time t is the number of logged-out
+tokens with logout <= t < expiry. Logouts (with the token expiry passed as request
+context) and per-second latency histograms of the '[Auth] ...' API requests are
+merged on the master; at test stop each second is assigned to its blacklist size
+and logout-rate bucket. Other clients logging out are not visible here.
+
+Enabled automatically when AuthChurnUser is in the run; results go to
+LOCUST_AUTH_CHURN_REPORT (default auth-churn-<time>.json).
+"""
+
+import base64
+import json
+import os
+from bisect import bisect_right
+from datetime import datetime
+
+from locust import events
+from locust.runners import WorkerRunner
+
+from histograms import add_sample, from_json, hist_percentile, merge_hist
+
+LIFECYCLE = ('[Auth] Login', '[Auth] Logout', '[Auth] Refresh Token')
+PREFIX = '[Auth] '
+RATE_WINDOW = 10  # seconds over which the logout rate is averaged
+REPORT_PATH = os.getenv('LOCUST_AUTH_CHURN_REPORT')
+
+_state = {'active': False, 'hist': {}, 'logouts': [], 'revoked_hits': 0}
+
+
+def token_expiry(token):
+    """exp claim of a JWT (not verified), or None"""
+    try:
+        payload = token.split('.')[1]
+        return json.loads(base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4)))['exp']
+    except (AttributeError, IndexError, KeyError, ValueError):
+        return None
+
+
+def size_bucket(size):
+    """0, 1-9, 10-99, 100-999, ... as (low, high)"""
+    if size == 0:
+        return 0, 0
+    low = 10 ** (len(str(size)) - 1)
+    return low, low * 10 - 1
+
+
+def enabled(environment):
+    return any(cls.__name__ == 'AuthChurnUser' for cls in environment.user_classes)
+
+
+@events.test_start.add_listener
+def on_test_start(environment, **kwargs):
+    _state.update(active=enabled(environment), hist={}, logouts=[], revoked_hits=0)
+
+
+@events.request.add_listener
+def on_request(request_type, name, response_time, response=None, context=None, exception=None,
+               start_time=None, **kwargs):
+    if not _state['active'] or not name.startswith(PREFIX):
+        return
+    if name == '[Auth] Logout':
+        expiry = (context or {}).get('token_expiry')
+        if not exception and expiry and start_time:
+            _state['logouts'].append((start_time, expiry))
+        return
+    if name in LIFECYCLE or not start_time:
+        return
+    second = int(start_time)
+    add_sample(_state['hist'].setdefault(second, {}), response_time)
+    # Same user logging in twice within a second gets the same JWT, revoked by the first logout
+    if getattr(response, 'status_code', 0) == 401:
+        _state['revoked_hits'] += 1
+
+
+@events.report_to_master.add_listener
+def on_report_to_master(client_id, data):
+    if not _state['active']:
+        return
+    data['auth_churn'] = {
+        'hist': {str(s): h for s, h in _state['hist'].items()},
+        'logouts': _state['logouts'],
+        'revoked_hits': _state['revoked_hits'],
+    }
+    _state.update(hist={}, logouts=[], revoked_hits=0)
+
+
+@events.worker_report.add_listener
+def on_worker_report(client_id, data):
+    report = data.get('auth_churn')
+    if not report:
+        return
+    for second, hist in report['hist'].items():
+        merge_hist(_state['hist'].setdefault(int(second), {}), from_json(hist))
+    _state['logouts'].extend(tuple(entry) for entry in report['logouts'])
+    _state['revoked_hits'] += report['revoked_hits']
+
+
+def bucket_rows(buckets):
+    rows = []
+    for key in sorted(buckets):
+        hist = buckets[key]['hist']
+        rows.append({
+            **buckets[key]['label'],
+            'seconds': buckets[key]['seconds'],
+            'requests': sum(hist.values()),
+            **{f'p{q * 100:g}_ms': hist_percentile(hist, q) for q in (0.5, 0.95, 0.99)},
+        })
+    return rows
+
+
+@events.test_stop.add_listener
+def on_test_stop(environment, **kwargs):
+    if not _state['active'] or isinstance(environment.runner, WorkerRunner):
+        return
+
+    logouts = _state['logouts']
+    logged_out = sorted(ts for ts, _ in logouts)
+    expired = sorted(expiry for _, expiry in logouts)
+
+    def blacklist_size(second):
+        return bisect_right(logged_out, second) - bisect_right(expired, second)
+
+    by_size = {}
+    by_rate = {}
+    for second, hist in sorted(_state['hist'].items()):
+        live = blacklist_size(second)
+        recent = bisect_right(logged_out, second) - bisect_right(logged_out, second - RATE_WINDOW)
+        low, high = size_bucket(live)
+        entry = by_size.setdefault(low, {'label': {'blacklist_min': low, 'blacklist_max': high},
+                                         'seconds': 0, 'hist': {}})
+        entry['seconds'] += 1
+        merge_hist(entry['hist'], hist)
+
+        rate_low = int(recent / RATE_WINDOW)  # 1 logout/s wide buckets
+        entry = by_rate.setdefault(rate_low, {'label': {'logouts_per_s_min': rate_low}, 'seconds': 0, 'hist': {}})
+        entry['seconds'] += 1
+        merge_hist(entry['hist'], hist)
+
+    lifecycle = {}
+    for name in LIFECYCLE:
+        entry = environment.stats.entries.get((name, 'GET')) or environment.stats.entries.get((name, 'POST'))
+        if entry and entry.num_requests:
+            lifecycle[name] = {
+                'requests': entry.num_requests,
+                'failures': entry.num_failures,
+                **{f'p{q * 100:g}_ms': entry.get_response_time_percentile(q) for q in (0.5, 0.95, 0.99)},
+            }
+
+    report = {
+        'logouts': len(logouts),
+        'peak_blacklist_size': max((blacklist_size(s) for s in _state['hist']), default=0),
+        'revoked_token_hits': _state['revoked_hits'],
+        'by_blacklist_size': bucket_rows(by_size),
+        'by_logout_rate': bucket_rows(by_rate),
+        'lifecycle': lifecycle,
+    }
+
+    print(f"\n🔐 Auth Churn ({len(logouts)} logouts, peak blacklist ~{report['peak_blacklist_size']} tokens):")
+    print(f"  {'Blacklist size':<18}{'seconds':>9}{'requests':>10}{'p50':>7}{'p95':>7}{'p99':>7}")
+    for r in report['by_blacklist_size']:
+        label = f"{r['blacklist_min']}-{r['blacklist_max']}" if r['blacklist_max'] else '0'
+        print(f"  {label:<18}{r['seconds']:>9}{r['requests']:>10}"
+              + ''.join(f"{r[k] if r[k] is not None else '-':>7}" for k in ('p50_ms', 'p95_ms', 'p99_ms')))
+    print(f"  {'Logouts/s':<18}")
+    for r in report['by_logout_rate']:
+        print(f"  {str(r['logouts_per_s_min']) + '+':<18}{r['seconds']:>9}{r['requests']:>10}"
+              + ''.join(f"{r[k] if r[k] is not None else '-':>7}" for k in ('p50_ms', 'p95_ms', 'p99_ms')))
+    for name, stats in lifecycle.items():
+        print(f"  {name}: {stats['requests']} requests, p50 {stats['p50_ms']:.0f}ms, p95 {stats['p95_ms']:.0f}ms")
+    if _state['revoked_hits']:
+        print(f"  ⚠️  {_state['revoked_hits']} requests hit an already-revoked token "
+              "(same account logging in twice within a second); use LOCUST_AUTH_ACCOUNTS")
+
+    path = REPORT_PATH or f"auth-churn-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"  Report: {path}")
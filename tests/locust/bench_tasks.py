@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Per-Task Client Overhead Benchmark
+Runs each UserBehavior task from locustfile.py in isolation against a local stand-in
+server (mock_backend.py) and reports the load generator's own cost per invocation:
+client CPU microseconds, wall time and allocated bytes. Results are appended to a
+history file so harness changes that cut achievable load show up across revisions.
+
+Usage:
+python bench_tasks.py
+python bench_tasks.py --tasks list_books,view_book_by_id -n 500
+python bench_tasks.py --host http://localhost:3000 --fail-threshold 0.15
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import locust
+from locust.env import Environment
+
+import locustfile
+from common import print_header, start_stand_in
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_HISTORY = os.path.join(HERE, 'bench_history.jsonl')
+
+
+def git_revision():
+    """Short HEAD hash, suffixed with -dirty when the harness has local changes"""
+    try:
+        rev = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=HERE,
+                             capture_output=True, text=True, timeout=5).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--', '.'], cwd=HERE,
+                               capture_output=True, text=True, timeout=5).stdout.strip()
+        return f"{rev}-dirty" if rev and dirty else (rev or 'unknown')
+    except (OSError, subprocess.TimeoutExpired):
+        return 'unknown'
+
+
+def task_functions():
+    """UserBehavior tasks in declaration order, one entry per function"""
+    return {
+        name: fn for name, fn in vars(locustfile.UserBehavior).items()
+        if callable(fn) and hasattr(fn, 'locust_task_weight')
+    }
+
+
+def login(user, email):
+    """Log a bench user in; returns its Authorization headers (empty on failure)"""
+    resp = user.client.post('/auth/login', json={
+        'email': email,
+        'password': locustfile.TEST_PASSWORD or 'bench',
+    }, name='[Auth] Login')
+    token = resp.json().get('accessToken') if resp.status_code == 200 else None
+    return {'Authorization': f'Bearer {token}'} if token else {}
+
+
+def make_taskset(host):
+    """Logged-in UserBehavior instance without on_start's randomized sleeps"""
+    user_class = type('BenchUser', (locustfile.WebsiteUser,), {'host': host})
+    env = Environment(user_classes=[user_class], host=host)
+    user = user_class(env)
+    taskset = locustfile.UserBehavior(user)
+    taskset.auth_headers = login(user, locustfile.TEST_EMAIL or 'locust-bench@example.com')
+    taskset.token = taskset.auth_headers.get('Authorization', '').removeprefix('Bearer ') or None
+
+    requests_seen = [0]
+
+    def on_request(**kwargs):
+        requests_seen[0] += 1
+
+    env.events.request.add_listener(on_request)
+    return taskset, requests_seen
+
+
+def seed_borrows(taskset, count):
+    """Borrows the bench user can act on, made with a second account
+
+    approve_borrow needs pending requests for the bench user's books, return_book
+    accepted borrows of someone else's books; a single account can produce neither.
+    """
+    bench = taskset.user
+    lender = type(bench)(bench.environment)
+    lender_headers = login(lender, 'locust-bench-lender@example.com')
+    if not lender_headers:
+        return None
+
+    def create(user, headers, title):
+        resp = user.client.post('/books', json={'title': title, 'authors': 'Bench'}, headers=headers,
+                                name='[Bench] Seed Book')
+        return resp.json().get('_id') if resp.status_code == 201 else None
+
+    def request(user, headers, book_id):
+        resp = user.client.post('/borrows', json={'bookId': book_id, 'dueDate': 7}, headers=headers,
+                                name='[Bench] Seed Borrow')
+        return resp.json()['borrow']['_id'] if resp.status_code == 201 else None
+
+    fixtures = {'approve_borrow': [], 'return_book': []}
+    for i in range(count):
+        book_id = create(bench, taskset.auth_headers, f'Bench Own {i}')
+        borrow_id = book_id and request(lender, lender_headers, book_id)
+        if borrow_id:
+            fixtures['approve_borrow'].append(borrow_id)
+
+        book_id = create(lender, lender_headers, f'Bench Lent {i}')
+        borrow_id = book_id and request(bench, taskset.auth_headers, book_id)
+        if borrow_id and lender.client.put(f'/borrows/{borrow_id}/accept', headers=lender_headers,
+                                           name='[Bench] Seed Accept').status_code == 200:
+            fixtures['return_book'].append(borrow_id)
+    return fixtures
+
+
+def invoke(fn, taskset):
+    """Run one task invocation; returns the exception it raised, if any"""
+    try:
+        fn(taskset)
+        return None
+    except Exception as e:
+        return e
+
+
+def bench_task(name, fn, taskset, requests_seen, invocations, warmup):
+    """Measure one task: CPU/wall pass first, allocation pass second (tracemalloc is slow)"""
+    errors = []
+    for _ in range(warmup):
+        errors.append(invoke(fn, taskset))
+
+    requests_seen[0] = 0
+    cpu_start = time.process_time_ns()
+    wall_start = time.perf_counter_ns()
+    for _ in range(invocations):
+        errors.append(invoke(fn, taskset))
+    wall_ns = time.perf_counter_ns() - wall_start
+    cpu_ns = time.process_time_ns() - cpu_start
+    requests = requests_seen[0]
+
+    alloc_runs = max(1, invocations // 5)
+    peak_total = 0
+    retained_total = 0
+    tracemalloc.start()
+    try:
+        for _ in range(alloc_runs):
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            errors.append(invoke(fn, taskset))
+            after, peak = tracemalloc.get_traced_memory()
+            peak_total += peak - before
+            retained_total += after - before
+    finally:
+        tracemalloc.stop()
+
+    errors = [e for e in errors if e is not None]
+    return {
+        'task': name,
+        'invocations': invocations,
+        'requests_per_invocation': round(requests / invocations, 3),
+        'cpu_us': round(cpu_ns / invocations / 1000, 2),
+        'wall_us': round(wall_ns / invocations / 1000, 2),
+        'cpu_us_per_request': round(cpu_ns / requests / 1000, 2) if requests else None,
+        'alloc_peak_bytes': peak_total // alloc_runs,
+        'alloc_retained_bytes': retained_total // alloc_runs,
+        'errors': len(errors),
+        'error': f'{type(errors[0]).__name__}: {errors[0]}' if errors else None,
+    }
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def previous_result(history, task, revision):
+    """Latest recorded result for task from a different revision"""
+    for record in reversed(history):
+        if record['task'] == task and record['revision'] != revision:
+            return record
+    return None
+
+
+def report(results, history, revision, threshold):
+    print_header(f"Per-Task Client Overhead ({revision})")
+    print(f"{'Task':<26}{'req/inv':>8}{'CPU µs':>10}{'wall µs':>10}{'peak B':>10}"
+          f"{'kept B':>9}{'err':>5}{'Δ CPU':>9}")
+
+    regressions = []
+    for r in results:
+        prev = previous_result(history, r['task'], revision)
+        delta = ''
+        if prev and prev['cpu_us']:
+            change = (r['cpu_us'] - prev['cpu_us']) / prev['cpu_us']
+            delta = f"{change:+.1%}"
+            if threshold is not None and change > threshold:
+                regressions.append((r['task'], prev['revision'], change))
+        print(f"{r['task']:<26}{r['requests_per_invocation']:>8}{r['cpu_us']:>10.1f}{r['wall_us']:>10.1f}"
+              f"{r['alloc_peak_bytes']:>10}{r['alloc_retained_bytes']:>9}{r['errors']:>5}{delta:>9}")
+
+    for r in results:
+        if r['errors']:
+            print(f"❌ {r['task']} raised {r['error']} ({r['errors']} times); its cost is not the full task")
+        elif not r['requests_per_invocation']:
+            print(f"❌ {r['task']} sent no requests; it returned before doing its work")
+
+    for task, rev, change in regressions:
+        print(f"❌ {task}: client CPU {change:+.1%} vs {rev}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark per-task client overhead of UserBehavior')
+    parser.add_argument('--host', help='Use an already running server instead of starting mock_backend.py')
+    parser.add_argument('--tasks', help='Comma-separated task names (default: all)')
+    parser.add_argument('-n', '--invocations', type=int, default=300)
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--notifications', type=int, default=20,
+                        help='Notifications seeded on the stand-in for the notification tasks')
+    parser.add_argument('--fixture-borrows', type=int, default=50,
+                        help='Borrows seeded for each of approve_borrow and return_book')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--history', default=DEFAULT_HISTORY)
+    parser.add_argument('--no-save', action='store_true', help='Do not append results to the history file')
+    parser.add_argument('--fail-threshold', type=float, default=None,
+                        help='Exit 1 if any task CPU/invocation grew by more than this fraction')
+    args = parser.parse_args()
+
+    tasks = task_functions()
+    if args.tasks:
+        wanted = [t.strip() for t in args.tasks.split(',') if t.strip()]
+        unknown = [t for t in wanted if t not in tasks]
+        if unknown:
+            print(f"❌ Unknown tasks: {', '.join(unknown)}")
+            print(f"ℹ️  Available: {', '.join(tasks)}")
+            return 2
+        tasks = {t: tasks[t] for t in wanted}
+
+    proc = None
+    host = args.host
+    if not host:
+        # Separate process so the server's CPU is not charged to the client
+        proc, host = start_stand_in('--notifications', str(args.notifications), '--seed', '1')
+        print(f"🚀 Stand-in server on {host}")
+
+    revision = git_revision()
+    try:
+        random.seed(args.seed)
+        taskset, requests_seen = make_taskset(host)
+        if not taskset.auth_headers:
+            print("❌ Login against the stand-in failed")
+            return 1
+
+        fixtures = seed_borrows(taskset, args.fixture_borrows)
+        if not fixtures or not all(fixtures.values()):
+            print("❌ Could not seed borrows for approve_borrow/return_book")
+            return 1
+
+        results = []
+        for name, fn in tasks.items():
+            if name in fixtures:
+                locustfile.created_borrows = list(fixtures[name])
+            results.append(bench_task(name, fn, taskset, requests_seen, args.invocations, args.warmup))
+    finally:
+        if proc:
+            proc.terminate()
+            proc.wait(timeout=5)
+
+    history = load_history(args.history)
+    regressions = report(results, history, revision, args.fail_threshold)
+    errored = any(r['errors'] or not r['requests_per_invocation'] for r in results)
+
+    if errored:
+        print("\n❌ Results not recorded: fix the failing tasks first")
+    elif not args.no_save:
+        stamp = datetime.now().isoformat(timespec='seconds')
+        env_info = {'python': platform.python_version(), 'locust': locust.__version__}
+        with open(args.history, 'a') as f:
+            for r in results:
+                f.write(json.dumps({'timestamp': stamp, 'revision': revision, **env_info, **r}) + '\n')
+        print(f"\n✅ Results appended to {args.history}")
+
+    return 1 if regressions or errored else 0
+
+
+if __name__ == '__main__':
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        print("\n\nBenchmark interrupted by user")
+        sys.exit(130)
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Connection Churn Comparison
+Runs the same scenario once per connection policy (see connection_policy.py) and
+reports the throughput and latency penalty of churn against the first policy,
+together with the TCP connections nginx accepted per request (from /nginx-status).
+
+Runs are sequential so they do not compete for the system under test; --cooldown
+leaves time for TIME_WAIT sockets and backend caches to settle in between.
+
+Note: nginx opens a new upstream connection per proxied request in this setup (no
+upstream keepalive), so the difference measured here is client <-> nginx setup cost.
+
+Usage:
+python churn_compare.py MixUser
+python churn_compare.py PageLoadUser --policies persistent,pooled:10,per-request -u 100 -t 3m
+"""
+
+import argparse
+import csv
+import os
+import re
+import sys
+import time
+from datetime import datetime
+
+import requests
+
+from common import print_header
+from connection_policy import parse_policy
+from sweep import DEFAULT_HOST, HERE, read_aggregate, run_headless
+
+STUB_STATUS = re.compile(r'server accepts handled requests\s+(\d+)\s+(\d+)\s+(\d+)')
+
+
+def nginx_counters(host):
+    """(accepts, requests) from nginx stub_status, or None when unavailable"""
+    try:
+        resp = requests.get(f'{host.rstrip("/")}/nginx-status', timeout=5)
+    except requests.exceptions.RequestException:
+        return None
+    m = STUB_STATUS.search(resp.text) if resp.status_code == 200 else None
+    return (int(m.group(1)), int(m.group(3))) if m else None
+
+
+def run_policy(policy, args, out_dir):
+    tag = policy.replace(':', '-')
+    prefix = os.path.join(out_dir, tag)
+    before = nginx_counters(args.host)
+    started = time.time()
+    code = run_headless(args.user_class, prefix, args.users, args.spawn_rate, args.run_time, args.host,
+                        env={'LOCUST_CONNECTION_POLICY': policy}, locustfile=args.locustfile)
+    after = nginx_counters(args.host)
+    stats = read_aggregate(prefix)
+    print(f"{'✅' if stats else '❌'} {policy} (exit {code}, {time.time() - started:.0f}s)")
+
+    result = {'policy': policy, 'exit_code': code, **(stats or {})}
+    if before and after and after[1] > before[1]:
+        result['nginx_connections'] = after[0] - before[0]
+        result['nginx_requests'] = after[1] - before[1]
+        result['connections_per_request'] = result['nginx_connections'] / result['nginx_requests']
+    return result
+
+
+def print_comparison(results):
+    print_header("Connection churn penalty (vs first policy)")
+    print(f"{'Policy':<16}{'req/s':>9}{'p50':>8}{'p95':>8}{'p99':>8}{'fail%':>8}{'conn/req':>10}"
+          f"{'Δreq/s':>9}{'Δp95':>8}")
+    baseline = next((r for r in results if 'rps' in r), None)
+    for r in results:
+        if 'rps' not in r:
+            print(f"{r['policy']:<16}failed (exit {r['exit_code']})")
+            continue
+        conn = r.get('connections_per_request')
+        d_rps = (r['rps'] / baseline['rps'] - 1) * 100 if baseline['rps'] else 0
+        d_p95 = r['p95_ms'] - baseline['p95_ms']
+        print(f"{r['policy']:<16}{r['rps']:>9.1f}{r['p50_ms']:>8.0f}{r['p95_ms']:>8.0f}{r['p99_ms']:>8.0f}"
+              f"{r['failure_rate'] * 100:>8.2f}{'-' if conn is None else f'{conn:.2f}':>10}"
+              f"{d_rps:>+8.1f}%{d_p95:>+8.0f}")
+    print("\nLatencies in ms; conn/req = TCP connections accepted by nginx per request (incl. other clients)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare connection policies on the same workload')
+    parser.add_argument('user_class', help='User class from the locustfile, e.g. MixUser')
+    parser.add_argument('--policies', default='persistent,pooled:30,per-request',
+                        help='Comma-separated policies; the first is the baseline')
+    parser.add_argument('-f', '--locustfile', default='scenarios.py')
+    parser.add_argument('-u', '--users', type=int, default=50)
+    parser.add_argument('-r', '--spawn-rate', type=float, default=10)
+    parser.add_argument('-t', '--run-time', default='2m')
+    parser.add_argument('--cooldown', type=float, default=15, help='Seconds between runs')
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--out', default=None, help='Output directory (default: churn-results/<timestamp>)')
+    args = parser.parse_args()
+
+    policies = [p.strip() for p in args.policies.split(',') if p.strip()]
+    try:
+        for policy in policies:
+            parse_policy(policy)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 2
+
+    out_dir = args.out or os.path.join(HERE, 'churn-results', datetime.now().strftime('%Y%m%d-%H%M%S'))
+    os.makedirs(out_dir, exist_ok=True)
+    if nginx_counters(args.host) is None:
+        print(f"ℹ️  {args.host}/nginx-status not reachable: connection counts will be missing")
+
+    print_header(f"Connection churn: {args.user_class} x {len(policies)} policies, {args.run_time} each")
+    results = []
+    for i, policy in enumerate(policies):
+        if i:
+            time.sleep(args.cooldown)
+        results.append(run_policy(policy, args, out_dir))
+
+    fields = ['policy', 'exit_code', 'requests', 'failures', 'failure_rate', 'rps', 'avg_ms', 'p50_ms',
+              'p95_ms', 'p99_ms', 'nginx_connections', 'nginx_requests', 'connections_per_request']
+    path = os.path.join(out_dir, 'comparison.csv')
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fields, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(results)
+
+    print_comparison(results)
+    print(f"\n✅ Comparison written to {path}")
+    return 0 if all('rps' in r for r in results) else 1
+
+
+if __name__ == '__main__':
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        print("\n\nChurn comparison interrupted by user")
+        sys.exit(130)
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Cloudinary Stand-in for Upload Load Tests
+Accepts the Cloudinary upload API calls the backend makes for book thumbnails
+(POST /v1_1/<cloud>/image/upload, multipart, often chunked) and answers with an
+upload result of the same shape, so the multipart upload path can be load tested
+without a Cloudinary account, quota or network. Uploaded bytes are counted and
+discarded.
+
+Point the backend at it with CLOUDINARY_UPLOAD_PREFIX (backend/config/cloudinary.js);
+the SDK still needs some CLOUDINARY_CLOUD_NAME / API_KEY / API_SECRET, any value works.
+GET /stats returns upload counters for the thumbnail upload report.
+
+Usage:
+python cloudinary_stub.py --port 8090
+python cloudinary_stub.py --latency lognormal:120:0.5 --error-rate 0.01
+docker compose --profile loadtest up -d cloudinary-stub
+"""
+
+import argparse
+import asyncio
+import random
+import re
+import secrets
+import struct
+import sys
+import time
+
+from common import parse_latency
+from mock_backend import HttpServer, iso_now
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+
+def multipart_file(body, content_type):
+    """(filename, bytes) of the first file part of a multipart/form-data body, or None"""
+    m = re.search(r'boundary="?([^";]+)"?', content_type)
+    if not m:
+        return None
+    for part in body.split(b'--' + m.group(1).encode()):
+        head, sep, value = part.partition(b'\r\n\r\n')
+        name = re.search(rb'filename="([^"]*)"', head) if sep else None
+        if name:
+            return name.group(1).decode('utf-8', 'replace'), value[:-2] if value.endswith(b'\r\n') else value
+    return None
+
+
+def image_size(data):
+    """(width, height) from a PNG header, or (0, 0)"""
+    if data[:8] == PNG_SIGNATURE and len(data) >= 24:
+        return struct.unpack('>II', data[16:24])
+    return 0, 0
+
+
+class CloudinaryStub(HttpServer):
+    """Upload endpoint with latency and error injection; nothing is stored"""
+
+    def __init__(self, public_url, latency='none', error_rate=0.0, seed=None):
+        super().__init__()
+        self.public_url = public_url.rstrip('/')
+        self.latency = parse_latency(latency)
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.started_at = time.time()
+        self.uploads = 0
+        self.upload_bytes = 0
+        self.errors = 0
+        self.add_route('POST', '/v1_1/:cloud/:resource/upload', self.upload)
+        self.add_route('GET', '/stats', self.stats)
+
+    async def upload(self, req):
+        delay = self.latency(self.rng)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000.0)
+        if self.error_rate and self.rng.random() < self.error_rate:
+            self.errors += 1
+            return 500, {'error': {'message': 'Injected failure'}}, {}
+
+        found = multipart_file(req.body, req.headers.get('content-type', ''))
+        if found is None:
+            self.errors += 1
+            return 400, {'error': {'message': 'Missing required parameter - file'}}, {}
+        _, data = found
+        self.uploads += 1
+        self.upload_bytes += len(data)
+
+        cloud, resource = req.params['cloud'], req.params['resource']
+        public_id = f'book_thumbnails/{secrets.token_hex(10)}'
+        version = int(time.time())
+        width, height = image_size(data)
+        url = f'{self.public_url}/{cloud}/{resource}/upload/v{version}/{public_id}.png'
+        return 200, {
+            'asset_id': secrets.token_hex(16),
+            'public_id': public_id,
+            'version': version,
+            'signature': secrets.token_hex(20),
+            'width': width,
+            'height': height,
+            'format': 'png',
+            'resource_type': resource,
+            'created_at': iso_now(),
+            'bytes': len(data),
+            'type': 'upload',
+            'url': url,
+            'secure_url': url,
+        }, {}
+
+    async def stats(self, req):
+        return 200, {
+            'uploads': self.uploads,
+            'bytes': self.upload_bytes,
+            'errors': self.errors,
+            'uptime': time.time() - self.started_at,
+        }, {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cloudinary upload API stand-in for load tests')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--public-url', default=None, help='Base of returned image URLs (default: own address)')
+    parser.add_argument('--latency', default='none',
+                        help='Upload latency: none | constant:MS | uniform:LO:HI | exponential:MEAN | '
+                             'lognormal:MEDIAN:SIGMA')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of uploads failing (0-1)')
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    try:
+        app = CloudinaryStub(args.public_url or f'http://{args.host}:{args.port}', latency=args.latency,
+                             error_rate=args.error_rate, seed=args.seed)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 2
+
+    print(f"☁️  Cloudinary stub listening on http://{args.host}:{args.port}")
+    print(f"   Latency: {args.latency}  Errors: {args.error_rate:.1%}")
+    asyncio.run(app.serve(args.host, args.port))
+    return 0
+
+
+if __name__ == '__main__':
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        print("\n\nCloudinary stub stopped")
+        sys.exit(130)
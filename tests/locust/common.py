@@ -0,0 +1,78 @@
+"""
+Shared Harness Helpers
+Small helpers used by several command-line scripts and Locust modules. Standard
+library only, so offline tools (journey fitting, mock backend, stubs) can import
+them without Locust installed.
+"""
+
+import math
+import os
+import re
+import socket
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+OBJECT_ID_SEGMENT = re.compile(r'/[0-9a-fA-F]{24}(?=/|$)')
+
+
+def print_header(text):
+    """Print formatted header"""
+    print(f"\n{'='*60}")
+    print(f"  {text}")
+    print(f"{'='*60}\n")
+
+
+def route_template(url):
+    """Backend-style route template for a request URL: /books/<id>?x=1 -> /books/:id"""
+    path = OBJECT_ID_SEGMENT.sub('/:id', urlsplit(url).path)
+    return path.rstrip('/') or '/'
+
+
+def parse_latency(spec):
+    """Parse a latency spec into a sampler returning milliseconds
+
+    none | constant:MS | uniform:LO:HI | exponential:MEAN | lognormal:MEDIAN:SIGMA
+    """
+    kind, _, rest = spec.partition(':')
+    args = [float(a) for a in rest.split(':')] if rest else []
+
+    if kind in ('none', '0'):
+        return lambda rng: 0.0
+    if kind == 'constant' and len(args) == 1:
+        return lambda rng: args[0]
+    if kind == 'uniform' and len(args) == 2:
+        return lambda rng: rng.uniform(args[0], args[1])
+    if kind == 'exponential' and len(args) == 1:
+        return lambda rng: rng.expovariate(1.0 / args[0]) if args[0] > 0 else 0.0
+    if kind == 'lognormal' and len(args) == 2:
+        mu = math.log(args[0]) if args[0] > 0 else 0.0
+        return lambda rng: rng.lognormvariate(mu, args[1])
+
+    raise ValueError(f"Invalid latency spec '{spec}'")
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_stand_in(*args):
+    """Start mock_backend.py (extra CLI args) in a separate process; returns (process, base URL)"""
+    port = free_port()
+    proc = subprocess.Popen(
+        [sys.executable, os.path.join(HERE, 'mock_backend.py'), '--port', str(port), *args],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 10
+    while time.time() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+            return proc, f'http://127.0.0.1:{port}'
+        except OSError:
+            time.sleep(0.05)
+    proc.kill()
+    raise RuntimeError('Stand-in server did not start')
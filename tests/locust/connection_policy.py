@@ -0,0 +1,80 @@
+"""
+Connection Policy
+How a user's HTTP connections are reused:
+  persistent        one keep-alive connection per user (Locust default)
+  per-request       'Connection: close' on every request, so each one opens a new TCP connection
+  pooled:<seconds>  keep-alive, but a connection is closed once it is older than <seconds>
+
+Set LOCUST_CONNECTION_POLICY for the run, or connection_policy on a user class to fix
+it per scenario. Closing is requested with 'Connection: close', which both the requests
+and geventhttpclient sessions honour; FastHttpUser pools with several connections
+recycle one of them per lifetime.
+
+Compare policies on the same workload with churn_compare.py.
+"""
+
+import os
+import time
+
+from locust import events
+from locust.runners import WorkerRunner
+
+POLICY = os.getenv('LOCUST_CONNECTION_POLICY', 'persistent')
+
+
+def parse_policy(spec):
+    """'persistent' | 'per-request' | 'pooled:<seconds>' -> (kind, lifetime)"""
+    kind, _, rest = spec.strip().partition(':')
+    if kind in ('persistent', 'per-request') and not rest:
+        return kind, None
+    if kind == 'pooled':
+        try:
+            lifetime = float(rest)
+        except ValueError:
+            lifetime = 0
+        if lifetime > 0:
+            return kind, lifetime
+    raise ValueError(f"Invalid connection policy '{spec}' (persistent, per-request or pooled:<seconds>)")
+
+
+DEFAULT_POLICY = parse_policy(POLICY)
+
+
+class ConnectionPolicyUser:
+    """Mixin applying the connection policy to every request of self.client"""
+
+    connection_policy = None  # Overrides LOCUST_CONNECTION_POLICY for this user class
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        kind, lifetime = parse_policy(self.connection_policy) if self.connection_policy else DEFAULT_POLICY
+        if kind == 'persistent':
+            return
+        self.connection_opened = None
+        send = self.client.request
+
+        def request(method, url, **kw):
+            if self.close_connection(kind, lifetime):
+                kw['headers'] = {**(kw.get('headers') or {}), 'Connection': 'close'}
+            return send(method, url, **kw)
+
+        # get()/post()/... of both session types go through self.request
+        self.client.request = request
+
+    def close_connection(self, kind, lifetime):
+        if kind == 'per-request':
+            return True
+        now = time.monotonic()
+        if self.connection_opened is None:
+            self.connection_opened = now
+            return False
+        if now - self.connection_opened >= lifetime:
+            self.connection_opened = None  # The next request opens a fresh connection
+            return True
+        return False
+
+
+@events.test_start.add_listener
+def on_test_start(environment, **kwargs):
+    if POLICY != 'persistent' and not isinstance(environment.runner, WorkerRunner):
+        print(f"🔌 Connection policy: {POLICY}")
@@ -0,0 +1,297 @@
+"""
+Background-Job Interference Benchmark
+Measures what the due-date notification job (backend/shared/utils/cronJobs.js) does to
+foreground traffic. The job is scheduled at 09:00 on every replica, so here it is run
+on every replica at once through the backend's test endpoints (ENABLE_TEST_ENDPOINTS=true)
+while any scenario keeps generating load:
+
+  1. wait LOCUST_CRON_WARMUP seconds after spawning completes
+  2. for each count in LOCUST_CRON_BORROWS: seed that many near-due/overdue borrows,
+     trigger the job on all LOCUST_CRON_TARGETS concurrently, count the notifications
+     (and, with smtp_sink.py, the emails) it produced, remove the seed data and leave
+     LOCUST_CRON_GAP seconds of undisturbed baseline
+
+Foreground latency is kept per second (merged from workers) and compared between job
+windows and the baseline seconds outside any seed/job/settle/cleanup window. Job
+duration is reported per replica against the borrows it scanned; notifications per
+borrow above one are duplicate work by the replicas.
+
+Environment:
+  LOCUST_CRON_INTERFERENCE=1       enable
+  LOCUST_CRON_BORROWS              borrow counts, one job run each (default 100,1000,5000)
+  LOCUST_CRON_OVERDUE_SHARE        share of seeded borrows already overdue (default 0.2)
+  LOCUST_CRON_WARMUP / _GAP        seconds                              (default 60 / 60)
+  LOCUST_CRON_TARGETS              replica base URLs (default: the metrics targets)
+  LOCUST_SMTP_SINK                 smtp_sink.py stats URL (default http://smtp-sink:8025)
+  LOCUST_CRON_REPORT               JSON report path (default cron-interference-<time>.json)
+
+Usage:
+ENABLE_TEST_ENDPOINTS=true SMTP_HOST=smtp-sink SMTP_PORT=2525 docker compose --profile loadtest up -d
+LOCUST_CRON_INTERFERENCE=1 locust -f scenarios.py ReadHeavyUser --headless -u 100 -r 10 -t 20m
+"""
+
+import json
+import os
+import time
+from datetime import datetime, timezone
+
+import gevent
+import requests
+from locust import events
+from locust.runners import WorkerRunner
+
+import run_report
+from histograms import add_sample, from_json, hist_percentile, merge_hist
+from prom_metrics import METRICS_TARGETS
+
+ENABLED = os.getenv('LOCUST_CRON_INTERFERENCE', '').lower() in ('1', 'true', 'yes')
+BORROW_COUNTS = [int(c) for c in os.getenv('LOCUST_CRON_BORROWS', '100,1000,5000').split(',') if c.strip()]
+OVERDUE_SHARE = float(os.getenv('LOCUST_CRON_OVERDUE_SHARE', 0.2))
+WARMUP = float(os.getenv('LOCUST_CRON_WARMUP', 60))
+GAP = float(os.getenv('LOCUST_CRON_GAP', 60))
+TARGETS = [
+    t.strip() for t in os.getenv(
+        'LOCUST_CRON_TARGETS', ','.join(t.rsplit('/metrics', 1)[0] for t in METRICS_TARGETS)
+    ).split(',') if t.strip()
+]
+SMTP_SINK = os.getenv('LOCUST_SMTP_SINK', 'http://smtp-sink:8025')
+REPORT_PATH = os.getenv('LOCUST_CRON_REPORT')
+TEST_EMAIL = os.getenv('LOCUST_USER_EMAIL', 'locust-test@example.com')
+TEST_PASSWORD = os.getenv('LOCUST_USER_PASSWORD', '12345678')
+EMAIL_SETTLE = 5  # seconds for fire-and-forget emails to reach the sink
+QUANTILES = (0.95, 0.99)
+
+_state = {'runner': None, 'host': None, 'hist': {}, 'runs': [], 'busy': [], 'started': None, 'error': None}
+
+
+# ==================== DRIVER (master / local runner) ====================
+
+class JobDriver:
+    """Seeds borrows and triggers the job on every replica, outside Locust's stats"""
+
+    def __init__(self, host):
+        self.host = host.rstrip('/')
+        self.session = requests.Session()
+
+    def login(self):
+        resp = self.session.post(f'{self.host}/auth/login', json={'email': TEST_EMAIL, 'password': TEST_PASSWORD},
+                                 timeout=30)
+        resp.raise_for_status()
+        self.session.headers['Authorization'] = f"Bearer {resp.json()['accessToken']}"
+
+    def seed(self, count):
+        resp = self.session.post(f'{self.host}/test/borrows/seed', json={'count': count, 'overdueShare': OVERDUE_SHARE},
+                                 timeout=600)
+        resp.raise_for_status()
+        return resp.json()
+
+    def clear(self):
+        resp = self.session.delete(f'{self.host}/test/borrows/seed', timeout=600)
+        resp.raise_for_status()
+        return resp.json()
+
+    def trigger(self, target):
+        started = time.time()
+        try:
+            resp = self.session.post(f'{target.rstrip("/")}/test/jobs/due-date', timeout=1800)
+            result = resp.json() if resp.status_code == 200 else {'error': f'HTTP {resp.status_code}'}
+        except (requests.exceptions.RequestException, ValueError) as e:
+            result = {'error': str(e)}
+        return {'target': target, 'client_ms': (time.time() - started) * 1000, **result}
+
+    def notifications(self, since):
+        resp = self.session.get(f'{self.host}/test/jobs/due-date/notifications', params={'since': since}, timeout=60)
+        return resp.json() if resp.status_code == 200 else None
+
+    def sink(self, path, method='GET'):
+        try:
+            resp = requests.request(method, f'{SMTP_SINK.rstrip("/")}/{path}', timeout=5)
+        except requests.exceptions.RequestException:
+            return None
+        return resp.json() if resp.status_code == 200 else None
+
+
+def busy(kind, start, end):
+    _state['busy'].append((start, end, kind))
+
+
+def run_jobs(host):
+    gevent.sleep(WARMUP)
+    driver = JobDriver(host)
+    try:
+        driver.login()
+        driver.clear()  # Leftovers of an interrupted run
+    except requests.exceptions.RequestException as e:
+        _state['error'] = f'Setup failed (are test endpoints enabled?): {e}'
+        print(f"❌ Cron interference: {_state['error']}")
+        return
+
+    for count in BORROW_COUNTS:
+        try:
+            start = time.time()
+            seeded = driver.seed(count)
+            busy('seed', start, time.time())
+
+            driver.sink('reset', 'POST')
+            since = datetime.now(timezone.utc).isoformat()
+            run_report.mark(f'due-date job, {count} borrows')
+            start = time.time()
+            jobs = [gevent.spawn(driver.trigger, target) for target in TARGETS]
+            gevent.joinall(jobs)
+            end = time.time()
+            busy('job', start, end)
+
+            gevent.sleep(EMAIL_SETTLE)
+            run = {
+                'borrows': count,
+                'seeded': seeded,
+                'window': [start, end],
+                'replicas': [job.value for job in jobs],
+                'notifications': driver.notifications(since),
+                'emails': driver.sink('stats'),
+            }
+            # Emails still going out and the notification query: not baseline either
+            busy('settle', end, time.time())
+            _state['runs'].append(run)
+            print(f"⏰ Due-date job with {count} borrows on {len(TARGETS)} replicas: {end - start:.1f}s")
+
+            start = time.time()
+            run['cleared'] = driver.clear()
+            busy('cleanup', start, time.time() + EMAIL_SETTLE)
+        except requests.exceptions.RequestException as e:
+            print(f"❌ Cron interference run with {count} borrows failed: {e}")
+        gevent.sleep(GAP)
+    print("⏰ Cron interference runs complete")
+
+
+# ==================== FOREGROUND LATENCY ====================
+
+@events.test_start.add_listener
+def on_test_start(environment, **kwargs):
+    _state.update(runner=None, host=None, hist={}, runs=[], busy=[], started=time.time(), error=None)
+    if ENABLED and not isinstance(environment.runner, WorkerRunner):
+        _state['host'] = environment.host or os.getenv('LOCUST_HOST', 'http://localhost:3000')
+        needed = WARMUP + len(BORROW_COUNTS) * (GAP + 2 * EMAIL_SETTLE)
+        print(f"⏰ Cron interference: {len(BORROW_COUNTS)} job runs on {len(TARGETS)} replicas "
+              f"(needs > {needed:.0f}s plus job time)")
+
+
+@events.spawning_complete.add_listener
+def on_spawning_complete(user_count, **kwargs):
+    if _state['host'] is not None and _state['runner'] is None:
+        _state['runner'] = gevent.spawn(run_jobs, _state['host'])
+
+
+@events.request.add_listener
+def on_request(request_type, name, response_time, exception=None, start_time=None, **kwargs):
+    if not ENABLED or exception or not start_time:
+        return
+    add_sample(_state['hist'].setdefault(int(start_time), {}), response_time)
+
+
+@events.report_to_master.add_listener
+def on_report_to_master(client_id, data):
+    if not ENABLED:
+        return
+    data['cron_interference'] = {str(s): h for s, h in _state['hist'].items()}
+    _state['hist'] = {}
+
+
+@events.worker_report.add_listener
+def on_worker_report(client_id, data):
+    for second, hist in (data.get('cron_interference') or {}).items():
+        merge_hist(_state['hist'].setdefault(int(second), {}), from_json(hist))
+
+
+# ==================== REPORT ====================
+
+def percentiles(hist):
+    return {f'p{q * 100:g}_ms': hist_percentile(hist, q) for q in QUANTILES}
+
+
+def fmt(value, spec='.0f'):
+    return '-' if value is None else format(value, spec)
+
+
+def window_hist(start, end):
+    hist = {}
+    for second in range(int(start), int(end) + 1):
+        merge_hist(hist, _state['hist'].get(second, {}))
+    return hist
+
+
+def baseline_hist():
+    first = _state['started'] + WARMUP
+    hist = {}
+    for second, h in _state['hist'].items():
+        if second >= first and not any(s - 1 <= second <= e + 1 for s, e, _ in _state['busy']):
+            merge_hist(hist, h)
+    return hist
+
+
+def run_summary(run, baseline):
+    during = window_hist(*run['window'])
+    durations = [r['durationMs'] for r in run['replicas'] if 'durationMs' in r]
+    # The job scans every accepted borrow in the database, not only the seeded ones
+    scanned = [r.get('borrowsScanned') for r in run['replicas'] if 'durationMs' in r]
+    per_borrow = [ms / n for ms, n in zip(durations, scanned) if n]
+    notifications = run['notifications'] or {}
+    emails = run['emails'] or {}
+    summary = {
+        'borrows': run['borrows'],
+        'replicas': len(run['replicas']),
+        'replica_errors': [r for r in run['replicas'] if 'error' in r],
+        'job_ms_max': max(durations, default=None),
+        'job_ms_mean': sum(durations) / len(durations) if durations else None,
+        'borrows_scanned': max(scanned, default=None),
+        'ms_per_borrow': max(per_borrow, default=None),
+        'foreground_requests': sum(during.values()),
+        **{f'during_{k}': v for k, v in percentiles(during).items()},
+        'notifications': notifications.get('notifications'),
+        'notifications_per_borrow': notifications.get('maxPerBorrow'),
+        'duplicate_notifications': notifications.get('duplicates'),
+        'emails': emails.get('messages'),
+        'duplicate_emails': emails.get('duplicates'),
+    }
+    for key, value in percentiles(baseline).items():
+        if value is not None and summary[f'during_{key}'] is not None:
+            summary[f'shift_{key}'] = summary[f'during_{key}'] - value
+    return summary
+
+
+@events.test_stop.add_listener
+def on_test_stop(environment, **kwargs):
+    greenlet = _state['runner']
+    if not ENABLED or greenlet is None:
+        return
+    greenlet.kill(block=False)
+    _state['runner'] = None
+
+    baseline = baseline_hist()
+    report = {
+        'targets': TARGETS,
+        'baseline': {'requests': sum(baseline.values()), **percentiles(baseline)},
+        'runs': [run_summary(run, baseline) for run in _state['runs']],
+        'raw_runs': _state['runs'],
+        'error': _state['error'],
+    }
+
+    print(f"\n⏰ Cron Interference (baseline p95 {report['baseline']['p95_ms']}ms, "
+          f"p99 {report['baseline']['p99_ms']}ms over {report['baseline']['requests']} requests):")
+    print(f"  {'borrows':>8}{'scanned':>9}{'job ms':>9}{'ms/borrow':>11}{'p95':>7}{'Δp95':>7}{'p99':>7}{'Δp99':>7}"
+          f"{'notif/borrow':>14}{'dup notif':>11}{'dup email':>11}")
+    for r in report['runs']:
+        print(f"  {r['borrows']:>8}{fmt(r['borrows_scanned']):>9}{fmt(r['job_ms_max']):>9}{fmt(r['ms_per_borrow'], '.2f'):>11}"
+              f"{fmt(r['during_p95_ms']):>7}{fmt(r.get('shift_p95_ms'), '+.0f'):>7}"
+              f"{fmt(r['during_p99_ms']):>7}{fmt(r.get('shift_p99_ms'), '+.0f'):>7}"
+              f"{fmt(r['notifications_per_borrow']):>14}{fmt(r['duplicate_notifications']):>11}"
+              f"{fmt(r['duplicate_emails']):>11}")
+        for error in r['replica_errors']:
+            print(f"  ⚠️  {error['target']}: {error['error']}")
+    if _state['error']:
+        print(f"  ❌ {_state['error']}")
+
+    path = REPORT_PATH or f"cron-interference-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"  Report: {path}")
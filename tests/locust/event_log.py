@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Per-Request Event Log
+Streams every request sample to a compact column-oriented binary file per Locust
+process (one per worker), so multi-million-request runs can be sliced by time,
+request name, user, replica or outcome after the fact.
+
+Samples are buffered in fixed-size array columns and written as one chunk every
+LOCUST_EVENT_LOG_CHUNK rows (default 65536), so memory stays constant. Names,
+users and replicas are stored as small integer IDs; their tables go to a JSON
+sidecar next to each .bin file.
+
+Chunk layout: 16-byte header (b'EVLC', uint32 rows, uint64 payload bytes) followed
+by each column of COLUMNS in order, padded to 8 bytes. Native byte order, recorded
+in the sidecar.
+
+Enable with LOCUST_EVENT_LOG=<directory>. The reader needs numpy (not Locust): it
+memory-maps the files and computes windowed percentiles with vectorised sorts.
+
+Usage:
+LOCUST_EVENT_LOG=event-log locust -f scenarios.py StressTestUser --headless -u 1000 -r 10 -t 10m
+python event_log.py event-log --window 10
+python event_log.py event-log --window 60 --name "Rapid Read" --by replica
+"""
+
+import argparse
+import array
+import glob
+import json
+import mmap
+import os
+import socket
+import struct
+import sys
+import time
+from datetime import datetime
+
+try:
+    from locust import events
+    from locust.runners import MasterRunner
+except ImportError:  # The offline reader runs without Locust
+    events = MasterRunner = None
+
+try:
+    import numpy as np
+except ImportError:  # Only the reader needs numpy
+    np = None
+
+LOG_DIR = os.getenv('LOCUST_EVENT_LOG')
+CHUNK_ROWS = int(os.getenv('LOCUST_EVENT_LOG_CHUNK', 65536))
+
+MAGIC = b'EVLC'
+HEADER = struct.Struct('<4sIQ')
+# (column, array typecode, numpy dtype); widest first so columns stay aligned
+COLUMNS = (
+    ('ts', 'd', 'f8'),        # request start, epoch seconds
+    ('latency', 'f', 'f4'),   # response time, ms
+    ('size', 'I', 'u4'),      # response length, bytes
+    ('user', 'I', 'u4'),      # index into the sidecar's users
+    ('name', 'H', 'u2'),      # index into names ("GET [Books] List All")
+    ('status', 'H', 'u2'),    # HTTP status, 0 for connection errors
+    ('replica', 'H', 'u2'),   # index into replicas (X-Served-By / X-Upstream-Addr)
+    ('failed', 'B', 'u1'),    # 1 if Locust counted the request as a failure
+)
+MAX_ID = {'I': 2 ** 32 - 1, 'H': 2 ** 16 - 1}
+
+
+class EventLogWriter:
+    """Appends samples to array columns and writes them out one chunk at a time"""
+
+    def __init__(self, path, chunk_rows=CHUNK_ROWS):
+        self.path = path
+        self.chunk_rows = chunk_rows
+        self.columns = {name: array.array(code) for name, code, _ in COLUMNS}
+        self.tables = {'name': {}, 'user': {}, 'replica': {'': 0}}
+        self.rows = 0
+        self.chunks = 0
+        self.file = open(path, 'wb')
+        self.started = datetime.now().isoformat(timespec='seconds')
+
+    def intern(self, table, key):
+        ids = self.tables[table]
+        found = ids.get(key)
+        if found is None:
+            limit = MAX_ID['I' if table == 'user' else 'H']
+            # Unbounded keys (e.g. unnamed URLs with IDs) share the last slot instead of overflowing
+            found = ids[key] = min(len(ids), limit)
+        return found
+
+    def append(self, ts, name, latency, size, user, status, replica, failed):
+        c = self.columns
+        c['ts'].append(ts)
+        c['latency'].append(latency)
+        c['size'].append(min(size or 0, MAX_ID['I']))
+        c['user'].append(self.intern('user', user or ''))
+        c['name'].append(self.intern('name', name))
+        c['status'].append(status)
+        c['replica'].append(self.intern('replica', replica or ''))
+        c['failed'].append(failed)
+        if len(c['ts']) >= self.chunk_rows:
+            self.flush()
+
+    def flush(self):
+        rows = len(self.columns['ts'])
+        if not rows:
+            return
+        payload = [self.columns[name].tobytes() for name, _, _ in COLUMNS]
+        size = sum(len(p) for p in payload)
+        padding = -size % 8
+        self.file.write(HEADER.pack(MAGIC, rows, size + padding))
+        for part in payload:
+            self.file.write(part)
+        self.file.write(b'\0' * padding)
+        self.file.flush()
+        for column in self.columns.values():
+            del column[:]
+        self.rows += rows
+        self.chunks += 1
+        self.write_sidecar()
+
+    def write_sidecar(self):
+        sidecar = {
+            'source': os.path.basename(self.path)[:-4],
+            'started': self.started,
+            'byteorder': sys.byteorder,
+            'rows': self.rows,
+            'chunks': self.chunks,
+            'columns': [[name, dtype] for name, _, dtype in COLUMNS],
+        }
+        for table, ids in self.tables.items():
+            keys = [''] * len(ids)
+            for key, i in ids.items():
+                keys[i] = keys[i] or key
+            sidecar[f'{table}s'] = keys
+        with open(self.path[:-4] + '.json', 'w') as f:
+            json.dump(sidecar, f)
+
+    def close(self):
+        self.flush()
+        self.write_sidecar()
+        self.file.close()
+
+
+_state = {'writer': None}
+
+
+def on_test_start(environment, **kwargs):
+    if not LOG_DIR or isinstance(environment.runner, MasterRunner):
+        return
+    os.makedirs(LOG_DIR, exist_ok=True)
+    stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+    path = os.path.join(LOG_DIR, f'events-{stamp}-{socket.gethostname()}-{os.getpid()}.bin')
+    _state['writer'] = EventLogWriter(path)
+    print(f"🗂️  Event log: {path}")
+
+
+def on_request(request_type, name, response_time, response_length, response=None, context=None,
+               exception=None, start_time=None, **kwargs):
+    writer = _state['writer']
+    if writer is None or response_time is None:
+        return
+    headers = getattr(response, 'headers', None) or {}
+    writer.append(
+        start_time or time.time() - response_time / 1000,
+        f'{request_type} {name}',
+        response_time,
+        response_length,
+        (context or {}).get('user'),
+        getattr(response, 'status_code', 0) or 0,
+        headers.get('X-Served-By') or headers.get('X-Upstream-Addr'),
+        1 if exception else 0,
+    )
+
+
+def on_test_stop(environment, **kwargs):
+    writer = _state['writer']
+    if writer is None:
+        return
+    writer.close()
+    _state['writer'] = None
+    print(f"🗂️  Event log: {writer.rows} samples in {writer.chunks} chunks -> {writer.path}")
+
+
+if events is not None:
+    events.test_start.add_listener(on_test_start)
+    events.request.add_listener(on_request)
+    events.test_stop.add_listener(on_test_stop)
+
+
+# ==================== READER ====================
+
+def read_file(path):
+    """Columns of one .bin file as numpy arrays, plus its sidecar"""
+    with open(path[:-4] + '.json') as f:
+        sidecar = json.load(f)
+    order = '<' if sidecar['byteorder'] == 'little' else '>'
+    dtypes = [(name, np.dtype(order + dtype)) for name, dtype in sidecar['columns']]
+    parts = {name: [] for name, _ in dtypes}
+
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return {name: np.empty(0, dtype) for name, dtype in dtypes}, sidecar
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    offset = 0
+    while offset + HEADER.size <= len(mm):
+        magic, rows, size = HEADER.unpack_from(mm, offset)
+        if magic != MAGIC or offset + HEADER.size + size > len(mm):
+            break  # Truncated final chunk from a killed worker
+        pos = offset + HEADER.size
+        for name, dtype in dtypes:
+            parts[name].append(np.frombuffer(mm, dtype=dtype, count=rows, offset=pos))
+            pos += rows * dtype.itemsize
+        offset += HEADER.size + size
+    columns = {name: np.concatenate(parts[name]) if parts[name] else np.empty(0, dtype)
+               for name, dtype in dtypes}
+    return columns, sidecar
+
+
+def load(paths):
+    """Concatenate files, remapping per-file IDs onto shared name/replica/user tables"""
+    merged = {name: [] for name, _, _ in COLUMNS}
+    tables = {'names': [], 'replicas': [], 'users': []}
+    for path in paths:
+        columns, sidecar = read_file(path)
+        for table, values in tables.items():
+            keys = sidecar[table]
+            if table == 'users':
+                keys = [f"{sidecar['source']}/{k}" for k in keys]
+            index = {k: i for i, k in enumerate(values)}
+            remap = np.array([index.setdefault(k, len(index)) for k in keys] or [0], dtype=np.uint32)
+            values[:] = sorted(index, key=index.get)
+            column = table[:-1]
+            columns[column] = remap[columns[column]]
+        for name in merged:
+            merged[name].append(columns[name])
+    data = {name: np.concatenate(parts) if parts else np.empty(0) for name, parts in merged.items()}
+    return data, tables
+
+
+def grouped_percentiles(groups, latency, failed, quantiles):
+    """[(group, count, failures, {q: latency})] for non-negative integer groups, from one sort"""
+    if not len(groups):
+        return []
+    groups = groups.astype(np.int64)
+    # Non-negative float32 bit patterns order like the floats, so one int64 sort orders
+    # by group then latency (much faster than lexsort on tens of millions of rows)
+    keys = np.sort((groups << 32) | latency.astype(np.float32).view(np.uint32).astype(np.int64))
+    lat_sorted = (keys & 0xFFFFFFFF).astype(np.uint32).view(np.float32)
+    counts = np.bincount(groups)
+    failures = np.bincount(groups, weights=failed)
+    offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    present = np.nonzero(counts)[0]
+    per_q = {q: lat_sorted[offsets[present] + np.floor(q * (counts[present] - 1)).astype(np.int64)]
+             for q in quantiles}
+    return [
+        (int(g), int(counts[g]), int(failures[g]), {q: float(per_q[q][i]) for q in quantiles})
+        for i, g in enumerate(present)
+    ]
+
+
+def windowed_percentiles(ts, latency, failed, window, quantiles):
+    """[(window start, count, failures, {q: latency})]"""
+    if not len(ts):
+        return []
+    start = np.floor(ts.min() / window) * window
+    win = (ts - start) // window
+    return [(start + w * window, count, failures, values)
+            for w, count, failures, values in grouped_percentiles(win, latency, failed, quantiles)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Windowed percentiles from LOCUST_EVENT_LOG files')
+    parser.add_argument('paths', nargs='+', help='.bin files or directories containing them')
+    parser.add_argument('--window', type=float, default=10, help='Window size in seconds')
+    parser.add_argument('--percentiles', default='50,95,99', help='Comma-separated percentiles')
+    parser.add_argument('--name', default=None, help='Only request names containing this text')
+    parser.add_argument('--status', type=int, default=None, help='Only this HTTP status (0 = connection error)')
+    parser.add_argument('--by', choices=['name', 'replica', 'status', 'user'], default=None,
+                        help='Overall percentiles per group instead of per window')
+    parser.add_argument('--csv', default=None, help='Also write the table to this CSV file')
+    args = parser.parse_args()
+
+    if np is None:
+        print("❌ The event log reader needs numpy: pip install numpy")
+        return 2
+
+    paths = []
+    for p in args.paths:
+        paths.extend(sorted(glob.glob(os.path.join(p, '*.bin'))) if os.path.isdir(p) else [p])
+    if not paths:
+        print("❌ No event log files found")
+        return 1
+
+    data, tables = load(paths)
+    mask = np.ones(len(data['ts']), dtype=bool)
+    if args.name:
+        ids = [i for i, n in enumerate(tables['names']) if args.name in n]
+        mask &= np.isin(data['name'], ids)
+    if args.status is not None:
+        mask &= data['status'] == args.status
+    ts, latency, failed = data['ts'][mask], data['latency'][mask], data['failed'][mask]
+    quantiles = [float(p) / 100 for p in args.percentiles.split(',')]
+    print(f"\n🗂️  {mask.sum()} of {len(mask)} samples from {len(paths)} files\n")
+
+    header = ['window' if args.by is None else args.by, 'count', 'rps', 'fail%'] + \
+             [f'p{q * 100:g}' for q in quantiles]
+    rows = []
+    if args.by is None:
+        for w_start, count, failures, values in windowed_percentiles(ts, latency, failed, args.window, quantiles):
+            label = datetime.fromtimestamp(w_start).strftime('%H:%M:%S')
+            rows.append([label, count, count / args.window, failures / count * 100]
+                        + [values[q] for q in quantiles])
+    else:
+        labels = tables.get(f'{args.by}s')
+        duration = max(ts.max() - ts.min(), 1e-9) if len(ts) else 1
+        for group, count, failures, values in grouped_percentiles(data[args.by][mask], latency, failed, quantiles):
+            label = str(group) if labels is None else (labels[group] or '-')
+            rows.append([label, count, count / duration, failures / count * 100]
+                        + [values[q] for q in quantiles])
+
+    print(f"{header[0]:<40}" + ''.join(f"{h:>10}" for h in header[1:]))
+    for row in rows:
+        print(f"{row[0][:39]:<40}{row[1]:>10}{row[2]:>10.1f}{row[3]:>10.2f}"
+              + ''.join(f"{v:>10.1f}" for v in row[4:]))
+
+    if args.csv:
+        with open(args.csv, 'w') as f:
+            f.write(','.join(header) + '\n')
+            f.writelines(','.join(str(v) for v in row) + '\n' for row in rows)
+        print(f"\n✅ Written to {args.csv}")
+    return 0
+
+
+if __name__ == '__main__':
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        print("\n\nEvent log read interrupted by user")
+        sys.exit(130)
@@ -0,0 +1,43 @@
+"""
+Response-Time Histogram Helpers
+Sparse {rounded ms: count} histograms at Locust's own resolution, small enough to
+ship from workers to the master with every stats report and merge there.
+"""
+
+
+def round_response_time(ms):
+    """Same resolution as Locust's stats: 1 ms < 100, 10 ms < 1000, 100 ms above"""
+    ms = int(round(ms))
+    if ms < 100:
+        return ms
+    if ms < 1000:
+        return int(round(ms, -1))
+    return int(round(ms, -2))
+
+
+def add_sample(hist, ms):
+    rt = round_response_time(ms)
+    hist[rt] = hist.get(rt, 0) + 1
+
+
+def merge_hist(target, source):
+    for rt, count in source.items():
+        target[rt] = target.get(rt, 0) + count
+
+
+def hist_percentile(hist, q):
+    total = sum(hist.values())
+    if not total:
+        return None
+    rank = q * total
+    seen = 0
+    for rt in sorted(hist):
+        seen += hist[rt]
+        if seen >= rank:
+            return rt
+    return max(hist)
+
+
+def from_json(hist):
+    """JSON round trips turn the integer keys into strings"""
+    return {int(rt): count for rt, count in hist.items()}
@@ -0,0 +1,130 @@
+"""
+Idle-Client Polling Cost Report
+Measures what IdleTabsUser's virtual tabs (scenarios.py) cost the backend: replica CPU
+and RSS are scraped once spawning completes and again at test stop, and the steady-state
+delta is normalised per 10k idle tabs alongside the polling latency percentiles.
+
+Enabled automatically when IdleTabsUser is in the run; results go to
+LOCUST_IDLE_REPORT (default idle-cost-<time>.json).
+"""
+
+import json
+import os
+import time
+from datetime import datetime
+
+from locust import events
+from locust.runners import WorkerRunner
+
+from prom_metrics import metric_sum, metric_value, scrape_all
+
+POLL_NAME = '[Idle] Unread Count'
+REPORT_PATH = os.getenv('LOCUST_IDLE_REPORT')
+
+_state = {'active': False, 'baseline': None, 'started': None, 'users': 0, 'stats': None, 'polls_before': 0}
+
+
+def enabled(environment):
+    return (not isinstance(environment.runner, WorkerRunner)
+            and any(cls.__name__ == 'IdleTabsUser' for cls in environment.user_classes))
+
+
+def tabs_per_user(environment):
+    for cls in environment.user_classes:
+        if cls.__name__ == 'IdleTabsUser':
+            return cls.tabs_per_user
+    return 0
+
+
+def cpu_seconds(samples):
+    return (metric_sum(samples, 'process_cpu_user_seconds_total')
+            + metric_sum(samples, 'process_cpu_system_seconds_total'))
+
+
+def poll_count(stats):
+    entry = stats.entries.get((POLL_NAME, 'GET'))
+    return entry.num_requests if entry else 0
+
+
+@events.spawning_complete.add_listener
+def on_spawning_complete(user_count, **kwargs):
+    if not _state['active']:
+        return
+    _state['users'] = max(_state['users'], user_count)
+    if _state['baseline'] is None:
+        _state['baseline'] = scrape_all()
+        _state['started'] = time.time()
+        _state['polls_before'] = poll_count(_state['stats'])
+
+
+@events.test_start.add_listener
+def on_test_start(environment, **kwargs):
+    _state.update(active=enabled(environment), baseline=None, started=None, users=0,
+                  stats=environment.stats, polls_before=0)
+
+
+@events.test_stop.add_listener
+def on_test_stop(environment, **kwargs):
+    if not _state['active'] or _state['baseline'] is None:
+        return
+
+    elapsed = time.time() - _state['started']
+    end = scrape_all()
+    tabs = _state['users'] * tabs_per_user(environment)
+    per_10k = 10000 / tabs if tabs else 0
+
+    replicas = []
+    total_cores = 0.0
+    for target, samples in end.items():
+        before = _state['baseline'].get(target)
+        if not samples or not before:
+            replicas.append({'target': target, 'up': False})
+            continue
+        cores = max(0.0, cpu_seconds(samples) - cpu_seconds(before)) / elapsed if elapsed else 0.0
+        total_cores += cores
+        rss_before = metric_value(before, 'process_resident_memory_bytes', 0)
+        rss_after = metric_value(samples, 'process_resident_memory_bytes', 0)
+        replicas.append({
+            'target': target,
+            'up': True,
+            'cpu_cores': round(cores, 4),
+            'rss_mb': round(rss_after / 1024 / 1024, 1),
+            'rss_delta_mb': round((rss_after - rss_before) / 1024 / 1024, 1),
+        })
+
+    entry = environment.stats.entries.get((POLL_NAME, 'GET'))
+    polls = entry.num_requests if entry else 0
+    # Only polls since spawning completed belong to the steady-state window
+    steady_polls = polls - _state['polls_before']
+    latency = {
+        f'p{q * 100:g}_ms': entry.get_response_time_percentile(q) if entry and polls else None
+        for q in (0.5, 0.95, 0.99, 0.999)
+    }
+    report = {
+        'tabs': tabs,
+        'steady_state_seconds': round(elapsed, 1),
+        'polls': polls,
+        'steady_state_polls': steady_polls,
+        'poll_failures': entry.num_failures if entry else 0,
+        'backend_cpu_cores': round(total_cores, 4),
+        'cpu_cores_per_10k_tabs': round(total_cores * per_10k, 4),
+        'rps_per_10k_tabs': round(steady_polls / elapsed * per_10k, 1) if elapsed else None,
+        'latency': latency,
+        'replicas': replicas,
+    }
+
+    print(f"\n💤 Idle Polling Cost ({tabs} tabs, {elapsed:.0f}s steady state):")
+    print(f"  Backend CPU: {total_cores:.3f} cores total, {report['cpu_cores_per_10k_tabs']:.3f} cores per 10k tabs")
+    print(f"  Poll rate:   {report['rps_per_10k_tabs']} req/s per 10k tabs ({steady_polls} steady-state "
+          f"polls of {polls}, {report['poll_failures']} failed)")
+    print("  Latency:     " + '  '.join(f"{k[:-3]}={v:.0f}ms" for k, v in latency.items() if v is not None))
+    for r in replicas:
+        if r['up']:
+            print(f"  {r['target']}: {r['cpu_cores']:.3f} cores, RSS {r['rss_mb']} MB ({r['rss_delta_mb']:+} MB)")
+        else:
+            print(f"  ❌ {r['target']}: not scraped")
+
+    path = REPORT_PATH or f"idle-cost-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"  Report: {path}")
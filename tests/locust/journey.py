@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Markov-Chain User Journeys
+A journey is a set of page states, each with the requests that page issues, a
+think-time distribution and transition probabilities to the next states ('exit'
+ends the journey). MarkovJourneyUser (scenarios.py) walks it one state per task,
+so think time is Locust's wait_time and never inside a measured span.
+
+Besides the per-request rows, every state reports one STATE entry ('[State] <name>':
+time until its requests completed) and every finished journey one JOURNEY entry
+('[Journey] <name>': active time over all states, response length = states visited).
+
+Config (JSON, think times in seconds using mock_backend.py's latency specs):
+  {"name": "realistic", "between_journeys": "uniform:3:10", "start": {"browse": 1},
+   "states": {"browse": {"requests": [{"path": "/books", "name": "1. Browse Books"}],
+                         "think": "uniform:2:5", "next": {"details": 0.9, "exit": 0.1}}, ...}}
+Request paths may use {book_id} (the book picked by a state with "pick": "book");
+"requires": "available" skips a state's requests when that book is not available;
+"body": "borrow" sends a borrow request body for the picked book.
+
+A config can be fitted from nginx access logs (combined format): requests are mapped
+to the state whose first request has the same route, sessions are split per client
+on gaps longer than --session-gap, and transition counts and lognormal think times
+replace the base config's values where there is data.
+
+Usage:
+python journey.py show
+python journey.py fit access.log --base my-journey.json -o fitted.json
+LOCUST_JOURNEY_CONFIG=fitted.json locust -f scenarios.py MarkovJourneyUser --headless -u 100 -r 5 -t 10m
+"""
+
+import argparse
+import json
+import math
+import re
+import sys
+import time
+from datetime import datetime
+
+from common import parse_latency, print_header, route_template
+
+EXIT = 'exit'
+MAX_STATES_PER_JOURNEY = 50
+MIN_THINK_SAMPLES = 5
+
+# Equivalent of RealisticUserJourney.complete_user_journey as a Markov chain
+DEFAULT_JOURNEY = {
+    'name': 'realistic',
+    'between_journeys': 'uniform:3:10',
+    'start': {'browse': 1.0},
+    'states': {
+        'browse': {
+            'requests': [{'method': 'GET', 'path': '/books', 'name': '1. Browse Books'}],
+            'think': 'uniform:2:5',
+            'next': {'details': 1.0},
+        },
+        'details': {
+            'pick': 'book',
+            'requests': [{'method': 'GET', 'path': '/books/{book_id}', 'name': '2. View Details'}],
+            'think': 'uniform:5:10',
+            'next': {'borrow': 0.3, 'notifications': 0.35, 'my_borrows': 0.07, EXIT: 0.28},
+        },
+        'borrow': {
+            'requires': 'available',
+            'requests': [{'method': 'POST', 'path': '/borrows', 'body': 'borrow', 'name': '3. Borrow Book'}],
+            'think': 'uniform:1:2',
+            'next': {'notifications': 0.5, 'my_borrows': 0.1, EXIT: 0.4},
+        },
+        'notifications': {
+            'requests': [{'method': 'GET', 'path': '/notifications', 'name': '4. Check Notifications'}],
+            'think': 'uniform:1:3',
+            'next': {'my_borrows': 0.2, EXIT: 0.8},
+        },
+        'my_borrows': {
+            'requests': [{'method': 'GET', 'path': '/borrows/my-borrows', 'name': '5. My Borrows'}],
+            'think': 'uniform:1:3',
+            'next': {EXIT: 1.0},
+        },
+    },
+}
+
+
+def borrow_body(walker):
+    return {
+        'bookId': walker.book['_id'],
+        'startDate': time.strftime('%Y-%m-%d'),
+        'endDate': time.strftime('%Y-%m-%d', time.localtime(time.time() + 7 * 24 * 3600)),
+    }
+
+
+BODIES = {'borrow': borrow_body}
+
+
+class Journey:
+    """Validated journey config with parsed think-time samplers"""
+
+    def __init__(self, config):
+        self.config = config
+        self.name = config.get('name', 'journey')
+        self.states = config['states']
+        self.between = parse_latency(config.get('between_journeys', 'none'))
+        self.start = self.edges(config['start'], 'start')
+        self.next = {}
+        self.think = {}
+        for name, state in self.states.items():
+            self.next[name] = self.edges(state.get('next', {EXIT: 1}), name)
+            self.think[name] = parse_latency(state.get('think', 'none'))
+            for req in state.get('requests', []):
+                if req.get('body') and req['body'] not in BODIES:
+                    raise ValueError(f"State '{name}': unknown body '{req['body']}'")
+
+    def edges(self, targets, source):
+        for target, weight in targets.items():
+            if target != EXIT and target not in self.states:
+                raise ValueError(f"'{source}' -> unknown state '{target}'")
+            if weight < 0:
+                raise ValueError(f"'{source}' -> '{target}': negative probability")
+        if not any(w > 0 for w in targets.values()):
+            raise ValueError(f"'{source}' has no outgoing probability")
+        return list(targets), list(targets.values())
+
+
+def load_journey(path=None):
+    """Journey from a JSON file, or the built-in DEFAULT_JOURNEY"""
+    if not path:
+        return Journey(DEFAULT_JOURNEY)
+    with open(path) as f:
+        return Journey(json.load(f))
+
+
+class JourneyWalker:
+    """Per-user position in a journey; step() runs one state and sets think_time"""
+
+    def __init__(self, journey, rng):
+        self.journey = journey
+        self.rng = rng
+        self.books = []
+        self.think_time = 0.0
+        self.reset()
+
+    def reset(self):
+        names, weights = self.journey.start
+        self.state = self.rng.choices(names, weights)[0]
+        self.book = None
+        self.visited = 0
+        self.active_ms = 0.0
+        self.failure = None
+
+    def resolve(self, path):
+        if '{book_id}' in path:
+            if not self.book:
+                return None
+            path = path.replace('{book_id}', self.book['_id'])
+        return path
+
+    def observe(self, path, resp):
+        if resp.status_code != 200 or path.split('?')[0] != '/books':
+            return
+        try:
+            data = resp.json()
+        except ValueError:
+            return
+        # Same unwrapping as BookContext.fetchBooks
+        books = data if isinstance(data, list) else (data.get('books') or data.get('data') or [])
+        self.books = [b for b in books if isinstance(b, dict) and b.get('_id')]
+
+    def fire(self, user, request_type, name, response_time, length, exception):
+        user.environment.events.request.fire(
+            request_type=request_type,
+            name=name,
+            response_time=response_time,
+            response_length=length,
+            exception=exception,
+            context=user.context(),
+        )
+
+    def step(self, user):
+        name = self.state
+        state = self.journey.states[name]
+        if state.get('pick') == 'book':
+            self.book = self.rng.choice(self.books) if self.books else None
+
+        start = time.perf_counter()
+        issued = 0
+        length = 0
+        failure = None
+        if state.get('requires') != 'available' or (self.book and self.book.get('available')):
+            for req in state.get('requests', []):
+                path = self.resolve(req['path'])
+                if path is None or (req.get('body') and not self.book):
+                    continue
+                body = BODIES[req['body']](self) if req.get('body') else None
+                resp = user.client.request(req.get('method', 'GET'), path, json=body,
+                                           headers=user.auth_headers, name=req.get('name') or req['path'])
+                issued += 1
+                length += len(resp.content or b'')
+                if resp.status_code >= 400:
+                    failure = failure or Exception(f"{req['path']}: HTTP {resp.status_code}")
+                self.observe(path, resp)
+
+        if issued:
+            elapsed = (time.perf_counter() - start) * 1000
+            self.fire(user, 'STATE', f'[State] {name}', elapsed, length, failure)
+            self.active_ms += elapsed
+            self.failure = self.failure or failure
+        self.visited += 1
+
+        targets, weights = self.journey.next[name]
+        following = self.rng.choices(targets, weights)[0]
+        if following == EXIT or self.visited >= MAX_STATES_PER_JOURNEY:
+            self.fire(user, 'JOURNEY', f'[Journey] {self.journey.name}', self.active_ms, self.visited, self.failure)
+            self.think_time = self.journey.between(self.rng)
+            self.reset()
+        else:
+            self.state = following
+            self.think_time = self.journey.think[name](self.rng)
+
+
+# ==================== FITTING ====================
+
+COMBINED_LOG = re.compile(
+    r'(?P<addr>\S+) \S+ \S+ \[(?P<time>[^\]]+)\] "(?P<method>[A-Z]+) (?P<path>\S+)[^"]*" '
+    r'(?P<status>\d{3}) \S+(?: "[^"]*" "(?P<agent>[^"]*)")?'
+)
+
+
+def state_routes(config):
+    """(method, route template) of each state's first request -> state"""
+    routes = {}
+    for name, state in config['states'].items():
+        requests = state.get('requests') or []
+        if requests:
+            path = requests[0]['path'].replace('{book_id}', '000000000000000000000000')
+            routes.setdefault((requests[0].get('method', 'GET'), route_template(path)), name)
+    return routes
+
+
+def read_sessions(paths, routes, session_gap):
+    """Per-client sessions as lists of (epoch seconds, state)"""
+    clients = {}
+    for path in paths:
+        with open(path, errors='replace') as f:
+            for line in f:
+                m = COMBINED_LOG.search(line)  # also matches 'docker compose logs' prefixes
+                if not m or m.group('status').startswith(('4', '5')):
+                    continue
+                state = routes.get((m.group('method'), route_template(m.group('path'))))
+                if state is None:
+                    continue
+                ts = datetime.strptime(m.group('time'), '%d/%b/%Y:%H:%M:%S %z').timestamp()
+                clients.setdefault((m.group('addr'), m.group('agent')), []).append((ts, state))
+
+    sessions = []
+    for visits in clients.values():
+        visits.sort()
+        current = []
+        for ts, state in visits:
+            if current and ts - current[-1][0] > session_gap:
+                sessions.append(current)
+                current = []
+            current.append((ts, state))
+        if current:
+            sessions.append(current)
+    return sessions
+
+
+def fit(config, sessions):
+    """Copy of config with start/next/think replaced where the sessions have data"""
+    fitted = json.loads(json.dumps(config))
+    start = {}
+    transitions = {}
+    thinks = {}
+    for session in sessions:
+        start[session[0][1]] = start.get(session[0][1], 0) + 1
+        for (ts, state), (next_ts, next_state) in zip(session, session[1:] + [(None, EXIT)]):
+            counts = transitions.setdefault(state, {})
+            counts[next_state] = counts.get(next_state, 0) + 1
+            if next_ts is not None:
+                thinks.setdefault(state, []).append(max(next_ts - ts, 0.05))
+
+    def normalise(counts):
+        total = sum(counts.values())
+        return {k: round(v / total, 4) for k, v in sorted(counts.items(), key=lambda kv: -kv[1])}
+
+    if start:
+        fitted['start'] = normalise(start)
+    for state, counts in transitions.items():
+        fitted['states'][state]['next'] = normalise(counts)
+        samples = thinks.get(state, [])
+        if len(samples) >= MIN_THINK_SAMPLES:
+            logs = [math.log(s) for s in samples]
+            mean = sum(logs) / len(logs)
+            sigma = math.sqrt(sum((x - mean) ** 2 for x in logs) / len(logs))
+            fitted['states'][state]['think'] = f'lognormal:{math.exp(mean):.3f}:{sigma:.3f}'
+        fitted['states'][state]['observed'] = sum(counts.values())
+    return fitted
+
+
+def show(config):
+    journey = Journey(config)
+    print_header(f"Journey '{journey.name}' ({len(journey.states)} states)")
+    print(f"  start: {config['start']}")
+    print(f"  between journeys: {config.get('between_journeys', 'none')}\n")
+    columns = list(journey.states) + [EXIT]
+    corner = 'from \\ to'
+    print(f"  {corner:<16}" + ''.join(f"{c[:11]:>12}" for c in columns) + '   think')
+    for name, state in journey.states.items():
+        probs = state.get('next', {EXIT: 1})
+        total = sum(probs.values())
+        cells = ''.join(f"{probs[c] / total:>12.2f}" if c in probs else f"{'.':>12}" for c in columns)
+        print(f"  {name[:15]:<16}{cells}   {state.get('think', 'none')}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Show or fit Markov journey configs')
+    sub = parser.add_subparsers(dest='command', required=True)
+    show_cmd = sub.add_parser('show', help='Print a config (default: the built-in journey)')
+    show_cmd.add_argument('config', nargs='?')
+    fit_cmd = sub.add_parser('fit', help='Fit transitions and think times from nginx access logs')
+    fit_cmd.add_argument('logs', nargs='+')
+    fit_cmd.add_argument('--base', default=None, help='Config providing states and requests (default: built-in)')
+    fit_cmd.add_argument('--session-gap', type=float, default=1800, help='Seconds of inactivity ending a session')
+    fit_cmd.add_argument('-o', '--output', default='journey-fitted.json')
+    args = parser.parse_args()
+
+    try:
+        if args.command == 'show':
+            show(load_journey(args.config).config)
+            return 0
+
+        base = load_journey(args.base).config
+        sessions = read_sessions(args.logs, state_routes(base), args.session_gap)
+        if not sessions:
+            print("❌ No log lines matched a state's route")
+            return 1
+        fitted = fit(base, sessions)
+        Journey(fitted)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"❌ {e}")
+        return 2
+
+    with open(args.output, 'w') as f:
+        json.dump(fitted, f, indent=2)
+    show(fitted)
+    print(f"\n✅ Fitted from {len(sessions)} sessions, {sum(len(s) for s in sessions)} page views -> {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        print("\n\nJourney fitting interrupted by user")
+        sys.exit(130)
@@ -0,0 +1,175 @@
+"""
+Server vs Client Latency Decomposition
+Scrapes the http_request_duration_ms histogram from every replica at test start and
+stop, computes per-route server-side quantiles from the bucket deltas and lines them
+up against Locust's client-side percentiles for the request names that hit the same
+route. The difference is time spent outside the Express handlers (nginx, network,
+client).
+
+Locust request names are joined to backend routes by the URL each name was seen
+with (ObjectId path segments become ':id'), so no manual mapping is needed.
+
+Enable with LOCUST_LATENCY_BREAKDOWN=1; the JSON report goes to
+LOCUST_LATENCY_BREAKDOWN_REPORT (default latency-breakdown-<time>.json).
+
+Usage:
+LOCUST_LATENCY_BREAKDOWN=1 locust -f locustfile.py --headless -u 50 -r 10 -t 5m
+"""
+
+import json
+import os
+from datetime import datetime
+
+from locust import events
+from locust.runners import MasterRunner, WorkerRunner
+
+from common import route_template
+from prom_metrics import scrape_all
+
+ENABLED = os.getenv('LOCUST_LATENCY_BREAKDOWN', '').lower() in ('1', 'true', 'yes')
+REPORT_PATH = os.getenv('LOCUST_LATENCY_BREAKDOWN_REPORT')
+QUANTILES = (0.5, 0.95, 0.99)
+
+# (request_type, name) -> route template seen for it
+_routes = {}
+_baseline = {}
+
+
+def histogram_buckets(scrapes):
+    """{(target, method, route): {le: cumulative count}} summed over status/instance"""
+    hist = {}
+    for target, samples in scrapes.items():
+        for name, labels, value in samples or []:
+            if name != 'http_request_duration_ms_bucket':
+                continue
+            key = (target, labels.get('method'), labels.get('route'))
+            le = float('inf') if labels.get('le') == '+Inf' else float(labels.get('le', 'inf'))
+            buckets = hist.setdefault(key, {})
+            buckets[le] = buckets.get(le, 0) + value
+    return hist
+
+
+def bucket_deltas(start, end):
+    """{(method, route): {le: count}} for the test window, summed over replicas"""
+    deltas = {}
+    for (target, method, route), buckets in end.items():
+        before = start.get((target, method, route), {})
+        # A replica restart resets counters: fall back to the end value
+        reset = any(count < before.get(le, 0) for le, count in buckets.items())
+        merged = deltas.setdefault((method, route), {})
+        for le, count in buckets.items():
+            merged[le] = merged.get(le, 0) + (count if reset else count - before.get(le, 0))
+    return deltas
+
+
+def histogram_quantile(q, buckets):
+    """Prometheus-style quantile from cumulative buckets with linear interpolation"""
+    bounds = sorted(buckets)
+    if not bounds:
+        return None
+    total = buckets[bounds[-1]]
+    if total <= 0:
+        return None
+    rank = q * total
+    prev_bound, prev_count = 0.0, 0.0
+    for bound in bounds:
+        count = buckets[bound]
+        if count >= rank:
+            if bound == float('inf'):
+                # Beyond the largest finite bucket: best answer is that bucket's bound
+                return prev_bound
+            if count == prev_count:
+                return bound
+            return prev_bound + (bound - prev_bound) * (rank - prev_count) / (count - prev_count)
+        prev_bound, prev_count = bound, count
+    return prev_bound
+
+
+def build_report(stats, routes, deltas):
+    rows = []
+    for (request_type, name), route in sorted(routes.items()):
+        entry = stats.entries.get((name, request_type))
+        if entry is None or not entry.num_requests:
+            continue
+        buckets = deltas.get((request_type, route), {})
+        server_count = int(buckets.get(float('inf'), 0))
+        row = {
+            'name': name,
+            'method': request_type,
+            'route': route,
+            'client_requests': entry.num_requests,
+            'server_requests': server_count,
+        }
+        for q in QUANTILES:
+            key = f'p{int(q * 100)}'
+            client = entry.get_response_time_percentile(q)
+            server = histogram_quantile(q, buckets) if server_count else None
+            row[f'client_{key}_ms'] = client
+            row[f'server_{key}_ms'] = round(server, 1) if server is not None else None
+            row[f'overhead_{key}_ms'] = round(client - server, 1) if server is not None else None
+        rows.append(row)
+    return rows
+
+
+def print_report(rows):
+    print("\n🧭 Latency Decomposition (client − server = nginx + network + client):")
+    print(f"  {'Request':<32}{'Route':<28}{'p50 c/s':>14}{'p95 c/s':>14}{'p99 c/s':>14}{'Δp95':>8}")
+    for r in rows:
+        cells = []
+        for key in ('p50', 'p95', 'p99'):
+            server = r[f'server_{key}_ms']
+            cells.append(f"{r[f'client_{key}_ms']:.0f}/{'-' if server is None else f'{server:.0f}'}")
+        overhead = r['overhead_p95_ms']
+        print(f"  {r['name'][:31]:<32}{r['method'] + ' ' + r['route']:<28.27}"
+              f"{cells[0]:>14}{cells[1]:>14}{cells[2]:>14}"
+              f"{'-' if overhead is None else f'{overhead:.0f}':>8}")
+    print("  ℹ️  Server quantiles are interpolated within http_request_duration_ms buckets "
+          "(10/50/100/200/500/1000/2000/5000 ms)")
+
+
+@events.request.add_listener
+def on_request(request_type, name, url=None, **kwargs):
+    if not ENABLED or not url:
+        return
+    key = (request_type, name)
+    if key not in _routes:
+        _routes[key] = route_template(url)
+
+
+@events.report_to_master.add_listener
+def on_report_to_master(client_id, data):
+    if ENABLED and _routes:
+        data['latency_breakdown_routes'] = [[t, n, r] for (t, n), r in _routes.items()]
+
+
+@events.worker_report.add_listener
+def on_worker_report(client_id, data):
+    for request_type, name, route in data.get('latency_breakdown_routes', []):
+        _routes.setdefault((request_type, name), route)
+
+
+@events.test_start.add_listener
+def on_test_start(environment, **kwargs):
+    if not ENABLED or isinstance(environment.runner, WorkerRunner):
+        return
+    _routes.clear()
+    _baseline.clear()
+    _baseline.update(histogram_buckets(scrape_all()))
+    print(f"🧭 Latency decomposition enabled ({len({k[0] for k in _baseline})} replicas with histograms)")
+
+
+@events.test_stop.add_listener
+def on_test_stop(environment, **kwargs):
+    if not ENABLED or isinstance(environment.runner, WorkerRunner):
+        return
+    if isinstance(environment.runner, MasterRunner) and not _routes:
+        print("ℹ️  Latency decomposition: no route mapping received from workers")
+
+    deltas = bucket_deltas(_baseline, histogram_buckets(scrape_all()))
+    rows = build_report(environment.stats, _routes, deltas)
+    print_report(rows)
+
+    path = REPORT_PATH or f"latency-breakdown-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    with open(path, 'w') as f:
+        json.dump({'endpoints': rows}, f, indent=2)
+    print(f"  Report: {path}")
@@ -1,7 +1,14 @@
 import os
-import random
 import time
-from locust import HttpUser, task, between, SequentialTaskSet, events
+from locust import HttpUser, task, SequentialTaskSet, events
+
+import connection_policy
+import cron_interference  # noqa: F401 - due-date job interference runs (LOCUST_CRON_INTERFERENCE=1)
+import event_log  # noqa: F401 - per-request binary event log (LOCUST_EVENT_LOG=<dir>)
+import latency_breakdown  # noqa: F401 - server vs client latency decomposition (LOCUST_LATENCY_BREAKDOWN=1)
+import run_report  # noqa: F401 - unified client/server timeline report (LOCUST_RUN_REPORT=1)
+import seeding
+import tail_exemplars
 
 
 TEST_EMAIL = os.getenv('LOCUST_USER_EMAIL')
@@ -51,7 +58,7 @@ class UserBehavior(SequentialTaskSet):
             return
         
         # Randomized delay to avoid thundering herd
-        time.sleep(random.uniform(0, 2))
+        time.sleep(self.user.rng.uniform(0, 2))
 
         # Check existing cookie
         existing = self.client.cookies.get('accessToken')
@@ -122,9 +129,9 @@ class UserBehavior(SequentialTaskSet):
         """Test: Get book by ID (Redis cache)"""
         r = self.client.get('/books', headers=self.auth_headers)
         if r.status_code == 200:
-            books = r.json() or []
+            books = r.json().get('books') or []
             if books:
-                book = random.choice(books)
+                book = self.user.rng.choice(books)
                 with self.client.get(f"/books/{book.get('_id')}", 
                                    headers=self.auth_headers,
                                    catch_response=True,
@@ -138,7 +145,7 @@ class UserBehavior(SequentialTaskSet):
     def search_books(self):
         """Test: Search books via Google Books API"""
         queries = ['javascript', 'node', 'react', 'python', 'docker', 'clean code', 'design patterns']
-        q = random.choice(queries)
+        q = self.user.rng.choice(queries)
         with self.client.get(f'/books/search?q={q}', 
                            headers=self.auth_headers,
                            catch_response=True,
@@ -176,7 +183,7 @@ class UserBehavior(SequentialTaskSet):
         ]
         
         payload = {
-            'title': random.choice(book_titles) + f' {random.randint(1, 1000)}',
+            'title': self.user.rng.choice(book_titles) + f' {self.user.rng.randint(1, 1000)}',
             'authors': 'Test Author',  # String, not array
             'description': 'Load test book',
             'category': 'Programming'  # Single category, not array
@@ -200,16 +207,16 @@ class UserBehavior(SequentialTaskSet):
         if not created_books:
             return
         
-        book_id = random.choice(created_books)
+        book_id = self.user.rng.choice(created_books)
         payload = {
-            'description': f'Updated at {time.time()}'
+            'description': f'Updated at {seeding.token(self.user.rng)}'
         }
         
-        with self.client.patch(f'/books/{book_id}',
-                             json=payload,
-                             headers=self.auth_headers,
-                             catch_response=True,
-                             name="[Books] Update") as resp:
+        with self.client.put(f'/books/{book_id}',
+                           json=payload,
+                           headers=self.auth_headers,
+                           catch_response=True,
+                           name="[Books] Update") as resp:
             if resp.status_code == 200:
                 resp.success()
             elif resp.status_code in [404, 403]:
@@ -250,11 +257,11 @@ class UserBehavior(SequentialTaskSet):
         # Get available books
         r = self.client.get('/books', headers=self.auth_headers)
         if r.status_code == 200:
-            books = r.json() or []
+            books = r.json().get('books') or []
             available_books = [b for b in books if b.get('available')]
             
             if available_books:
-                book = random.choice(available_books)
+                book = self.user.rng.choice(available_books)
                 payload = {
                     'bookId': book['_id'],
                     'startDate': time.strftime('%Y-%m-%d'),
@@ -267,7 +274,7 @@ class UserBehavior(SequentialTaskSet):
                                     catch_response=True,
                                     name="[Borrows] Create Request") as resp:
                     if resp.status_code == 201:
-                        borrow = resp.json()
+                        borrow = resp.json()['borrow']
                         created_borrows.append(borrow['_id'])
                         resp.success()
                     elif resp.status_code == 400:
@@ -282,14 +289,14 @@ class UserBehavior(SequentialTaskSet):
         if not created_borrows:
             return
         
-        borrow_id = random.choice(created_borrows)
+        borrow_id = self.user.rng.choice(created_borrows)
         
-        with self.client.patch(f'/borrows/{borrow_id}/approve',
-                             headers=self.auth_headers,
-                             catch_response=True,
-                             name="[Borrows] Approve") as resp:
-            if resp.status_code in [200, 403, 404]:
-                # 403 = not owner, 404 = not found, both OK in load test
+        with self.client.put(f'/borrows/{borrow_id}/accept',
+                           headers=self.auth_headers,
+                           catch_response=True,
+                           name="[Borrows] Approve") as resp:
+            if resp.status_code in [200, 400, 403, 404]:
+                # 400 = no longer pending, 403 = not owner, 404 = not found, all OK in load test
                 resp.success()
             else:
                 resp.failure(f"Failed: {resp.status_code}")
@@ -300,12 +307,12 @@ class UserBehavior(SequentialTaskSet):
         if not created_borrows:
             return
         
-        borrow_id = random.choice(created_borrows)
+        borrow_id = self.user.rng.choice(created_borrows)
         
-        with self.client.patch(f'/borrows/{borrow_id}/return',
-                             headers=self.auth_headers,
-                             catch_response=True,
-                             name="[Borrows] Return") as resp:
+        with self.client.put(f'/borrows/{borrow_id}/return',
+                           headers=self.auth_headers,
+                           catch_response=True,
+                           name="[Borrows] Return") as resp:
             if resp.status_code in [200, 400, 404]:
                 # 400 = not approved yet, 404 = not found, both OK
                 resp.success()
@@ -332,15 +339,15 @@ class UserBehavior(SequentialTaskSet):
         # Get notifications first
         r = self.client.get('/notifications', headers=self.auth_headers)
         if r.status_code == 200:
-            notifs = r.json() or []
-            unread = [n for n in notifs if not n.get('isRead')]
+            notifs = r.json().get('notifications') or []
+            unread = [n for n in notifs if not n.get('read')]
             
             if unread:
-                notif = random.choice(unread)
-                with self.client.patch(f"/notifications/{notif['_id']}/read",
-                                     headers=self.auth_headers,
-                                     catch_response=True,
-                                     name="[Notifications] Mark Read") as resp:
+                notif = self.user.rng.choice(unread)
+                with self.client.put(f"/notifications/{notif['_id']}/read",
+                                   headers=self.auth_headers,
+                                   catch_response=True,
+                                   name="[Notifications] Mark Read") as resp:
                     if resp.status_code == 200:
                         resp.success()
                     else:
@@ -351,10 +358,10 @@ class UserBehavior(SequentialTaskSet):
         """Test: Delete notification"""
         r = self.client.get('/notifications', headers=self.auth_headers)
         if r.status_code == 200:
-            notifs = r.json() or []
+            notifs = r.json().get('notifications') or []
             
             if notifs:
-                notif = random.choice(notifs)
+                notif = self.user.rng.choice(notifs)
                 with self.client.delete(f"/notifications/{notif['_id']}",
                                       headers=self.auth_headers,
                                       catch_response=True,
@@ -382,7 +389,7 @@ class UserBehavior(SequentialTaskSet):
     def update_profile(self):
         """Test: Update user profile"""
         payload = {
-            'name': f'Locust User {random.randint(1, 1000)}'
+            'name': f'Locust User {self.user.rng.randint(1, 1000)}'
         }
         
         with self.client.put('/users/update-user',
@@ -409,7 +416,8 @@ class UserBehavior(SequentialTaskSet):
                 resp.failure(f"Health check failed: {resp.status_code}")
 
 
-class WebsiteUser(HttpUser):
+class WebsiteUser(tail_exemplars.ExemplarUser, seeding.SeededUser, connection_policy.ConnectionPolicyUser,
+                  HttpUser):
     tasks = [UserBehavior]
-    wait_time = between(0.1, 0.5)  # Faster requests to stress test cache
+    wait_time = seeding.between(0.1, 0.5)  # Faster requests to stress test cache
     host = BACKEND_HOST
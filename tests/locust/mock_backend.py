@@ -0,0 +1,897 @@
+#!/usr/bin/env python3
+"""
+Mock Backend for Offline Harness Development
+Asyncio stand-in for the Book-Sharing API serving the routes the Locust harness uses,
+with configurable latency, error injection and 429 behaviour. No Docker, Redis,
+MongoDB, Cloudinary or Google Books required.
+
+Routes follow the real backend (methods, validation, status codes and response
+shapes), so harness bugs show up offline the same way they would against nginx.
+
+Usage:
+python mock_backend.py --port 3000
+python mock_backend.py --latency lognormal:20:0.6 --route-latency "GET /books/search=uniform:80:300"
+python mock_backend.py --error-rate 0.02 --rate-limit 100 --rate-window-ms 60000
+locust -f locustfile.py --host http://localhost:3000
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import re
+import secrets
+import socket
+import sys
+import time
+from datetime import datetime, timezone
+from urllib.parse import parse_qs, urlsplit
+
+from common import parse_latency
+
+DEFAULT_BUCKETS = [10, 50, 100, 200, 500, 1000, 2000, 5000]  # Same as backend/shared/utils/metrics.js
+OBJECT_ID = re.compile(r'^[0-9a-fA-F]{24}$')
+
+REASONS = {
+    200: 'OK', 201: 'Created', 204: 'No Content', 400: 'Bad Request', 401: 'Unauthorized',
+    403: 'Forbidden', 404: 'Not Found', 411: 'Length Required', 413: 'Payload Too Large',
+    429: 'Too Many Requests', 500: 'Internal Server Error', 503: 'Service Unavailable',
+}
+
+
+# ==================== LATENCY DISTRIBUTIONS ====================
+
+def parse_route_latency(item):
+    """Parse 'METHOD /route=spec' into ((method, route), sampler)"""
+    key, _, spec = item.partition('=')
+    method, _, route = key.strip().partition(' ')
+    if not route or not spec:
+        raise ValueError(f"Invalid route latency '{item}' (expected 'GET /books=constant:5')")
+    return (method.upper(), route.strip()), parse_latency(spec)
+
+
+# ==================== HTTP PLUMBING ====================
+
+class Request:
+    """Parsed HTTP/1.1 request"""
+
+    def __init__(self, method, target, version, headers, body, peer):
+        self.method = method
+        self.version = version
+        self.headers = headers
+        self.body = body
+        self.peer = peer
+        parts = urlsplit(target)
+        self.path = parts.path.rstrip('/') or '/'
+        self.query = {k: v[0] for k, v in parse_qs(parts.query).items()}
+        self.params = {}
+        self.started = time.perf_counter()
+
+    @property
+    def keep_alive(self):
+        conn = self.headers.get('connection', '').lower()
+        if self.version == 'HTTP/1.0':
+            return conn == 'keep-alive'
+        return conn != 'close'
+
+    @property
+    def cookies(self):
+        jar = {}
+        for part in self.headers.get('cookie', '').split(';'):
+            name, _, value = part.strip().partition('=')
+            if name:
+                jar[name] = value
+        return jar
+
+    def json(self):
+        if not self.body or 'json' not in self.headers.get('content-type', ''):
+            return {}
+        try:
+            data = json.loads(self.body)
+        except ValueError:
+            return {}
+        return data if isinstance(data, dict) else {}
+
+
+class HttpServer:
+    """Minimal keep-alive HTTP/1.1 server; subclasses register routes with add_route()"""
+
+    max_body = 10 * 1024 * 1024  # Same limit as express.json() in backend/index.js
+
+    def __init__(self):
+        self.routes = []
+
+    def add_route(self, method, template, handler):
+        """Register handler for METHOD + template such as '/books/:id'"""
+        pattern = re.sub(r':(\w+)', r'(?P<\1>[^/]+)', template)
+        self.routes.append((method, re.compile(f'^{pattern}$'), template, handler))
+
+    def match(self, method, path):
+        """Return (template, handler, params) or None"""
+        for route_method, pattern, template, handler in self.routes:
+            if route_method != method:
+                continue
+            m = pattern.match(path)
+            if m:
+                return template, handler, m.groupdict()
+        return None
+
+    async def dispatch(self, req):
+        """Return (status, body, headers); override to add cross-cutting behaviour"""
+        found = self.match(req.method, req.path)
+        if not found:
+            return 404, {'title': 'Not Found', 'message': 'Route not found'}, {}
+        req.route, handler, req.params = found
+        return await handler(req)
+
+    async def handle_connection(self, reader, writer):
+        peer = (writer.get_extra_info('peername') or ('unknown',))[0]
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+
+                lines = head.decode('latin-1').split('\r\n')
+                try:
+                    method, target, version = lines[0].split(' ', 2)
+                except ValueError:
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    if ':' in line:
+                        name, value = line.split(':', 1)
+                        headers[name.strip().lower()] = value.strip()
+
+                if headers.get('transfer-encoding', '').lower() == 'chunked':
+                    body = await self.read_chunked(reader)
+                else:
+                    length = int(headers.get('content-length') or 0)
+                    body = await reader.readexactly(length) if length <= self.max_body else None
+                if body is None:
+                    await self.write(writer, 413, {'message': 'Payload too large'}, {}, False)
+                    break
+
+                req = Request(method.upper(), target, version, headers, body, peer)
+                req.route = req.path
+                try:
+                    status, payload, extra = await self.dispatch(req)
+                except Exception as e:
+                    status, payload, extra = 500, {'message': 'Server error', 'error': str(e)}, {}
+
+                extra = self.response_headers(req, status, extra)
+                await self.write(writer, status, payload, extra, req.keep_alive)
+                self.after_response(req, status)
+                if not req.keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            try:
+                writer.close()
+            except Exception:
+                pass
+
+    async def read_chunked(self, reader):
+        """Body sent with Transfer-Encoding: chunked (streamed uploads), or None when over max_body"""
+        body = bytearray()
+        while True:
+            size = int((await reader.readuntil(b'\r\n')).split(b';')[0].strip() or b'0', 16)
+            if not size:
+                while await reader.readuntil(b'\r\n') != b'\r\n':
+                    pass  # Trailer fields
+                return bytes(body)
+            if len(body) + size > self.max_body:
+                return None
+            body += await reader.readexactly(size)
+            await reader.readexactly(2)
+
+    async def write(self, writer, status, payload, extra, keep_alive):
+        if isinstance(payload, (bytes, str)):
+            body = payload.encode() if isinstance(payload, str) else payload
+            content_type = extra.pop('Content-Type', 'text/plain; charset=utf-8')
+        else:
+            body = json.dumps(payload, separators=(',', ':')).encode()
+            content_type = 'application/json; charset=utf-8'
+
+        head = [
+            f'HTTP/1.1 {status} {REASONS.get(status, "Unknown")}',
+            f'Content-Type: {content_type}',
+            f'Content-Length: {len(body)}',
+            f'Connection: {"keep-alive" if keep_alive else "close"}',
+        ]
+        for name, value in extra.items():
+            if isinstance(value, list):
+                head.extend(f'{name}: {v}' for v in value)
+            else:
+                head.append(f'{name}: {value}')
+        writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + body)
+        await writer.drain()
+
+    def response_headers(self, req, status, extra):
+        """Hook returning the extra headers to send with a response"""
+        return extra
+
+    def after_response(self, req, status):
+        """Hook called once the response has been written"""
+
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self.handle_connection, host, port, backlog=4096)
+        async with server:
+            await server.serve_forever()
+
+
+# ==================== MOCK BACKEND ====================
+
+def object_id():
+    return secrets.token_hex(12)
+
+
+def iso_now():
+    return datetime.now(timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+
+
+class MockBackend(HttpServer):
+    """In-memory Book-Sharing API with latency, error and rate-limit injection"""
+
+    def __init__(self, latency='none', route_latency=(), error_rate=0.0, error_status=500,
+                 rate_limit=0, rate_window_ms=15 * 60 * 1000, books=60, notifications=0, page_size=12, seed=None):
+        super().__init__()
+        self.rng = random.Random(seed)
+        self.default_latency = parse_latency(latency)
+        self.route_latency = dict(parse_route_latency(item) for item in route_latency)
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.rate_limit = rate_limit
+        self.rate_window_ms = rate_window_ms
+        self.page_size = page_size
+        self.seed_notifications = notifications
+        self.hostname = socket.gethostname()
+        self.started_at = time.time()
+
+        # Rate limit windows: ip -> [window_start_ms, count]
+        self.windows = {}
+
+        # Metrics: (method, route, status) -> [count, bucket counts..., sum]
+        self.request_counts = {}
+        self.duration_hist = {}
+        self.rate_limit_blocked = 0
+        self.rate_limit_allowed = 0
+
+        # Data
+        self.users = {}
+        self.tokens = {}
+        self.refresh_tokens = {}
+        self.books = {}
+        self.borrows = {}
+        self.notifications = {}
+        self.owner = self.create_user('seed-owner@example.com', 'Seed Owner')
+        for i in range(books):
+            self.create_book(self.owner, f'Seed Book {i + 1}', 'Seed Author', 'Programming')
+
+        self.register_routes()
+
+    # ---------- data helpers ----------
+
+    def create_user(self, email, name):
+        user = {'_id': object_id(), 'name': name, 'email': email, 'createdAt': iso_now()}
+        self.users[email] = user
+        return user
+
+    def create_book(self, owner, title, authors, category, description='', thumbnail=None):
+        now = iso_now()
+        book = {
+            '_id': object_id(),
+            'title': title,
+            'authors': authors,
+            'description': description,
+            'thumbnail': thumbnail,
+            'categories': [category] if category else [],
+            'available': True,
+            'ownerId': {'_id': owner['_id'], 'name': owner['name'], 'email': owner['email']},
+            'createdAt': now,
+            'updatedAt': now,
+        }
+        self.books[book['_id']] = book
+        return book
+
+    def notify(self, user_id, kind, title, message, related_id, book_title):
+        notif = {
+            '_id': object_id(),
+            'userId': user_id,
+            'type': kind,
+            'title': title,
+            'message': message,
+            'read': False,
+            'relatedId': related_id,
+            'relatedModel': 'Borrow',
+            'bookTitle': book_title,
+            'createdAt': iso_now(),
+        }
+        self.notifications[notif['_id']] = notif
+        return notif
+
+    def page(self, items, req):
+        try:
+            page = max(1, int(req.query.get('page', 1)))
+        except ValueError:
+            page = 1
+        total = len(items)
+        pages = math.ceil(total / self.page_size) if total else 0
+        start = (page - 1) * self.page_size
+        return page, pages, total, items[start:start + self.page_size]
+
+    # ---------- cross-cutting behaviour ----------
+
+    async def dispatch(self, req):
+        found = self.match(req.method, req.path)
+        if found:
+            req.route = found[0]
+
+        if req.path != '/metrics':
+            blocked = self.check_rate_limit(req)
+            if blocked:
+                return blocked
+
+            delay = self.route_latency.get((req.method, req.route), self.default_latency)(self.rng)
+            if delay > 0:
+                await asyncio.sleep(delay / 1000.0)
+
+            if self.error_rate and req.path != '/health' and self.rng.random() < self.error_rate:
+                return self.error_status, {'message': 'Injected failure', 'error': 'mock'}, {}
+
+        if not found:
+            return 404, {'title': 'Not Found', 'message': 'Route not found'}, {}
+
+        req.route, handler, req.params = found
+        if req.route not in self.public_routes:
+            req.user = self.authenticate(req)
+            if not req.user:
+                return 401, {'message': 'Not authenticated'}, {}
+        return await handler(req)
+
+    def check_rate_limit(self, req):
+        """Fixed-window limiter per client IP, mirroring express-rate-limit draft-6 headers"""
+        if not self.rate_limit:
+            return None
+
+        now_ms = time.time() * 1000
+        window = self.windows.get(req.peer)
+        if window is None or now_ms - window[0] >= self.rate_window_ms:
+            window = self.windows[req.peer] = [now_ms, 0]
+        window[1] += 1
+
+        reset_s = max(0, math.ceil((window[0] + self.rate_window_ms - now_ms) / 1000))
+        if window[1] <= self.rate_limit:
+            self.rate_limit_allowed += 1
+            return None
+
+        self.rate_limit_blocked += 1
+        headers = {
+            'RateLimit-Policy': f'{self.rate_limit};w={self.rate_window_ms // 1000}',
+            'RateLimit-Limit': str(self.rate_limit),
+            'RateLimit-Remaining': '0',
+            'RateLimit-Reset': str(reset_s),
+            'Retry-After': str(reset_s),
+        }
+        return 429, {
+            'error': 'Too Many Requests',
+            'message': 'Bạn đã gửi quá nhiều yêu cầu. Vui lòng thử lại sau.',
+            'retryAfter': reset_s,
+        }, headers
+
+    def authenticate(self, req):
+        token = req.cookies.get('accessToken')
+        auth = req.headers.get('authorization', '')
+        if not token and auth.startswith('Bearer '):
+            token = auth[7:]
+        return self.tokens.get(token)
+
+    def response_headers(self, req, status, extra):
+        """Tracing headers set by backend/index.js (request ID, replica, app time)"""
+        duration = (time.perf_counter() - req.started) * 1000
+        return {
+            'X-Request-Id': req.headers.get('x-request-id') or secrets.token_hex(16),
+            'X-Served-By': self.hostname,
+            'Server-Timing': f'app;dur={duration:.3f}',
+            **extra,
+        }
+
+    def after_response(self, req, status):
+        if req.path == '/metrics':
+            return
+        duration = (time.perf_counter() - req.started) * 1000
+        key = (req.method, req.route, str(status))
+        self.request_counts[key] = self.request_counts.get(key, 0) + 1
+
+        hist = self.duration_hist.get(key)
+        if hist is None:
+            hist = self.duration_hist[key] = [0] * len(DEFAULT_BUCKETS) + [0, 0.0]
+        for i, bound in enumerate(DEFAULT_BUCKETS):
+            if duration <= bound:
+                hist[i] += 1
+        hist[-2] += 1
+        hist[-1] += duration
+
+    # ---------- routes ----------
+
+    public_routes = {'/auth/login', '/auth/refresh-token', '/health', '/metrics', '/'}
+
+    def register_routes(self):
+        add = self.add_route
+        add('GET', '/', self.root)
+        add('GET', '/health', self.health)
+        add('GET', '/metrics', self.metrics)
+
+        add('POST', '/auth/login', self.login)
+        add('GET', '/auth/refresh-token', self.refresh_token)
+        add('GET', '/auth/current', self.current)
+        add('GET', '/auth/logout', self.logout)
+
+        add('GET', '/books', self.list_books)
+        add('GET', '/books/my-books', self.my_books)
+        add('GET', '/books/search', self.search_books)
+        add('GET', '/books/:id', self.get_book)
+        add('POST', '/books', self.create_book_route)
+        add('PUT', '/books/:id', self.update_book)
+        add('DELETE', '/books/:id', self.delete_book)
+
+        add('POST', '/borrows', self.create_borrow)
+        add('PUT', '/borrows/:id/accept', self.borrow_transition('accepted', 'pending'))
+        add('PUT', '/borrows/:id/reject', self.borrow_transition('rejected', 'pending'))
+        add('PUT', '/borrows/:id/return', self.borrow_transition('returned', 'accepted'))
+        add('GET', '/borrows/my-requests', self.my_requests)
+        add('GET', '/borrows/my-borrows', self.my_borrows)
+        add('GET', '/borrows/pending-requests', self.pending_requests)
+        add('GET', '/borrows/:id', self.get_borrow)
+        add('GET', '/borrows', self.all_borrows)
+        add('DELETE', '/borrows/:id', self.delete_borrow)
+
+        add('GET', '/notifications/unread-count', self.unread_count)
+        add('GET', '/notifications', self.list_notifications)
+        add('PUT', '/notifications/read-all', self.read_all)
+        add('PUT', '/notifications/:id/read', self.mark_read)
+        add('DELETE', '/notifications/read', self.delete_read)
+        add('DELETE', '/notifications/:id', self.delete_notification)
+
+        add('PUT', '/users/update-user', self.update_user)
+
+    def invalid_id(self, req):
+        if not OBJECT_ID.match(req.params.get('id', '')):
+            return 400, {'title': 'Validation Failed', 'message': 'Invalid ID'}, {}
+        return None
+
+    async def root(self, req):
+        return 200, {'name': 'Book-Sharing API (mock)', 'version': '1.0.0', 'status': 'running'}, {}
+
+    async def health(self, req):
+        return 200, {
+            'uptime': time.time() - self.started_at,
+            'timestamp': iso_now(),
+            'status': 'OK',
+            'redis': 'Connected',
+            'database': 'Connected',
+        }, {}
+
+    async def metrics(self, req):
+        return 200, self.render_metrics(), {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
+    async def login(self, req):
+        body = req.json()
+        email, password = body.get('email'), body.get('password')
+        if not email or not password:
+            return 400, {'title': 'Validation Failed', 'message': 'All fields are mandatory'}, {}
+
+        user = self.users.get(email)
+        if user is None:
+            user = self.create_user(email, email.split('@')[0])
+            for i in range(self.seed_notifications):
+                self.notify(user['_id'], 'borrow_request_accepted', 'Borrow Request Accepted',
+                            f'Seed Owner accepted your request to borrow "Seed Book {i + 1}"',
+                            object_id(), f'Seed Book {i + 1}')
+        token = secrets.token_urlsafe(32)
+        refresh = secrets.token_urlsafe(32)
+        self.tokens[token] = user
+        self.refresh_tokens[refresh] = user
+        return 200, {'accessToken': token}, {'Set-Cookie': [
+            f'accessToken={token}; Max-Age=900; Path=/; HttpOnly',
+            f'refreshToken={refresh}; Max-Age=604800; Path=/; HttpOnly',
+        ]}
+
+    async def refresh_token(self, req):
+        refresh = req.cookies.get('refreshToken')
+        if not refresh:
+            return 401, {'message': 'Refresh token not found'}, {}
+        user = self.refresh_tokens.get(refresh)
+        if user is None:
+            return 403, {'message': 'Invalid refresh token'}, {}
+        token = secrets.token_urlsafe(32)
+        self.tokens[token] = user
+        return 200, {'accessToken': token}, {'Set-Cookie': f'accessToken={token}; Max-Age=900; Path=/; HttpOnly'}
+
+    async def current(self, req):
+        return 200, req.user, {}
+
+    async def logout(self, req):
+        token = req.cookies.get('accessToken')
+        self.tokens.pop(token, None)
+        self.refresh_tokens.pop(req.cookies.get('refreshToken'), None)
+        return 200, {'message': 'User logged out successfully'}, {'Set-Cookie': [
+            'refreshToken=; Max-Age=0; Path=/',
+            'accessToken=; Max-Age=0; Path=/',
+        ]}
+
+    async def list_books(self, req):
+        books = sorted(self.books.values(), key=lambda b: b['createdAt'], reverse=True)
+        q = req.query.get('q')
+        if q:
+            books = [b for b in books if q.lower() in b['title'].lower()]
+        page, pages, total, items = self.page(books, req)
+        return 200, {
+            'books': items,
+            'currentPage': page,
+            'totalPages': pages,
+            'totalBooks': total,
+            'hasNextPage': page < pages,
+            'hasPrevPage': page > 1,
+        }, {}
+
+    async def my_books(self, req):
+        uid = req.user['_id']
+        books = [b for b in self.books.values() if b['ownerId']['_id'] == uid]
+        books.sort(key=lambda b: b['createdAt'], reverse=True)
+        page, pages, total, items = self.page(books, req)
+        return 200, {
+            'books': items,
+            'currentPage': page,
+            'totalPages': pages,
+            'totalBooks': total,
+            'hasNextPage': page < pages,
+            'hasPrevPage': page > 1,
+        }, {}
+
+    async def search_books(self, req):
+        term = req.query.get('q', '').strip()
+        if not term:
+            return 400, {'title': 'Validation Failed', 'message': '"q" is required'}, {}
+        needle = term.lower()
+        books = [b for b in self.books.values()
+                 if needle in b['title'].lower() or needle in str(b['authors']).lower()]
+        page, pages, total, items = self.page(books, req)
+        return 200, {
+            'books': items,
+            'searchTerm': term,
+            'currentPage': page,
+            'totalPages': pages,
+            'totalResults': total,
+            'hasNextPage': page < pages,
+            'hasPrevPage': page > 1,
+        }, {}
+
+    async def get_book(self, req):
+        bad = self.invalid_id(req)
+        if bad:
+            return bad
+        book = self.books.get(req.params['id'])
+        if not book:
+            return 404, {'message': 'Book not found'}, {}
+        return 200, book, {}
+
+    async def create_book_route(self, req):
+        content_type = req.headers.get('content-type', '')
+        if content_type.startswith('multipart/form-data'):
+            fields = parse_multipart_fields(req.body, content_type)
+        else:
+            fields = req.json()
+
+        title, authors = fields.get('title'), fields.get('authors')
+        if not title or not authors:
+            return 400, {'message': 'Title and author are required'}, {}
+        if isinstance(authors, list):
+            authors = ', '.join(str(a) for a in authors)
+
+        book = self.create_book(req.user, title, authors, fields.get('category'),
+                                fields.get('description', ''), fields.get('thumbnail'))
+        return 201, book, {}
+
+    async def update_book(self, req):
+        bad = self.invalid_id(req)
+        if bad:
+            return bad
+        book = self.books.get(req.params['id'])
+        if not book:
+            return 404, {'message': 'Book not found'}, {}
+        if book['ownerId']['_id'] != req.user['_id']:
+            return 500, {'message': 'Server error', 'error': 'Not authorized to update this book'}, {}
+        body = req.json()
+        for field in ('title', 'authors', 'description', 'available', 'categories'):
+            if field in body:
+                book[field] = body[field]
+        book['updatedAt'] = iso_now()
+        return 200, book, {}
+
+    async def delete_book(self, req):
+        bad = self.invalid_id(req)
+        if bad:
+            return bad
+        book = self.books.get(req.params['id'])
+        if not book:
+            return 404, {'message': 'Book not found'}, {}
+        del self.books[book['_id']]
+        return 200, {'message': 'Book deleted successfully'}, {}
+
+    async def create_borrow(self, req):
+        body = req.json()
+        book = self.books.get(str(body.get('bookId')))
+        if not book:
+            return 404, {'status': 'error', 'message': 'Book not found'}, {}
+        if not book['available']:
+            return 400, {'status': 'error', 'message': 'Book is not available'}, {}
+        uid = req.user['_id']
+        if book['ownerId']['_id'] == uid:
+            return 400, {'status': 'error', 'message': 'You cannot borrow your own book'}, {}
+        for b in self.borrows.values():
+            if b['bookId'] == book['_id'] and b['borrowerId'] == uid and b['status'] == 'pending':
+                return 400, {'status': 'error', 'message': 'You already have a pending request for this book'}, {}
+
+        now = iso_now()
+        borrow = {
+            '_id': object_id(),
+            'bookId': book['_id'],
+            'borrowerId': uid,
+            'ownerId': book['ownerId']['_id'],
+            'status': 'pending',
+            'requestDate': now,
+            'dueDate': body.get('endDate'),
+            'createdAt': now,
+            'updatedAt': now,
+        }
+        self.borrows[borrow['_id']] = borrow
+        self.notify(borrow['ownerId'], 'borrow_request_new', 'New Borrow Request',
+                    f"{req.user['name']} wants to borrow your book \"{book['title']}\"",
+                    borrow['_id'], book['title'])
+        return 201, {'status': 'success', 'message': 'Borrow request created successfully', 'borrow': borrow}, {}
+
+    def borrow_transition(self, target, required):
+        async def handler(req):
+            bad = self.invalid_id(req)
+            if bad:
+                return bad
+            borrow = self.borrows.get(req.params['id'])
+            if not borrow:
+                return 404, {'title': 'Not Found', 'message': 'Borrow request not found'}, {}
+            actor = borrow['borrowerId'] if target == 'returned' else borrow['ownerId']
+            if actor != req.user['_id']:
+                return 403, {'title': 'Forbidden', 'message': 'Not allowed'}, {}
+            if borrow['status'] != required:
+                return 400, {'title': 'Validation Failed', 'message': f"Borrow is not {required}"}, {}
+            borrow['status'] = target
+            borrow['updatedAt'] = iso_now()
+            book = self.books.get(borrow['bookId'])
+            if book:
+                book['available'] = target != 'accepted'
+            return 200, {'status': 'success', 'borrow': borrow}, {}
+        return handler
+
+    async def my_requests(self, req):
+        uid = req.user['_id']
+        return 200, {'status': 'success', 'borrows': [b for b in self.borrows.values() if b['borrowerId'] == uid]}, {}
+
+    async def my_borrows(self, req):
+        uid = req.user['_id']
+        borrows = [b for b in self.borrows.values()
+                   if b['ownerId'] == uid and b['status'] in ('accepted', 'returned')]
+        return 200, {'status': 'success', 'borrows': borrows}, {}
+
+    async def pending_requests(self, req):
+        uid = req.user['_id']
+        borrows = [b for b in self.borrows.values() if b['ownerId'] == uid and b['status'] == 'pending']
+        return 200, {'status': 'success', 'borrows': borrows}, {}
+
+    async def get_borrow(self, req):
+        bad = self.invalid_id(req)
+        if bad:
+            return bad
+        borrow = self.borrows.get(req.params['id'])
+        if not borrow:
+            return 404, {'title': 'Not Found', 'message': 'Borrow request not found'}, {}
+        return 200, {'status': 'success', 'borrow': borrow}, {}
+
+    async def all_borrows(self, req):
+        uid = req.user['_id']
+        borrows = [b for b in self.borrows.values() if uid in (b['borrowerId'], b['ownerId'])]
+        return 200, {'status': 'success', 'borrows': borrows}, {}
+
+    async def delete_borrow(self, req):
+        bad = self.invalid_id(req)
+        if bad:
+            return bad
+        borrow = self.borrows.get(req.params['id'])
+        if not borrow:
+            return 404, {'title': 'Not Found', 'message': 'Borrow request not found'}, {}
+        if borrow['borrowerId'] != req.user['_id'] or borrow['status'] != 'pending':
+            return 403, {'title': 'Forbidden', 'message': 'Only pending requests can be cancelled'}, {}
+        del self.borrows[borrow['_id']]
+        return 200, {'status': 'success', 'message': 'Borrow request deleted'}, {}
+
+    def user_notifications(self, req):
+        uid = req.user['_id']
+        notifs = [n for n in self.notifications.values() if n['userId'] == uid]
+        notifs.sort(key=lambda n: n['createdAt'], reverse=True)
+        return notifs
+
+    async def unread_count(self, req):
+        count = sum(1 for n in self.user_notifications(req) if not n['read'])
+        return 200, {'status': 'success', 'unreadCount': count}, {}
+
+    async def list_notifications(self, req):
+        notifs = self.user_notifications(req)
+        unread = sum(1 for n in notifs if not n['read'])
+        if req.query.get('unreadOnly') == 'true':
+            notifs = [n for n in notifs if not n['read']]
+        return 200, {'status': 'success', 'notifications': notifs[:50], 'unreadCount': unread}, {}
+
+    async def mark_read(self, req):
+        bad = self.invalid_id(req)
+        if bad:
+            return bad
+        notif = self.notifications.get(req.params['id'])
+        if not notif or notif['userId'] != req.user['_id']:
+            return 404, {'status': 'error', 'message': 'Notification not found'}, {}
+        notif['read'] = True
+        return 200, {'status': 'success', 'notification': notif}, {}
+
+    async def read_all(self, req):
+        for n in self.user_notifications(req):
+            n['read'] = True
+        return 200, {'status': 'success', 'message': 'All notifications marked as read'}, {}
+
+    async def delete_read(self, req):
+        for n in [n for n in self.user_notifications(req) if n['read']]:
+            del self.notifications[n['_id']]
+        return 200, {'status': 'success', 'message': 'Read notifications deleted'}, {}
+
+    async def delete_notification(self, req):
+        bad = self.invalid_id(req)
+        if bad:
+            return bad
+        notif = self.notifications.get(req.params['id'])
+        if not notif or notif['userId'] != req.user['_id']:
+            return 404, {'status': 'error', 'message': 'Notification not found'}, {}
+        del self.notifications[notif['_id']]
+        return 200, {'status': 'success', 'message': 'Notification deleted'}, {}
+
+    async def update_user(self, req):
+        name = req.json().get('name')
+        if name:
+            req.user['name'] = name
+        user = req.user
+        return 200, {'message': 'User updated successfully',
+                     'user': {'_id': user['_id'], 'name': user['name'], 'email': user['email']}}, {}
+
+    # ---------- metrics ----------
+
+    def render_metrics(self):
+        """Prometheus text exposition using the backend's metric names"""
+        instance = self.hostname
+        out = [
+            '# HELP http_requests_total Total number of HTTP requests',
+            '# TYPE http_requests_total counter',
+        ]
+        for (method, route, status), count in sorted(self.request_counts.items()):
+            out.append(f'http_requests_total{{method="{method}",route="{route}",status="{status}",'
+                       f'instance="{instance}"}} {count}')
+
+        out += [
+            '# HELP http_request_duration_ms HTTP request duration in milliseconds',
+            '# TYPE http_request_duration_ms histogram',
+        ]
+        for (method, route, status), hist in sorted(self.duration_hist.items()):
+            labels = f'method="{method}",route="{route}",status="{status}",instance="{instance}"'
+            for bound, count in zip(DEFAULT_BUCKETS, hist):
+                out.append(f'http_request_duration_ms_bucket{{le="{bound}",{labels}}} {count}')
+            out.append(f'http_request_duration_ms_bucket{{le="+Inf",{labels}}} {hist[-2]}')
+            out.append(f'http_request_duration_ms_sum{{{labels}}} {hist[-1]:.3f}')
+            out.append(f'http_request_duration_ms_count{{{labels}}} {hist[-2]}')
+
+        out += [
+            '# HELP rate_limit_blocked_total Total number of requests blocked by rate limiter',
+            '# TYPE rate_limit_blocked_total counter',
+            f'rate_limit_blocked_total {self.rate_limit_blocked}',
+            '# HELP rate_limit_allowed_total Total number of requests allowed by rate limiter',
+            '# TYPE rate_limit_allowed_total counter',
+            f'rate_limit_allowed_total {self.rate_limit_allowed}',
+        ]
+
+        cpu = os.times()
+        out += [
+            '# HELP process_cpu_user_seconds_total Total user CPU time spent in seconds.',
+            '# TYPE process_cpu_user_seconds_total counter',
+            f'process_cpu_user_seconds_total{{service="mock",instance="{instance}"}} {cpu.user:.3f}',
+            '# HELP process_cpu_system_seconds_total Total system CPU time spent in seconds.',
+            '# TYPE process_cpu_system_seconds_total counter',
+            f'process_cpu_system_seconds_total{{service="mock",instance="{instance}"}} {cpu.system:.3f}',
+        ]
+        rss = resident_memory_bytes()
+        if rss is not None:
+            out += [
+                '# HELP process_resident_memory_bytes Resident memory size in bytes.',
+                '# TYPE process_resident_memory_bytes gauge',
+                f'process_resident_memory_bytes{{service="mock",instance="{instance}"}} {rss}',
+            ]
+        return '\n'.join(out) + '\n'
+
+
+def resident_memory_bytes():
+    """RSS of this process (Linux only)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def parse_multipart_fields(body, content_type):
+    """Extract text fields from a multipart/form-data body (file parts are skipped)"""
+    m = re.search(r'boundary="?([^";]+)"?', content_type)
+    if not m:
+        return {}
+    fields = {}
+    for part in body.split(b'--' + m.group(1).encode()):
+        head, sep, value = part.partition(b'\r\n\r\n')
+        if not sep or b'filename=' in head:
+            continue
+        name = re.search(rb'name="([^"]+)"', head)
+        if name:
+            fields[name.group(1).decode()] = value.rstrip(b'\r\n').decode('utf-8', 'replace')
+    return fields
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Mock Book-Sharing backend for offline harness work')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=3000)
+    parser.add_argument('--latency', default='none',
+                        help='Default latency: none | constant:MS | uniform:LO:HI | exponential:MEAN | '
+                             'lognormal:MEDIAN:SIGMA')
+    parser.add_argument('--route-latency', action='append', default=[], metavar='"METHOD /route=SPEC"',
+                        help="Per-route latency override, e.g. 'GET /books/search=uniform:80:300' (repeatable)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests failing (0-1)')
+    parser.add_argument('--error-status', type=int, default=500)
+    parser.add_argument('--rate-limit', type=int, default=0, help='Requests per window per client IP (0 = off)')
+    parser.add_argument('--rate-window-ms', type=int, default=15 * 60 * 1000)
+    parser.add_argument('--books', type=int, default=60, help='Number of seeded books')
+    parser.add_argument('--notifications', type=int, default=0,
+                        help='Notifications seeded for each user on first login')
+    parser.add_argument('--seed', type=int, default=None, help='Seed for latency/error sampling')
+    return parser
+
+
+def main():
+    args = build_parser().parse_args()
+    try:
+        app = MockBackend(latency=args.latency, route_latency=args.route_latency,
+                          error_rate=args.error_rate, error_status=args.error_status,
+                          rate_limit=args.rate_limit, rate_window_ms=args.rate_window_ms,
+                          books=args.books, notifications=args.notifications,
+                          seed=args.seed)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 2
+
+    print(f"🚀 Mock backend listening on http://{args.host}:{args.port}")
+    print(f"   Latency: {args.latency}  Errors: {args.error_rate:.1%}  "
+          f"Rate limit: {args.rate_limit or 'off'}")
+    asyncio.run(app.serve(args.host, args.port))
+    return 0
+
+
+if __name__ == '__main__':
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        print("\n\nMock backend stopped")
+        sys.exit(130)
@@ -0,0 +1,167 @@
+"""
+Read-Model Projection Lag Report
+For ProjectionLagUser (scenarios.py): how long a created or updated book takes to
+show up on the read side (/books/my-books, GET /books and /books/search), relative
+to the book write throughput of the whole run.
+
+Each tracked write fires one 'LAG' event per read endpoint once the book (with its
+new title) is visible, or a failed one when LOCUST_PROJECTION_TIMEOUT passes first.
+Every successful POST/PUT/DELETE under /books from any user class counts as a write,
+so WriteHeavyUser running alongside raises the measured write rate. Lags and write
+counts are kept per RATE_WINDOW seconds and merged on the master; at test stop each
+window is assigned to its write-rate bucket.
+
+Enabled automatically when ProjectionLagUser is in the run; results go to
+LOCUST_PROJECTION_LAG_REPORT (default projection-lag-<time>.json).
+"""
+
+import json
+import os
+from datetime import datetime
+from urllib.parse import urlsplit
+
+from locust import events
+from locust.runners import WorkerRunner
+
+from histograms import add_sample, from_json, hist_percentile, merge_hist
+
+RATE_WINDOW = 10  # seconds over which the write rate is averaged
+RATE_BUCKETS = (0, 1, 2, 5, 10, 20, 50)  # lower bounds in writes/s
+WRITE_METHODS = ('POST', 'PUT', 'PATCH', 'DELETE')
+REPORT_PATH = os.getenv('LOCUST_PROJECTION_LAG_REPORT')
+
+_state = {'active': False, 'writes': {}, 'lags': {}, 'timeouts': {}, 'displaced': {}}
+
+
+def enabled(environment):
+    return any(cls.__name__ == 'ProjectionLagUser' for cls in environment.user_classes)
+
+
+def displaced(series):
+    """The book fell off page 1 before it was seen (newer books pushed it out)"""
+    if _state['active']:
+        _state['displaced'][series] = _state['displaced'].get(series, 0) + 1
+
+
+def rate_bucket(rate):
+    return max(low for low in RATE_BUCKETS if rate >= low)
+
+
+@events.test_start.add_listener
+def on_test_start(environment, **kwargs):
+    _state.update(active=enabled(environment), writes={}, lags={}, timeouts={}, displaced={})
+
+
+@events.request.add_listener
+def on_request(request_type, name, response_time, context=None, exception=None, start_time=None,
+               url=None, **kwargs):
+    if not _state['active']:
+        return
+    if request_type == 'LAG':
+        window = int((context or {}).get('written_at', start_time or 0)) // RATE_WINDOW
+        if exception:
+            timeouts = _state['timeouts'].setdefault(window, {})
+            timeouts[name] = timeouts.get(name, 0) + 1
+        else:
+            add_sample(_state['lags'].setdefault(window, {}).setdefault(name, {}), response_time)
+        return
+    if (request_type in WRITE_METHODS and not exception and start_time
+            and urlsplit(url or '').path.startswith('/books')):
+        window = int(start_time) // RATE_WINDOW
+        _state['writes'][window] = _state['writes'].get(window, 0) + 1
+
+
+@events.report_to_master.add_listener
+def on_report_to_master(client_id, data):
+    if not _state['active']:
+        return
+    data['projection_lag'] = {
+        'writes': {str(w): n for w, n in _state['writes'].items()},
+        'lags': {str(w): series for w, series in _state['lags'].items()},
+        'timeouts': {str(w): series for w, series in _state['timeouts'].items()},
+        'displaced': _state['displaced'],
+    }
+    _state.update(writes={}, lags={}, timeouts={}, displaced={})
+
+
+@events.worker_report.add_listener
+def on_worker_report(client_id, data):
+    report = data.get('projection_lag')
+    if not report:
+        return
+    for window, n in report['writes'].items():
+        _state['writes'][int(window)] = _state['writes'].get(int(window), 0) + n
+    for window, series in report['lags'].items():
+        for name, hist in series.items():
+            merge_hist(_state['lags'].setdefault(int(window), {}).setdefault(name, {}), from_json(hist))
+    for window, series in report['timeouts'].items():
+        timeouts = _state['timeouts'].setdefault(int(window), {})
+        for name, n in series.items():
+            timeouts[name] = timeouts.get(name, 0) + n
+    for name, n in report['displaced'].items():
+        _state['displaced'][name] = _state['displaced'].get(name, 0) + n
+
+
+def lag_row(hist, timeouts):
+    return {
+        'seen': sum(hist.values()),
+        'timeouts': timeouts,
+        **{f'p{q * 100:g}_ms': hist_percentile(hist, q) for q in (0.5, 0.95, 0.99)},
+    }
+
+
+@events.test_stop.add_listener
+def on_test_stop(environment, **kwargs):
+    if not _state['active'] or isinstance(environment.runner, WorkerRunner):
+        return
+
+    windows = sorted(set(_state['writes']) | set(_state['lags']) | set(_state['timeouts']))
+    overall = {}
+    by_rate = {}
+    for window in windows:
+        rate = _state['writes'].get(window, 0) / RATE_WINDOW
+        bucket = by_rate.setdefault(rate_bucket(rate), {'windows': 0, 'writes': 0, 'series': {}})
+        bucket['windows'] += 1
+        bucket['writes'] += _state['writes'].get(window, 0)
+        names = set(_state['lags'].get(window, {})) | set(_state['timeouts'].get(window, {}))
+        for name in names:
+            hist = _state['lags'].get(window, {}).get(name, {})
+            timeouts = _state['timeouts'].get(window, {}).get(name, 0)
+            for target in (overall.setdefault(name, {'hist': {}, 'timeouts': 0}),
+                           bucket['series'].setdefault(name, {'hist': {}, 'timeouts': 0})):
+                merge_hist(target['hist'], hist)
+                target['timeouts'] += timeouts
+
+    report = {
+        'rate_window_s': RATE_WINDOW,
+        'writes': sum(_state['writes'].values()),
+        'peak_writes_per_s': max(_state['writes'].values(), default=0) / RATE_WINDOW,
+        'overall': {name: lag_row(s['hist'], s['timeouts']) for name, s in sorted(overall.items())},
+        'by_write_rate': [
+            {
+                'writes_per_s_min': low,
+                'windows': b['windows'],
+                'writes_per_s': b['writes'] / (b['windows'] * RATE_WINDOW),
+                'series': {name: lag_row(s['hist'], s['timeouts']) for name, s in sorted(b['series'].items())},
+            }
+            for low, b in sorted(by_rate.items())
+        ],
+        'displaced': _state['displaced'],
+    }
+
+    print(f"\n🪞 Projection Lag ({report['writes']} book writes, peak {report['peak_writes_per_s']:.1f}/s):")
+    print(f"  {'Writes/s':<10}{'Series':<34}{'seen':>7}{'t/o':>6}{'p50':>7}{'p95':>7}{'p99':>7}")
+    for b in [{'writes_per_s_min': 'all', 'series': report['overall']}] + report['by_write_rate']:
+        label = b['writes_per_s_min'] if b['writes_per_s_min'] == 'all' else f"{b['writes_per_s_min']}+"
+        for name, r in b['series'].items():
+            print(f"  {label:<10}{name:<34}{r['seen']:>7}{r['timeouts']:>6}"
+                  + ''.join(f"{r[k] if r[k] is not None else '-':>7}" for k in ('p50_ms', 'p95_ms', 'p99_ms')))
+            label = ''
+    if _state['displaced']:
+        print("  ℹ️  Pushed off page 1 before being seen: "
+              + ', '.join(f'{name} {n}' for name, n in sorted(_state['displaced'].items())))
+
+    path = REPORT_PATH or f"projection-lag-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"  Report: {path}")
@@ -0,0 +1,114 @@
+"""
+Prometheus Metrics Helpers
+Parses the backend's /metrics text exposition and samples every replica directly
+(nginx round-robins /metrics, so per-replica data needs per-replica targets).
+
+Targets come from LOCUST_METRICS_TARGETS (comma-separated /metrics URLs); the
+default matches the replica hostnames in infra/prometheus/prometheus.yml.
+"""
+
+import os
+import re
+import time
+
+import gevent
+import requests
+
+DEFAULT_TARGETS = ','.join(
+    f'http://book-sharing-backend-{i}:3000/metrics' for i in (1, 2, 3)
+)
+METRICS_TARGETS = [
+    t.strip() for t in os.getenv('LOCUST_METRICS_TARGETS', DEFAULT_TARGETS).split(',') if t.strip()
+]
+TIMEOUT = 5
+
+SAMPLE_LINE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(.*)\})?\s+(\S+)')
+LABEL_PAIR = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)="((?:[^"\\]|\\.)*)"')
+
+
+def parse_metrics(content):
+    """Parse exposition text into a list of (name, labels, value)"""
+    samples = []
+    for line in content.split('\n'):
+        if not line or line.startswith('#'):
+            continue
+        m = SAMPLE_LINE.match(line)
+        if not m:
+            continue
+        name, raw_labels, raw_value = m.groups()
+        try:
+            value = float(raw_value)
+        except ValueError:
+            continue
+        labels = {}
+        if raw_labels:
+            for key, val in LABEL_PAIR.findall(raw_labels):
+                labels[key] = val.replace('\\"', '"').replace('\\n', '\n').replace('\\\\', '\\')
+        samples.append((name, labels, value))
+    return samples
+
+
+def metric_sum(samples, name, **match):
+    """Sum of all samples of a metric whose labels include match"""
+    return sum(
+        value for n, labels, value in samples
+        if n == name and all(labels.get(k) == v for k, v in match.items())
+    )
+
+
+def metric_value(samples, name, default=None):
+    """First sample value of a metric (for unlabelled-by-route gauges like RSS)"""
+    for n, _, value in samples:
+        if n == name:
+            return value
+    return default
+
+
+def fetch_metrics(url, timeout=TIMEOUT):
+    """Fetch and parse one target; returns None if it cannot be scraped"""
+    try:
+        resp = requests.get(url, timeout=timeout)
+    except requests.exceptions.RequestException:
+        return None
+    if resp.status_code != 200:
+        return None
+    return parse_metrics(resp.text)
+
+
+def scrape_all(targets=None):
+    """Scrape targets concurrently: {target: samples or None}"""
+    targets = targets or METRICS_TARGETS
+    jobs = {t: gevent.spawn(fetch_metrics, t) for t in targets}
+    gevent.joinall(list(jobs.values()), timeout=TIMEOUT + 1)
+    return {t: job.value for t, job in jobs.items()}
+
+
+class ReplicaSampler:
+    """Background greenlet scraping every target each interval and calling on_sample(ts, scrapes)"""
+
+    def __init__(self, on_sample, interval=15, targets=None):
+        self.on_sample = on_sample
+        self.interval = interval
+        self.targets = targets or METRICS_TARGETS
+        self._greenlet = None
+
+    def start(self):
+        if self._greenlet is None:
+            self._greenlet = gevent.spawn(self._run)
+
+    def stop(self):
+        if self._greenlet is not None:
+            self._greenlet.kill(block=False)
+            self._greenlet = None
+
+    def sample_now(self):
+        self.on_sample(time.time(), scrape_all(self.targets))
+
+    def _run(self):
+        while True:
+            started = time.time()
+            try:
+                self.sample_now()
+            except Exception as e:
+                print(f"❌ Metrics sampling failed: {e}")
+            gevent.sleep(max(0.0, self.interval - (time.time() - started)))
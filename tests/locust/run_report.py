@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""
+Unified Run Report
+Puts client and server data of one run on a single timeline: every sample interval
+the master records users, RPS and current p50/p95/p99 per request name from Locust's
+stats and scrapes every replica (request rate, cache hit ratio, rate-limit blocks,
+V8 heap, RSS). Both come from the same tick, so no clock alignment is needed
+afterwards.
+
+Phase markers are added when the target user count changes (ramp steps, spikes,
+load shapes), when a ramp completes, when a replica restarts, and wherever a
+scenario calls run_report.mark(label).
+
+At test stop the series are downsampled to at most LOCUST_RUN_REPORT_MAX_POINTS
+points (rates averaged, percentiles and memory kept at their bucket maximum, so
+spikes survive), then written as <out>.json and a self-contained <out>.html with
+inline SVG charts.
+
+Environment:
+  LOCUST_RUN_REPORT=1               enable
+  LOCUST_RUN_REPORT_INTERVAL        seconds between samples            (default 5)
+  LOCUST_RUN_REPORT_MAX_POINTS      points per series after downsampling (default 720)
+  LOCUST_RUN_REPORT_NAMES           request names charted, by volume   (default 8)
+  LOCUST_RUN_REPORT_OUT             output path without extension      (default run-report-<time>)
+
+Usage:
+LOCUST_RUN_REPORT=1 locust -f scenarios.py SoakTestUser --headless -u 50 -r 5 -t 8h
+python run_report.py run-report-20250101-120000.json -o soak.html --max-points 300
+"""
+
+import argparse
+import html
+import json
+import math
+import os
+import sys
+import time
+from datetime import datetime
+
+from locust import events
+from locust.runners import WorkerRunner
+
+from prom_metrics import ReplicaSampler, metric_sum, metric_value
+
+MB = 1024 * 1024
+ENABLED = os.getenv('LOCUST_RUN_REPORT', '').lower() in ('1', 'true', 'yes')
+INTERVAL = float(os.getenv('LOCUST_RUN_REPORT_INTERVAL', 5))
+MAX_POINTS = int(os.getenv('LOCUST_RUN_REPORT_MAX_POINTS', 720))
+TOP_NAMES = int(os.getenv('LOCUST_RUN_REPORT_NAMES', 8))
+OUT_PATH = os.getenv('LOCUST_RUN_REPORT_OUT')
+QUANTILES = (0.5, 0.95, 0.99)
+
+# Series that are averaged when downsampling; everything else keeps the bucket maximum
+MEAN_SERIES = {'rps', 'fail_rps', 'requests_per_s', 'cache_hit_pct', 'rate_limit_blocked_per_s'}
+
+_state = {'sampler': None, 'started': None, 'samples': [], 'markers': [], 'counters': {}, 'target': None}
+
+
+def mark(label, ts=None):
+    """Add a phase marker now or at ts (no-op unless the report is running)"""
+    if _state['sampler'] is not None:
+        _state['markers'].append({'t': (ts or time.time()) - _state['started'], 'label': label})
+
+
+# ==================== SAMPLING ====================
+
+def short_target(target):
+    return target.split('//')[-1].split('/')[0]
+
+
+def counter_rate(target, key, value, ts):
+    """Per-second rate of a counter since the previous sample; None on the first sample or a reset"""
+    previous = _state['counters'].get((target, key))
+    _state['counters'][(target, key)] = (ts, value)
+    if previous is None or value < previous[1] or ts <= previous[0]:
+        return None
+    return (value - previous[1]) / (ts - previous[0])
+
+
+def replica_point(target, samples, ts):
+    if samples is None:
+        return {'up': False}
+    hits = counter_rate(target, 'hits', metric_sum(samples, 'cache_hits_total'), ts)
+    misses = counter_rate(target, 'misses', metric_sum(samples, 'cache_misses_total'), ts)
+    start = metric_value(samples, 'process_start_time_seconds')
+    known = _state['counters'].get((target, 'start'))
+    if start is not None and known is not None and start != known[1]:
+        mark(f'{short_target(target)} restarted', ts)
+    if start is not None:
+        _state['counters'][(target, 'start')] = (ts, start)
+    lookups = hits + misses if hits is not None and misses is not None else 0
+    heap = metric_value(samples, 'nodejs_heap_size_used_bytes')
+    rss = metric_value(samples, 'process_resident_memory_bytes')
+    return {
+        'up': True,
+        'requests_per_s': counter_rate(target, 'requests', metric_sum(samples, 'http_requests_total'), ts),
+        'cache_hit_pct': 100 * hits / lookups if lookups else None,
+        'rate_limit_blocked_per_s': counter_rate(target, 'blocked',
+                                                 metric_sum(samples, 'rate_limit_blocked_total'), ts),
+        'heap_mb': heap / MB if heap is not None else None,
+        'rss_mb': rss / MB if rss is not None else None,
+    }
+
+
+def client_point(environment, ts):
+    runner = environment.runner
+    target = getattr(runner, 'target_user_count', None)
+    if target is not None and target != _state['target']:
+        if _state['target'] is not None:
+            mark(f'ramp {_state["target"]} -> {target} users', ts)
+        _state['target'] = target
+
+    def stats_point(entry):
+        return {
+            'rps': entry.current_rps,
+            'fail_rps': entry.current_fail_per_sec,
+            **{f'p{q * 100:g}': entry.get_current_response_time_percentile(q) for q in QUANTILES},
+        }
+
+    return {
+        'users': runner.user_count,
+        'total': stats_point(environment.stats.total),
+        'names': {
+            f'{method} {name}': stats_point(entry)
+            for (name, method), entry in environment.stats.entries.items() if entry.num_requests
+        },
+    }
+
+
+def _record(environment):
+    def on_sample(ts, scrapes):
+        _state['samples'].append({
+            't': ts - _state['started'],
+            'client': client_point(environment, ts),
+            'replicas': {target: replica_point(target, samples, ts) for target, samples in scrapes.items()},
+        })
+    return on_sample
+
+
+# ==================== SERIES & DOWNSAMPLING ====================
+
+def downsample(values, factor, key):
+    """Merge every `factor` points: mean for rates, max otherwise (None-aware)"""
+    if factor <= 1:
+        return values
+    out = []
+    for i in range(0, len(values), factor):
+        bucket = [v for v in values[i:i + factor] if v is not None]
+        if not bucket:
+            out.append(None)
+        elif key in MEAN_SERIES:
+            out.append(sum(bucket) / len(bucket))
+        else:
+            out.append(max(bucket))
+    return out
+
+
+def build_series(samples, markers, stats_summary, interval, max_points):
+    """Columnar, downsampled report from the raw samples"""
+    factor = max(1, math.ceil(len(samples) / max_points)) if max_points else 1
+    t = [s['t'] for s in samples][::factor]
+
+    def column(getter, key):
+        return downsample([getter(s) for s in samples], factor, key)
+
+    client = {'users': column(lambda s: s['client']['users'], 'users')}
+    for key in ('rps', 'fail_rps', 'p50', 'p95', 'p99'):
+        client[key] = column(lambda s, k=key: s['client']['total'][k], key)
+
+    names = sorted({n for s in samples for n in s['client']['names']},
+                   key=lambda n: -stats_summary.get(n, {}).get('requests', 0))
+    requests_ = {
+        name: {key: column(lambda s, n=name, k=key: s['client']['names'].get(n, {}).get(k), key)
+               for key in ('rps', 'p50', 'p95', 'p99')}
+        for name in names
+    }
+
+    targets = sorted({target for s in samples for target in s['replicas']})
+    replicas = {
+        target: {key: column(lambda s, tg=target, k=key: s['replicas'].get(tg, {}).get(k), key)
+                 for key in ('requests_per_s', 'cache_hit_pct', 'rate_limit_blocked_per_s', 'heap_mb', 'rss_mb')}
+        for target in targets
+    }
+
+    return {
+        'generated': datetime.now().isoformat(timespec='seconds'),
+        'duration_s': samples[-1]['t'] if samples else 0,
+        'sample_interval_s': interval,
+        'resolution_s': interval * factor,
+        't': t,
+        'markers': markers,
+        'client': client,
+        'requests': requests_,
+        'replicas': replicas,
+        'summary': stats_summary,
+    }
+
+
+def stats_summary(environment):
+    summary = {}
+    for (name, method), entry in environment.stats.entries.items():
+        if not entry.num_requests:
+            continue
+        summary[f'{method} {name}'] = {
+            'requests': entry.num_requests,
+            'failures': entry.num_failures,
+            'avg_ms': entry.avg_response_time,
+            **{f'p{q * 100:g}_ms': entry.get_response_time_percentile(q) for q in QUANTILES},
+            'max_ms': entry.max_response_time,
+        }
+    return summary
+
+
+# ==================== HTML ====================
+
+PALETTE = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b', '#e377c2', '#7f7f7f',
+           '#bcbd22', '#17becf']
+WIDTH, HEIGHT, PAD_L, PAD_R, PAD_T, PAD_B = 960, 220, 60, 20, 14, 28
+
+
+def fmt_time(seconds):
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f'{seconds // 3600}h{seconds % 3600 // 60:02d}'
+    return f'{seconds // 60}:{seconds % 60:02d}'
+
+
+def nice_max(value):
+    if value <= 0:
+        return 1
+    magnitude = 10 ** math.floor(math.log10(value))
+    for step in (1, 2, 2.5, 5, 10):
+        if value <= step * magnitude:
+            return step * magnitude
+    return 10 * magnitude
+
+
+def svg_chart(title, unit, t, series, markers, duration):
+    """Inline SVG line chart; series is [(label, values)], gaps where values are None"""
+    top = nice_max(max((v for _, values in series for v in values if v is not None), default=0))
+    span = duration or 1
+    plot_w, plot_h = WIDTH - PAD_L - PAD_R, HEIGHT - PAD_T - PAD_B
+
+    def x(sec):
+        return PAD_L + plot_w * sec / span
+
+    def y(value):
+        return PAD_T + plot_h * (1 - value / top)
+
+    out = [f'<svg viewBox="0 0 {WIDTH} {HEIGHT}" width="100%" role="img">']
+    for i in range(5):
+        value = top * i / 4
+        out.append(f'<line x1="{PAD_L}" x2="{WIDTH - PAD_R}" y1="{y(value):.1f}" y2="{y(value):.1f}" class="grid"/>'
+                   f'<text x="{PAD_L - 6}" y="{y(value) + 4:.1f}" class="axis" text-anchor="end">{value:g}</text>')
+    for i in range(7):
+        sec = span * i / 6
+        out.append(f'<text x="{x(sec):.1f}" y="{HEIGHT - 8}" class="axis" text-anchor="middle">{fmt_time(sec)}</text>')
+    for m in markers:
+        out.append(f'<line x1="{x(m["t"]):.1f}" x2="{x(m["t"]):.1f}" y1="{PAD_T}" y2="{PAD_T + plot_h}" class="marker">'
+                   f'<title>{fmt_time(m["t"])} {html.escape(m["label"])}</title></line>')
+    for i, (label, values) in enumerate(series):
+        color = PALETTE[i % len(PALETTE)]
+        segments, current = [], []
+        for sec, value in zip(t, values):
+            if value is None:
+                if current:
+                    segments.append(current)
+                current = []
+            else:
+                current.append(f'{x(sec):.1f},{y(value):.1f}')
+        if current:
+            segments.append(current)
+        for points in segments:
+            out.append(f'<polyline points="{" ".join(points)}" stroke="{color}" class="line">'
+                       f'<title>{html.escape(label)}</title></polyline>')
+    out.append('</svg>')
+
+    legend = ''.join(f'<span><i style="background:{PALETTE[i % len(PALETTE)]}"></i>{html.escape(label)}</span>'
+                     for i, (label, _) in enumerate(series))
+    return (f'<section><h2>{html.escape(title)} <small>{unit}</small></h2>{"".join(out)}'
+            f'<div class="legend">{legend}</div></section>')
+
+
+def render_html(report, top_names=TOP_NAMES):
+    t, markers, duration = report['t'], report['markers'], report['duration_s']
+    client, names = report['client'], list(report['requests'])[:top_names]
+    replicas = report['replicas']
+
+    charts = [
+        ('Users', 'users', [('users', client['users'])]),
+        ('Throughput', 'req/s', [('total', client['rps']), ('failures', client['fail_rps'])]),
+        ('Response time (all requests)', 'ms', [(k, client[k]) for k in ('p50', 'p95', 'p99')]),
+        ('Throughput per request', 'req/s', [(n, report['requests'][n]['rps']) for n in names]),
+        ('p95 per request', 'ms', [(n, report['requests'][n]['p95']) for n in names]),
+    ]
+    for key, title, unit in (('requests_per_s', 'Requests per replica', 'req/s'),
+                             ('cache_hit_pct', 'Cache hit ratio', '%'),
+                             ('rate_limit_blocked_per_s', 'Rate-limit blocks', 'req/s'),
+                             ('heap_mb', 'V8 heap used', 'MB'),
+                             ('rss_mb', 'RSS', 'MB')):
+        series = [(short_target(target), r[key]) for target, r in replicas.items()]
+        if any(v is not None for _, values in series for v in values):
+            charts.append((title, unit, series))
+
+    rows = ''.join(
+        f'<tr><td>{html.escape(name)}</td><td>{s["requests"]}</td><td>{s["failures"]}</td>'
+        + ''.join(f'<td>{s[k]:.0f}</td>' if s.get(k) is not None else '<td>-</td>'
+                  for k in ('avg_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms'))
+        + '</tr>'
+        for name, s in report['summary'].items()
+    )
+    marker_rows = ''.join(f'<li>{fmt_time(m["t"])} {html.escape(m["label"])}</li>' for m in markers)
+
+    return f'''<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Run report {html.escape(report['generated'])}</title>
+<style>
+body {{ font: 14px sans-serif; margin: 24px auto; max-width: 1000px; color: #222; }}
+h2 {{ font-size: 15px; margin: 24px 0 4px; }} small {{ color: #888; font-weight: normal; }}
+.grid {{ stroke: #eee; }} .axis {{ font-size: 11px; fill: #888; }}
+.marker {{ stroke: #c33; stroke-dasharray: 4 3; stroke-width: 1.5; }}
+.line {{ fill: none; stroke-width: 1.5; }}
+.legend span {{ margin-right: 14px; font-size: 12px; white-space: nowrap; }}
+.legend i {{ display: inline-block; width: 10px; height: 10px; margin-right: 4px; }}
+table {{ border-collapse: collapse; font-size: 12px; }} td, th {{ padding: 3px 8px; border-bottom: 1px solid #eee; }}
+td + td {{ text-align: right; }}
+</style></head><body>
+<h1>Run report</h1>
+<p>{fmt_time(duration)} run, one point per {report['resolution_s']:g}s
+(sampled every {report['sample_interval_s']:g}s); generated {html.escape(report['generated'])}.</p>
+<h2>Phases</h2><ul>{marker_rows}</ul>
+{''.join(svg_chart(title, unit, t, series, markers, duration) for title, unit, series in charts)}
+<h2>Requests</h2>
+<table><tr><th>Name</th><th>requests</th><th>failures</th><th>avg</th><th>p50</th><th>p95</th><th>p99</th>
+<th>max</th></tr>{rows}</table>
+</body></html>
+'''
+
+
+def write_report(report, base):
+    with open(f'{base}.json', 'w') as f:
+        json.dump(report, f)
+    with open(f'{base}.html', 'w', encoding='utf-8') as f:
+        f.write(render_html(report))
+
+
+# ==================== LOCUST HOOKS ====================
+
+@events.test_start.add_listener
+def on_test_start(environment, **kwargs):
+    if not ENABLED or isinstance(environment.runner, WorkerRunner):
+        return
+    _state.update(started=time.time(), samples=[], markers=[{'t': 0, 'label': 'start'}], counters={}, target=None)
+    sampler = ReplicaSampler(_record(environment), interval=INTERVAL)
+    _state['sampler'] = sampler
+    sampler.start()
+    print(f"📈 Run report: sampling client stats and {len(sampler.targets)} replicas every {INTERVAL:g}s")
+
+
+@events.spawning_complete.add_listener
+def on_spawning_complete(user_count, **kwargs):
+    mark(f'{user_count} users running')
+
+
+@events.test_stop.add_listener
+def on_test_stop(environment, **kwargs):
+    sampler = _state['sampler']
+    if sampler is None:
+        return
+    sampler.stop()
+    sampler.sample_now()
+    mark('stop')
+    _state['sampler'] = None
+
+    report = build_series(_state['samples'], _state['markers'], stats_summary(environment), INTERVAL, MAX_POINTS)
+    base = OUT_PATH or f"run-report-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+    write_report(report, base)
+    print(f"\n📈 Run report: {len(_state['samples'])} samples, {len(_state['markers'])} markers "
+          f"-> {base}.html, {base}.json")
+
+
+# ==================== CLI ====================
+
+def main():
+    parser = argparse.ArgumentParser(description='Re-render a run report (e.g. with coarser downsampling)')
+    parser.add_argument('report', help='run-report-*.json written at test stop')
+    parser.add_argument('-o', '--output', default=None, help='HTML path (default: next to the JSON)')
+    parser.add_argument('--max-points', type=int, default=None, help='Downsample further to this many points')
+    parser.add_argument('--names', type=int, default=TOP_NAMES, help='Request names charted')
+    args = parser.parse_args()
+
+    with open(args.report) as f:
+        report = json.load(f)
+    if args.max_points and len(report['t']) > args.max_points:
+        factor = math.ceil(len(report['t']) / args.max_points)
+        report['t'] = report['t'][::factor]
+        report['resolution_s'] *= factor
+        for group in [report['client'], *report['requests'].values(), *report['replicas'].values()]:
+            for key, values in group.items():
+                group[key] = downsample(values, factor, key)
+
+    path = args.output or os.path.splitext(args.report)[0] + '.html'
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(render_html(report, args.names))
+    print(f"✅ {len(report['t'])} points, {len(report['markers'])} markers -> {path}")
+    return 0
+
+
+if __name__ == '__main__':
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        print("\n\nRun report interrupted by user")
+        sys.exit(130)
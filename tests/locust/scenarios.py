@@ -3,18 +3,55 @@ Different Load Test Scenarios for Book-Sharing Platform
 Usage: locust -f scenarios.py ScenarioClassName
 """
 
+import csv
+import heapq
 import os
-import random
 import time
-from locust import HttpUser, task, between, constant, constant_pacing
+
+import gevent
+from gevent.pool import Pool
+from locust import HttpUser, task, constant, constant_pacing, constant_throughput
+from locust.contrib.fasthttp import FastHttpUser
+
+import auth_churn
+import connection_policy
+import cron_interference  # noqa: F401 - due-date job interference runs (LOCUST_CRON_INTERFERENCE=1)
+import event_log  # noqa: F401 - per-request binary event log (LOCUST_EVENT_LOG=<dir>)
+import idle_cost  # noqa: F401 - backend cost report for IdleTabsUser
+import journey
+import latency_breakdown  # noqa: F401 - server vs client latency decomposition (LOCUST_LATENCY_BREAKDOWN=1)
+import projection_lag
+import run_report  # noqa: F401 - unified client/server timeline report (LOCUST_RUN_REPORT=1)
+import soak_monitor  # noqa: F401 - registers soak leak/drift analysis listeners
+import seeding
+import tail_exemplars
+import thumbnail_upload
+import workload_mix
 
 
 TEST_EMAIL = os.getenv('LOCUST_USER_EMAIL', 'locust-test@example.com')
 TEST_PASSWORD = os.getenv('LOCUST_USER_PASSWORD', '12345678')
 BACKEND_HOST = os.getenv('LOCUST_HOST', 'http://localhost:3000')
+RUN_TAG = os.getenv('LOCUST_RUN_TAG', 'local')
+PAGE_POOL_SIZE = int(os.getenv('LOCUST_PAGE_POOL_SIZE', 6))  # Browsers open ~6 connections per host
+IDLE_TABS_PER_USER = int(os.getenv('LOCUST_IDLE_TABS_PER_USER', 2000))
+IDLE_CONNECTIONS = int(os.getenv('LOCUST_IDLE_CONNECTIONS', 20))
+IDLE_POLL_INTERVAL = float(os.getenv('LOCUST_IDLE_POLL_INTERVAL', 30))
+IDLE_JITTER = float(os.getenv('LOCUST_IDLE_JITTER', 2))
+IDLE_ACCOUNTS_FILE = os.getenv('LOCUST_IDLE_ACCOUNTS')  # CSV of email,password
+JOURNEY_CONFIG = os.getenv('LOCUST_JOURNEY_CONFIG')  # JSON journey; built-in default when unset
+AUTH_ACCOUNTS_FILE = os.getenv('LOCUST_AUTH_ACCOUNTS')  # CSV of email,password
+AUTH_REQUESTS_PER_SESSION = int(os.getenv('LOCUST_AUTH_REQUESTS_PER_SESSION', 10))
+AUTH_REFRESH_EVERY = int(os.getenv('LOCUST_AUTH_REFRESH_EVERY', 3))  # Refresh in every Nth session, 0 = never
+PROJECTION_UPDATE_SHARE = float(os.getenv('LOCUST_PROJECTION_UPDATE_SHARE', 0.3))  # Share of writes that are updates
+PROJECTION_POLL_INTERVAL = float(os.getenv('LOCUST_PROJECTION_POLL_INTERVAL', 0.2))
+PROJECTION_TIMEOUT = float(os.getenv('LOCUST_PROJECTION_TIMEOUT', 30))
+PROJECTION_MAX_PENDING = int(os.getenv('LOCUST_PROJECTION_MAX_PENDING', 30))  # Pollers per user
+THUMBNAIL_RATE = float(os.getenv('LOCUST_THUMBNAIL_RATE', 0.5))  # Uploads/s per user
 
 
-class BaseUser(HttpUser):
+class BaseUser(tail_exemplars.ExemplarUser, seeding.SeededUser, connection_policy.ConnectionPolicyUser,
+               HttpUser):
     """Base user with common login logic"""
     
     def on_start(self):
@@ -39,14 +76,14 @@ class BaseUser(HttpUser):
 
 # ==================== SCENARIO 1: READ-HEAVY ====================
 class ReadHeavyUser(BaseUser):
-    \"\"\"
+    """
     Scenario: 95% reads, 5% writes
     Simulates typical user browsing books
     
     Usage:
     locust -f scenarios.py ReadHeavyUser --headless -u 100 -r 10 -t 5m
-    \"\"\"
-    wait_time = between(0.5, 2)
+    """
+    wait_time = seeding.between(0.5, 2)
     host = BACKEND_HOST
     
     @task(50)
@@ -57,13 +94,13 @@ class ReadHeavyUser(BaseUser):
     def view_book_details(self):
         r = self.client.get('/books', headers=self.auth_headers)
         if r.status_code == 200 and r.json():
-            book = random.choice(r.json())
+            book = self.rng.choice(r.json())
             self.client.get(f"/books/{book['_id']}", headers=self.auth_headers, 
                           name='View Book Details')
     
     @task(10)
     def search_books(self):
-        q = random.choice(['python', 'javascript', 'java', 'docker'])
+        q = self.rng.choice(['python', 'javascript', 'java', 'docker'])
         self.client.get(f'/books/search?q={q}', headers=self.auth_headers,
                       name='Search Books')
     
@@ -80,28 +117,28 @@ class ReadHeavyUser(BaseUser):
     @task(1)
     def create_book(self):
         self.client.post('/books', json={
-            'title': f'Test Book {random.randint(1, 10000)}',
+            'title': f'Test Book {self.rng.randint(1, 10000)}',
             'authors': ['Test Author']
         }, headers=self.auth_headers, name='Create Book')
 
 
 # ==================== SCENARIO 2: WRITE-HEAVY ====================
 class WriteHeavyUser(BaseUser):
-    \"\"\"
+    """
     Scenario: 40% reads, 60% writes
     Simulates content creators and active borrowers
     
     Usage:
     locust -f scenarios.py WriteHeavyUser --headless -u 50 -r 5 -t 3m
-    \"\"\"
-    wait_time = between(1, 3)
+    """
+    wait_time = seeding.between(1, 3)
     host = BACKEND_HOST
     
     @task(20)
     def create_books(self):
         titles = ['Clean Code', 'Design Patterns', 'Refactoring', 'TDD']
         self.client.post('/books', json={
-            'title': f'{random.choice(titles)} {random.randint(1, 1000)}',
+            'title': f'{self.rng.choice(titles)} {self.rng.randint(1, 1000)}',
             'authors': ['Robert Martin'],
             'description': 'Load test book'
         }, headers=self.auth_headers, name='Create Book')
@@ -110,9 +147,9 @@ class WriteHeavyUser(BaseUser):
     def update_books(self):
         r = self.client.get('/books/my', headers=self.auth_headers)
         if r.status_code == 200 and r.json():
-            book = random.choice(r.json())
+            book = self.rng.choice(r.json())
             self.client.patch(f"/books/{book['_id']}", json={
-                'description': f'Updated {time.time()}'
+                'description': f'Updated {seeding.token(self.rng)}'
             }, headers=self.auth_headers, name='Update Book')
     
     @task(15)
@@ -121,7 +158,7 @@ class WriteHeavyUser(BaseUser):
         if r.status_code == 200 and r.json():
             books = [b for b in r.json() if b.get('available')]
             if books:
-                book = random.choice(books)
+                book = self.rng.choice(books)
                 self.client.post('/borrows', json={
                     'bookId': book['_id'],
                     'startDate': time.strftime('%Y-%m-%d'),
@@ -135,7 +172,7 @@ class WriteHeavyUser(BaseUser):
         if r.status_code == 200 and r.json():
             pending = [b for b in r.json() if b.get('status') == 'pending']
             if pending:
-                borrow = random.choice(pending)
+                borrow = self.rng.choice(pending)
                 self.client.patch(f"/borrows/{borrow['_id']}/approve",
                                 headers=self.auth_headers, name='Approve Borrow')
     
@@ -146,14 +183,14 @@ class WriteHeavyUser(BaseUser):
 
 # ==================== SCENARIO 3: CACHE STRESS TEST ====================
 class CacheStressUser(BaseUser):
-    \"\"\"
+    """
     Scenario: Hammer cache endpoints to test Redis performance
     Very high request rate, mostly GET /books
     
     Usage:
     locust -f scenarios.py CacheStressUser --headless -u 200 -r 20 -t 2m
-    \"\"\"
-    wait_time = between(0.1, 0.3)  # Very fast
+    """
+    wait_time = seeding.between(0.1, 0.3)  # Very fast
     host = BACKEND_HOST
     
     @task(80)
@@ -165,26 +202,26 @@ class CacheStressUser(BaseUser):
     def get_book_by_id(self):
         r = self.client.get('/books', headers=self.auth_headers)
         if r.status_code == 200 and r.json():
-            book = random.choice(r.json())
+            book = self.rng.choice(r.json())
             self.client.get(f"/books/{book['_id']}", headers=self.auth_headers,
                           name='[Cache] Get Book By ID')
     
     @task(5)
     def search_books(self):
-        q = random.choice(['test', 'book', 'code'])
+        q = self.rng.choice(['test', 'book', 'code'])
         self.client.get(f'/books/search?q={q}', headers=self.auth_headers,
                       name='[Cache] Search')
 
 
 # ==================== SCENARIO 4: SPIKE TEST ====================
 class SpikeUser(BaseUser):
-    \"\"\"
+    """
     Scenario: Sudden traffic spike
     Use with: --spawn-rate 50 to create instant load
     
     Usage:
     locust -f scenarios.py SpikeUser --headless -u 500 -r 50 -t 1m
-    \"\"\"
+    """
     wait_time = constant(1)  # Constant rate
     host = BACKEND_HOST
     
@@ -197,21 +234,22 @@ class SpikeUser(BaseUser):
             ('GET', '/health', 'Health Check')
         ]
         
-        method, path, name = random.choice(endpoints)
+        method, path, name = self.rng.choice(endpoints)
         if method == 'GET':
             self.client.get(path, headers=self.auth_headers, name=name)
 
 
 # ==================== SCENARIO 5: SOAK TEST (ENDURANCE) ====================
 class SoakTestUser(BaseUser):
-    \"\"\"
+    """
     Scenario: Long-running stability test
     Moderate load for extended period
+    Heap/RSS, throughput and p95 trends are analysed by soak_monitor.py
     
     Usage:
     locust -f scenarios.py SoakTestUser --headless -u 50 -r 5 -t 30m
-    \"\"\"
-    wait_time = between(2, 5)  # Slower, more realistic
+    """
+    wait_time = seeding.between(2, 5)  # Slower, more realistic
     host = BACKEND_HOST
     
     @task(30)
@@ -222,10 +260,10 @@ class SoakTestUser(BaseUser):
     def view_details(self):
         r = self.client.get('/books', headers=self.auth_headers)
         if r.status_code == 200 and r.json():
-            book = random.choice(r.json())
+            book = self.rng.choice(r.json())
             self.client.get(f"/books/{book['_id']}", headers=self.auth_headers,
                           name='Details')
-            time.sleep(random.uniform(1, 3))  # Read time
+            time.sleep(self.rng.uniform(1, 3))  # Read time
     
     @task(5)
     def check_notifications(self):
@@ -243,7 +281,7 @@ class SoakTestUser(BaseUser):
         if r.status_code == 200 and r.json():
             books = [b for b in r.json() if b.get('available')]
             if books:
-                book = random.choice(books)
+                book = self.rng.choice(books)
                 self.client.post('/borrows', json={
                     'bookId': book['_id'],
                     'startDate': time.strftime('%Y-%m-%d'),
@@ -254,13 +292,13 @@ class SoakTestUser(BaseUser):
 
 # ==================== SCENARIO 6: API HEALTH MONITOR ====================
 class HealthMonitorUser(BaseUser):
-    \"\"\"
+    """
     Scenario: Continuous health monitoring
     Checks all critical endpoints at constant rate
     
     Usage:
     locust -f scenarios.py HealthMonitorUser --headless -u 5 -r 1 -t 60m
-    \"\"\"
+    """
     wait_time = constant_pacing(10)  # Every 10 seconds
     host = BACKEND_HOST
     
@@ -286,14 +324,14 @@ class HealthMonitorUser(BaseUser):
 
 # ==================== SCENARIO 7: STRESS TEST ====================
 class StressTestUser(BaseUser):
-    \"\"\"
+    """
     Scenario: Push system to limits
     Gradually increase until system breaks
     
     Usage:
     locust -f scenarios.py StressTestUser --headless -u 1000 -r 10 -t 10m
-    \"\"\"
-    wait_time = between(0.1, 0.5)
+    """
+    wait_time = seeding.between(0.1, 0.5)
     host = BACKEND_HOST
     
     @task(10)
@@ -303,26 +341,26 @@ class StressTestUser(BaseUser):
     @task(5)
     def concurrent_writes(self):
         self.client.post('/books', json={
-            'title': f'Stress Test {time.time()}',
+            'title': f'Stress Test {seeding.token(self.rng)}',
             'authors': ['Load Test']
         }, headers=self.auth_headers, name='Concurrent Write')
     
     @task(3)
     def search_load(self):
-        q = random.choice(['a', 'b', 'c', 'd', 'e'])
+        q = self.rng.choice(['a', 'b', 'c', 'd', 'e'])
         self.client.get(f'/books/search?q={q}', headers=self.auth_headers,
                       name='Search Load')
 
 
 # ==================== SCENARIO 8: REALISTIC USER JOURNEY ====================
 class RealisticUserJourney(BaseUser):
-    \"\"\"
+    """
     Scenario: Simulates real user behavior with pauses
     
     Usage:
     locust -f scenarios.py RealisticUserJourney --headless -u 100 -r 5 -t 10m
-    \"\"\"
-    wait_time = between(3, 10)  # Think time
+    """
+    wait_time = seeding.between(3, 10)  # Think time
     host = BACKEND_HOST
     
     @task
@@ -330,39 +368,561 @@ class RealisticUserJourney(BaseUser):
         # 1. Browse books
         r = self.client.get('/books', headers=self.auth_headers, 
                           name='1. Browse Books')
-        time.sleep(random.uniform(2, 5))  # Reading time
+        time.sleep(self.rng.uniform(2, 5))  # Reading time
         
         if r.status_code == 200 and r.json():
             # 2. View book details
-            book = random.choice(r.json())
+            book = self.rng.choice(r.json())
             self.client.get(f"/books/{book['_id']}", headers=self.auth_headers,
                           name='2. View Details')
-            time.sleep(random.uniform(5, 10))  # Reading description
+            time.sleep(self.rng.uniform(5, 10))  # Reading description
             
             # 3. Maybe borrow (30% chance)
-            if random.random() < 0.3 and book.get('available'):
+            if self.rng.random() < 0.3 and book.get('available'):
                 self.client.post('/borrows', json={
                     'bookId': book['_id'],
                     'startDate': time.strftime('%Y-%m-%d'),
                     'endDate': time.strftime('%Y-%m-%d',
                                            time.localtime(time.time() + 7*24*3600))
                 }, headers=self.auth_headers, name='3. Borrow Book')
-                time.sleep(random.uniform(1, 2))
+                time.sleep(self.rng.uniform(1, 2))
             
             # 4. Check notifications (50% chance)
-            if random.random() < 0.5:
+            if self.rng.random() < 0.5:
                 self.client.get('/notifications', headers=self.auth_headers,
                               name='4. Check Notifications')
-                time.sleep(random.uniform(1, 3))
+                time.sleep(self.rng.uniform(1, 3))
             
             # 5. View my borrows (20% chance)
-            if random.random() < 0.2:
+            if self.rng.random() < 0.2:
                 self.client.get('/borrows/my', headers=self.auth_headers,
                               name='5. My Borrows')
 
 
+# ==================== SCENARIO 9: PARAMETRIC MIX ====================
+MIX = workload_mix.mix_from_env()
+MIX_WEIGHTS = workload_mix.mix_weights(**MIX)
+
+
+class MixUser(BaseUser):
+    """
+    Scenario: Read/write mix generated from parameters (see workload_mix.py)
+    Driven by LOCUST_MIX_READ_RATIO, LOCUST_MIX_SEARCH_SHARE, LOCUST_MIX_BORROW_SHARE;
+    created data is tagged with LOCUST_RUN_TAG so parallel sweep runs stay separable
+
+    Usage:
+    LOCUST_MIX_READ_RATIO=0.8 locust -f scenarios.py MixUser --headless -u 50 -r 10 -t 2m
+    python sweep.py --read-ratios 0.5,0.8,0.95 --search-shares 0,0.3
+    """
+    wait_time = seeding.between(0.5, 2)
+    host = BACKEND_HOST
+
+    def on_start(self):
+        super().on_start()
+        self.auth_headers['X-Run-Tag'] = RUN_TAG
+
+    def browse_books(self):
+        self.client.get('/books', headers=self.auth_headers, name='[Mix] Browse Books')
+
+    def view_book_details(self):
+        r = self.client.get('/books', headers=self.auth_headers, name='[Mix] Browse Books')
+        if r.status_code != 200:
+            return
+        books = (r.json() or {}).get('books') or []
+        if books:
+            book = self.rng.choice(books)
+            self.client.get(f"/books/{book['_id']}", headers=self.auth_headers,
+                          name='[Mix] View Book Details')
+
+    def search_books(self):
+        q = self.rng.choice(['python', 'javascript', 'java', 'docker', 'clean code'])
+        self.client.get(f'/books/search?q={q}', headers=self.auth_headers,
+                      name='[Mix] Search Books')
+
+    def view_notifications(self):
+        self.client.get('/notifications', headers=self.auth_headers,
+                      name='[Mix] View Notifications')
+
+    def create_book(self):
+        self.client.post('/books', json={
+            'title': f'[{RUN_TAG}] Mix Book {self.rng.randint(1, 100000)}',
+            'authors': 'Load Test',
+            'description': 'Workload mix sweep book'
+        }, headers=self.auth_headers, name='[Mix] Create Book')
+
+    def create_borrow(self):
+        r = self.client.get('/books', headers=self.auth_headers, name='[Mix] Browse Books')
+        if r.status_code != 200:
+            return
+        books = (r.json() or {}).get('books') or []
+        books = [b for b in books if b.get('available')]
+        if books:
+            book = self.rng.choice(books)
+            self.client.post('/borrows', json={
+                'bookId': book['_id'],
+                'dueDate': 7  # Days, as required by the borrow validator
+            }, headers=self.auth_headers, name='[Mix] Create Borrow')
+
+    tasks = {fn: weight for fn, weight in {
+        browse_books: MIX_WEIGHTS['browse_books'],
+        view_book_details: MIX_WEIGHTS['view_book_details'],
+        search_books: MIX_WEIGHTS['search_books'],
+        view_notifications: MIX_WEIGHTS['view_notifications'],
+        create_book: MIX_WEIGHTS['create_book'],
+        create_borrow: MIX_WEIGHTS['create_borrow'],
+    }.items() if weight > 0}
+
+
+# ==================== SCENARIO 10: FRONTEND PAGE LOADS ====================
+class PageLoadUser(BaseUser):
+    """
+    Scenario: Emulates the React client's per-page request fan-out
+    Requests within a stage run concurrently (like Promise.all) on a per-user gevent
+    pool; each page also reports one PAGE entry = time until all its data loaded.
+    NotificationContext's 30s unread-count polling runs in the background.
+
+    Usage:
+    locust -f scenarios.py PageLoadUser --headless -u 100 -r 10 -t 10m
+    """
+    wait_time = seeding.between(2, 8)  # Time spent on a page
+    host = BACKEND_HOST
+
+    # page name -> stages; requests inside a stage are issued concurrently
+    PAGES = {
+        'App Load': [
+            [('/auth/current', '[Page] Auth Current')],
+            [('/books', '[Page] Books'),
+             ('/borrows/my-borrows', '[Page] My Borrows'),
+             ('/borrows/my-requests', '[Page] My Requests'),
+             ('/borrows/pending-requests', '[Page] Pending Requests'),
+             ('/notifications/unread-count', '[Page] Unread Count')],
+        ],
+        'Borrow Hub': [
+            [('/borrows/my-borrows', '[Page] My Borrows'),
+             ('/borrows/my-requests', '[Page] My Requests'),
+             ('/borrows/pending-requests', '[Page] Pending Requests')],
+        ],
+        'Book Detail': [
+            [('/books/{book_id}', '[Page] Book By ID')],
+        ],
+        'Your Books': [
+            [('/books/my-books', '[Page] My Books')],
+        ],
+        'Notifications': [
+            [('/notifications', '[Page] Notifications')],
+        ],
+    }
+
+    def on_start(self):
+        super().on_start()
+        self.pool = Pool(PAGE_POOL_SIZE)
+        self.book_ids = []
+        self.load_page('App Load')
+        self.poller = gevent.spawn(self.poll_unread_count)
+
+    def on_stop(self):
+        self.poller.kill(block=False)
+        self.pool.kill(block=False)
+
+    def poll_unread_count(self):
+        # NotificationContext: setInterval(fetchUnreadCount, 30000)
+        while True:
+            gevent.sleep(30)
+            self.client.get('/notifications/unread-count', headers=self.auth_headers,
+                          name='[Poll] Unread Count')
+
+    def fetch(self, path, name):
+        resp = self.client.get(path, headers=self.auth_headers, name=name)
+        if path == '/books' and resp.status_code == 200:
+            data = resp.json()
+            # Same unwrapping as BookContext.fetchBooks
+            books = data if isinstance(data, list) else (data.get('books') or data.get('data') or [])
+            self.book_ids = [b['_id'] for b in books if b.get('_id')]
+        return resp
+
+    def load_page(self, page):
+        """Run a page's stages and fire one PAGE event covering all of them"""
+        start = time.perf_counter()
+        length = 0
+        failure = None
+        issued = 0
+
+        for stage in self.PAGES[page]:
+            jobs = []
+            for path, name in stage:
+                if '{book_id}' in path:
+                    if not self.book_ids:
+                        continue
+                    path = path.format(book_id=self.rng.choice(self.book_ids))
+                jobs.append((name, self.pool.spawn(self.fetch, path, name)))
+            gevent.joinall([job for _, job in jobs])
+            issued += len(jobs)
+
+            for name, job in jobs:
+                resp = job.value
+                if resp is None:
+                    failure = failure or job.exception or Exception(f'{name}: no response')
+                    continue
+                length += len(resp.content or b'')
+                if resp.status_code >= 400:
+                    failure = failure or Exception(f'{name}: HTTP {resp.status_code}')
+
+        if not issued:
+            return
+        self.environment.events.request.fire(
+            request_type='PAGE',
+            name=f'[Page] {page}',
+            response_time=(time.perf_counter() - start) * 1000,
+            response_length=length,
+            exception=failure,
+            context={},
+        )
+
+    @task(1)
+    def reload_app(self):
+        self.load_page('App Load')
+
+    @task(3)
+    def borrow_hub(self):
+        self.load_page('Borrow Hub')
+
+    @task(4)
+    def book_detail(self):
+        self.load_page('Book Detail')
+
+    @task(2)
+    def your_books(self):
+        self.load_page('Your Books')
+
+    @task(2)
+    def notifications(self):
+        self.load_page('Notifications')
+
+
+# ==================== SCENARIO 11: IDLE TAB POLLING ====================
+def load_accounts(path):
+    """Accounts from a CSV of email,password (LOCUST_IDLE_ACCOUNTS, ...), or the test user"""
+    if not path:
+        return [(TEST_EMAIL, TEST_PASSWORD)]
+    with open(path, newline='') as f:
+        return [(row[0].strip(), row[1].strip()) for row in csv.reader(f) if len(row) >= 2]
+
+
+class IdleTabsUser(tail_exemplars.ExemplarUser, seeding.SeededUser, connection_policy.ConnectionPolicyUser,
+                   FastHttpUser):
+    """
+    Scenario: Logged-in tabs sitting idle while NotificationContext polls unread count
+    Each Locust user is a shard of LOCUST_IDLE_TABS_PER_USER virtual tabs multiplexed
+    over one keep-alive pool of LOCUST_IDLE_CONNECTIONS connections, each tab polling
+    every 30s (+/- LOCUST_IDLE_JITTER). Backend cost per 10k tabs: see idle_cost.py.
+
+    With a single test account every tab shares one unread-count cache entry;
+    use LOCUST_IDLE_ACCOUNTS for a production-like cache hit rate.
+
+    Usage:
+    LOCUST_IDLE_TABS_PER_USER=5000 locust -f scenarios.py IdleTabsUser --headless -u 4 -r 1 -t 15m
+    """
+    wait_time = constant(0)
+    host = BACKEND_HOST
+    concurrency = IDLE_CONNECTIONS
+    tabs_per_user = IDLE_TABS_PER_USER
+
+    def on_start(self):
+        self.pool = Pool(IDLE_CONNECTIONS)
+        self.headers = []
+        for email, password in load_accounts(IDLE_ACCOUNTS_FILE):
+            resp = self.client.post('/auth/login', json={'email': email, 'password': password},
+                                    name='[Idle] Login')
+            if resp.status_code == 200:
+                token = resp.json().get('accessToken')
+                self.headers.append({'Authorization': f'Bearer {token}'})
+        if not self.headers:
+            print('❌ IdleTabsUser: no account could log in')
+
+        # Tabs opened uniformly over one polling interval, then polled on their own cadence
+        now = time.time()
+        self.schedule = [(now + self.rng.uniform(0, IDLE_POLL_INTERVAL), tab)
+                         for tab in range(self.tabs_per_user)]
+        heapq.heapify(self.schedule)
+
+    def on_stop(self):
+        self.pool.kill(block=False)
+
+    def poll(self, tab):
+        self.client.get('/notifications/unread-count', name='[Idle] Unread Count',
+                        headers=self.headers[tab % len(self.headers)])
+
+    @task
+    def poll_due_tabs(self):
+        if not self.headers:
+            gevent.sleep(IDLE_POLL_INTERVAL)
+            return
+
+        due_at = self.schedule[0][0]
+        delay = due_at - time.time()
+        if delay > 0:
+            gevent.sleep(delay)
+
+        now = time.time()
+        while self.schedule[0][0] <= now:
+            due_at, tab = self.schedule[0]
+            next_due = due_at + IDLE_POLL_INTERVAL + self.rng.uniform(-IDLE_JITTER, IDLE_JITTER)
+            heapq.heapreplace(self.schedule, (next_due, tab))
+            self.pool.spawn(self.poll, tab)  # Blocks while every connection is busy
+
+
+# ==================== SCENARIO 12: MARKOV USER JOURNEY ====================
+JOURNEY = journey.load_journey(JOURNEY_CONFIG)
+
+
+class MarkovJourneyUser(BaseUser):
+    """
+    Scenario: Users walking a Markov chain of page states (see journey.py)
+    One state per task; think time is the wait_time, so it never inflates measured
+    spans. Reports '[State] ...' per page state and '[Journey] ...' per finished journey.
+    The built-in journey mirrors RealisticUserJourney; LOCUST_JOURNEY_CONFIG loads a
+    config written by hand or fitted from access logs.
+
+    Usage:
+    LOCUST_JOURNEY_CONFIG=fitted.json locust -f scenarios.py MarkovJourneyUser --headless -u 100 -r 5 -t 10m
+    """
+    host = BACKEND_HOST
+
+    def on_start(self):
+        super().on_start()
+        self.walker = journey.JourneyWalker(JOURNEY, self.rng)
+
+    def wait_time(self):
+        return self.walker.think_time
+
+    @task
+    def step(self):
+        self.walker.step(self)
+
+
+# ==================== SCENARIO 13: AUTH SESSION CHURN ====================
+class AuthChurnUser(BaseUser):
+    """
+    Scenario: Sessions churned through login -> authenticated requests -> logout
+    Every logout blacklists the access token in Redis for its remaining lifetime, so
+    the blacklist grows to (logouts/s x 15 min). Every LOCUST_AUTH_REFRESH_EVERY-th
+    session refreshes its access token halfway. auth_churn.py relates API latency to
+    blacklist size and logout rate.
+
+    Logins of one account within the same second return the same JWT, so use
+    LOCUST_AUTH_ACCOUNTS with roughly one account per user.
+
+    Usage:
+    LOCUST_AUTH_ACCOUNTS=accounts.csv locust -f scenarios.py AuthChurnUser --headless -u 200 -r 20 -t 30m
+    """
+    wait_time = seeding.between(0.2, 1)
+    host = BACKEND_HOST
+
+    ENDPOINTS = [
+        ('/books', '[Auth] Books'),
+        ('/auth/current', '[Auth] Current User'),
+        ('/notifications/unread-count', '[Auth] Unread Count'),
+        ('/borrows/my-borrows', '[Auth] My Borrows'),
+    ]
+
+    def on_start(self):
+        # No BaseUser login: the tasks open and close sessions
+        self.accounts = load_accounts(AUTH_ACCOUNTS_FILE)
+        self.sessions = 0
+        self.token = None
+
+    def bearer(self):
+        return {'Authorization': f'Bearer {self.token}'}
+
+    def login(self):
+        email, password = self.rng.choice(self.accounts)
+        resp = self.client.post('/auth/login', json={'email': email, 'password': password},
+                                name='[Auth] Login')
+        if resp.status_code != 200:
+            return
+        self.token = resp.json().get('accessToken')
+        self.refresh_token = resp.cookies.get('refreshToken')
+        self.remaining = AUTH_REQUESTS_PER_SESSION
+        self.sessions += 1
+        refresh = AUTH_REFRESH_EVERY and self.sessions % AUTH_REFRESH_EVERY == 0
+        self.refresh_at = AUTH_REQUESTS_PER_SESSION // 2 if refresh else None
+
+    def refresh(self):
+        # Auth cookies are Secure, so they are passed explicitly over plain HTTP
+        resp = self.client.get('/auth/refresh-token', cookies={'refreshToken': self.refresh_token},
+                               name='[Auth] Refresh Token')
+        if resp.status_code == 200:
+            self.token = resp.json().get('accessToken')
+
+    def logout(self):
+        # logoutUser blacklists the token from the accessToken cookie
+        self.client.get('/auth/logout', headers=self.bearer(), cookies={'accessToken': self.token},
+                        name='[Auth] Logout', context={'token_expiry': auth_churn.token_expiry(self.token)})
+        self.token = None
+        self.client.cookies.clear()
+
+    @task
+    def step(self):
+        if not self.token:
+            self.login()
+        elif self.remaining <= 0:
+            self.logout()
+        elif self.remaining == self.refresh_at and self.refresh_token:
+            self.refresh_at = None
+            self.refresh()
+        else:
+            path, name = self.rng.choice(self.ENDPOINTS)
+            resp = self.client.get(path, headers=self.bearer(), name=name)
+            self.remaining -= 1
+            if resp.status_code == 401:
+                self.token = None  # Revoked or expired: start a new session
+
+
+# ==================== SCENARIO 14: READ-MODEL PROJECTION LAG ====================
+class ProjectionLagUser(BaseUser):
+    """
+    Scenario: Book writes followed by read-side polling until the write is visible
+    Each create (or, for LOCUST_PROJECTION_UPDATE_SHARE of writes, update of one of
+    the user's own books) carries a unique token in its title. Background pollers
+    then hit /books/my-books, GET /books and /books/search?q=<token> every
+    LOCUST_PROJECTION_POLL_INTERVAL until the book shows up with that title, and fire
+    a LAG event with the time since the write returned. projection_lag.py relates the
+    lags to the book write rate of the whole run.
+
+    Only page 1 of the lists is polled: a book pushed off it by newer ones is counted
+    as displaced rather than timed out. Updates keep a book's position (lists are
+    ordered by createdAt), so they are only polled on the lists it was last seen on.
+    Lag resolution is the poll interval; searches are cached for 3 minutes, but a
+    fresh token is never searched before its write.
+
+    Usage:
+    locust -f scenarios.py ProjectionLagUser WriteHeavyUser --headless -u 60 -r 10 -t 10m
+    """
+    wait_time = seeding.between(1, 3)
+    host = BACKEND_HOST
+
+    PAGE_SIZE = 12  # BookController lists
+    LISTS = {
+        'my-books': ('/books/my-books', '[Lag] Poll My Books'),
+        'books': ('/books', '[Lag] Poll Books'),
+    }
+
+    def on_start(self):
+        super().on_start()
+        self.pool = Pool(PROJECTION_MAX_PENDING)
+        self.own = {}  # book _id -> lists it was last seen on
+
+    def on_stop(self):
+        self.pool.kill(block=False)
+
+    @task
+    def write(self):
+        if self.pool.free_count() < 3:
+            return  # Pollers are still busy: writing more would only measure the backlog
+        title = f'Projection {seeding.token(self.rng)}'
+        if self.own and self.rng.random() < PROJECTION_UPDATE_SHARE:
+            book_id = self.rng.choice(sorted(self.own))
+            kind = 'update'
+            resp = self.client.put(f'/books/{book_id}', json={'title': title},
+                                   headers=self.auth_headers, name='[Lag] Update Book')
+            lists = self.own[book_id]
+        else:
+            kind = 'create'
+            resp = self.client.post('/books', json={'title': title, 'authors': ['Projection Lag']},
+                                    headers=self.auth_headers, name='[Lag] Create Book')
+            lists = list(self.LISTS)
+        if resp.status_code not in (200, 201):
+            return
+        written_at = time.time()
+        book = resp.json()
+        if not book.get('_id'):
+            return
+
+        self.own[book['_id']] = []
+        if len(self.own) > self.PAGE_SIZE:
+            del self.own[next(iter(self.own))]  # Older books are off page 1 of my-books anyway
+        for key in lists:
+            path, name = self.LISTS[key]
+            self.pool.spawn(self.watch, key, path, name, book, kind, written_at)
+        self.pool.spawn(self.watch, 'search', f'/books/search?q={title.split()[-1]}', '[Lag] Poll Search',
+                        book, kind, written_at)
+
+    def visibility(self, resp, book):
+        """'seen', 'displaced' or None (not visible yet)"""
+        if resp.status_code != 200:
+            return None
+        books = resp.json().get('books') or []
+        for b in books:
+            if b.get('_id') == book['_id']:
+                return 'seen' if b.get('title') == book['title'] else None
+        created = book.get('createdAt') or ''
+        if len(books) >= self.PAGE_SIZE and all((b.get('createdAt') or '') > created for b in books):
+            return 'displaced'
+        return None
+
+    def watch(self, key, path, name, book, kind, written_at):
+        series = f'[Lag] {key} ({kind})'
+        polls = 0
+        while True:
+            started = time.time()
+            resp = self.client.get(path, headers=self.auth_headers, name=name)
+            polls += 1
+            state = self.visibility(resp, book)
+            if state == 'displaced':
+                projection_lag.displaced(series)
+                return
+            if state == 'seen' or time.time() - written_at >= PROJECTION_TIMEOUT:
+                break
+            gevent.sleep(PROJECTION_POLL_INTERVAL)
+
+        if state == 'seen' and key in self.LISTS and book['_id'] in self.own:
+            self.own[book['_id']].append(key)
+        self.environment.events.request.fire(
+            request_type='LAG',
+            name=series,
+            response_time=(started - written_at) * 1000 if state == 'seen' else PROJECTION_TIMEOUT * 1000,
+            response_length=polls,
+            exception=None if state == 'seen' else Exception(f'Not visible after {PROJECTION_TIMEOUT:g}s'),
+            context={'written_at': written_at},
+        )
+
+
+# ==================== SCENARIO 15: THUMBNAIL UPLOADS ====================
+class ThumbnailUploadUser(BaseUser):
+    """
+    Scenario: Book creation with a multipart thumbnail upload
+    Goes through multer's memory storage and the Cloudinary upload stream in
+    BookController.createBook. Images come from a pre-generated pool
+    (LOCUST_THUMBNAIL_SIZES), each user uploads LOCUST_THUMBNAIL_RATE per second,
+    and thumbnail_upload.py reports throughput, latency per size and replica memory.
+
+    Run the backend against cloudinary_stub.py (CLOUDINARY_UPLOAD_PREFIX) rather
+    than the real Cloudinary account.
+
+    Usage:
+    LOCUST_THUMBNAIL_SIZES=64k,512k,2m locust -f scenarios.py ThumbnailUploadUser --headless -u 20 -r 5 -t 5m
+    """
+    wait_time = constant_throughput(THUMBNAIL_RATE)
+    host = BACKEND_HOST
+
+    def on_start(self):
+        super().on_start()
+        self.images = thumbnail_upload.image_pool()
+        self.labels = sorted(self.images)
+
+    @task
+    def upload(self):
+        label = self.rng.choice(self.labels)
+        image = self.rng.choice(self.images[label])
+        self.client.post('/books', data={
+            'title': f'Upload {label} {seeding.token(self.rng)}',
+            'authors': 'Thumbnail Upload',
+        }, files={'thumbnail': (f'thumbnail-{label}.png', image, 'image/png')},
+            headers=self.auth_headers, name=f'{thumbnail_upload.NAME_PREFIX}{label}')
+
+
 if __name__ == '__main__':
-    print(\"\"\"
+    print("""
      Available Test Scenarios:
     
     1. ReadHeavyUser       - 95% reads, typical browsing
@@ -373,6 +933,13 @@ if __name__ == '__main__':
     6. HealthMonitorUser   - Continuous health checks
     7. StressTestUser      - Push to breaking point
     8. RealisticUserJourney - Real user behavior
+    9. MixUser             - Parametric read/write mix (LOCUST_MIX_*)
+    10. PageLoadUser       - Frontend page fan-out with page-level latency
+    11. IdleTabsUser       - Thousands of idle tabs polling unread count
+    12. MarkovJourneyUser  - Page-state Markov journeys with state/journey latency
+    13. AuthChurnUser      - Login/logout churn growing the JWT blacklist
+    14. ProjectionLagUser  - Write -> read-model visibility lag vs write rate
+    15. ThumbnailUploadUser - Multipart thumbnail uploads from an in-memory image pool
     
     Usage: locust -f scenarios.py <ScenarioName>
-    \"\"\")
+    """)
@@ -0,0 +1,82 @@
+"""
+Seed-Reproducible Workloads
+With LOCUST_RUN_SEED set, every virtual user gets its own random.Random stream
+derived from (seed, user class, worker index, spawn order), and task choice,
+think times, book picks, query terms and payloads all come from that stream.
+Two runs with the same seed, user count and worker count then send the same
+per-user request sequences, so differences between two builds come from the
+system under test rather than from the workload.
+
+Without a seed, user.rng is the global random module and behaviour is unchanged.
+
+Responses still steer the sequence (e.g. which books a list returned), so keep
+the data set identical between the runs being compared.
+
+Usage:
+LOCUST_RUN_SEED=42 locust -f scenarios.py MixUser --headless -u 50 -r 10 -t 5m
+"""
+
+import hashlib
+import itertools
+import os
+import random
+
+from locust import events
+from locust.runners import WorkerRunner
+
+RUN_SEED = os.getenv('LOCUST_RUN_SEED') or None
+
+_spawned = {}
+
+
+def derive_rng(*parts):
+    """Independent Random stream for (RUN_SEED, *parts)"""
+    digest = hashlib.sha256('/'.join(str(p) for p in (RUN_SEED, *parts)).encode()).digest()
+    return random.Random(int.from_bytes(digest[:8], 'big'))
+
+
+def token(rng):
+    """Short pseudo-random payload suffix (replaces time.time() in titles and descriptions)"""
+    return f'{rng.getrandbits(32):08x}'
+
+
+def between(min_wait, max_wait):
+    """locust.between drawing from the user's stream; works on users and their TaskSets"""
+    def wait_time(instance):
+        rng = getattr(instance, 'rng', None) or instance.user.rng
+        return min_wait + rng.random() * (max_wait - min_wait)
+    return wait_time
+
+
+def seeded_step(user):
+    """Single task handed to Locust: picks the next real task from the user's stream"""
+    task = user.rng.choice(user.seeded_tasks)
+    if isinstance(task, type):
+        task(user).run()
+    else:
+        task(user)
+
+
+class SeededUser:
+    """Mixin giving each user self.rng (and seeded task choice when LOCUST_RUN_SEED is set)"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if RUN_SEED is None:
+            self.rng = random
+            return
+        name = type(self).__name__
+        index = next(_spawned.setdefault(name, itertools.count()))
+        worker = getattr(self.environment.runner, 'worker_index', 0)
+        self.rng = derive_rng(name, worker, index)
+        # Locust's own scheduler uses the global random module: give it one choice only
+        self.seeded_tasks = list(type(self).tasks)
+        if self.seeded_tasks:
+            self.tasks = [seeded_step]
+
+
+@events.test_start.add_listener
+def on_test_start(environment, **kwargs):
+    _spawned.clear()
+    if RUN_SEED is not None and not isinstance(environment.runner, WorkerRunner):
+        print(f"🎲 Seeded workload: LOCUST_RUN_SEED={RUN_SEED}")
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+SMTP Sink for Load Tests
+Accepts every message the backend sends (nodemailer with SMTP_HOST/SMTP_PORT pointing
+here), discards it and counts it, so email-producing jobs can run under load without
+a mail account or real recipients. A message counts as a duplicate when the same
+recipient already got the same subject and body; per-peer counts show which replica
+containers sent them.
+
+GET /stats on the HTTP port returns the counters, POST /reset clears them.
+
+Usage:
+python smtp_sink.py --port 2525 --http-port 8025
+docker compose --profile loadtest up -d smtp-sink
+"""
+
+import argparse
+import asyncio
+import email
+import email.policy
+import hashlib
+import sys
+import time
+
+from mock_backend import HttpServer
+
+MAX_MESSAGE = 20 * 1024 * 1024
+
+
+class SmtpSink:
+    """Minimal SMTP server: EHLO/HELO, MAIL, RCPT, DATA, RSET, NOOP, QUIT (AUTH is accepted)"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.since = time.time()
+        self.messages = 0
+        self.by_peer = {}
+        self.seen = {}
+
+    def record(self, peer, recipients, data):
+        msg = email.message_from_bytes(data, policy=email.policy.default)
+        body = msg.get_body(('html', 'plain'))
+        content = body.get_content() if body is not None else ''
+        for rcpt in recipients or ['']:
+            key = hashlib.sha1(f"{rcpt}\0{msg['subject']}\0{content}".encode()).digest()
+            self.seen[key] = self.seen.get(key, 0) + 1
+            self.messages += 1
+            self.by_peer[peer] = self.by_peer.get(peer, 0) + 1
+
+    def stats(self):
+        return {
+            'since': self.since,
+            'messages': self.messages,
+            'unique': len(self.seen),
+            'duplicates': self.messages - len(self.seen),
+            'max_copies': max(self.seen.values(), default=0),
+            'by_peer': self.by_peer,
+        }
+
+    async def handle(self, reader, writer):
+        peer = (writer.get_extra_info('peername') or ('unknown',))[0]
+
+        async def reply(line):
+            writer.write(f'{line}\r\n'.encode())
+            await writer.drain()
+
+        await reply('220 smtp-sink ESMTP')
+        recipients = []
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                command = line.decode('latin-1').strip()
+                verb = command[:4].upper()
+                if verb == 'EHLO':
+                    await reply('250-smtp-sink\r\n250-8BITMIME\r\n250-SMTPUTF8\r\n250-AUTH PLAIN LOGIN\r\n'
+                                f'250 SIZE {MAX_MESSAGE}')
+                elif verb == 'HELO':
+                    await reply('250 smtp-sink')
+                elif verb == 'MAIL':
+                    recipients = []
+                    await reply('250 OK')
+                elif verb == 'RCPT':
+                    recipients.append(command.partition(':')[2].strip().strip('<>').split('>')[0])
+                    await reply('250 OK')
+                elif verb == 'DATA':
+                    await reply('354 End data with <CR><LF>.<CR><LF>')
+                    lines = []
+                    while True:
+                        data = await reader.readline()
+                        if not data or data in (b'.\r\n', b'.\n'):
+                            break
+                        lines.append(data[1:] if data.startswith(b'..') else data)
+                    self.record(peer, recipients, b''.join(lines))
+                    recipients = []
+                    await reply('250 OK queued')
+                elif verb == 'AUTH':
+                    await reply('235 Authentication successful')
+                elif verb in ('RSET', 'NOOP'):
+                    recipients = [] if verb == 'RSET' else recipients
+                    await reply('250 OK')
+                elif verb == 'QUIT':
+                    await reply('221 Bye')
+                    break
+                else:
+                    await reply('502 Command not implemented')
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+class StatsServer(HttpServer):
+    """HTTP side: GET /stats, POST /reset"""
+
+    def __init__(self, sink):
+        super().__init__()
+        self.sink = sink
+        self.add_route('GET', '/stats', self.stats)
+        self.add_route('POST', '/reset', self.reset)
+
+    async def stats(self, req):
+        return 200, self.sink.stats(), {}
+
+    async def reset(self, req):
+        self.sink.reset()
+        return 200, self.sink.stats(), {}
+
+
+async def serve(host, port, http_port):
+    sink = SmtpSink()
+    smtp = await asyncio.start_server(sink.handle, host, port, backlog=1024)
+    async with smtp:
+        await asyncio.gather(smtp.serve_forever(), StatsServer(sink).serve(host, http_port))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SMTP sink counting (and discarding) outgoing email')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=2525, help='SMTP port')
+    parser.add_argument('--http-port', type=int, default=8025, help='Port for GET /stats and POST /reset')
+    args = parser.parse_args()
+
+    print(f"📮 SMTP sink on {args.host}:{args.port}, stats on http://{args.host}:{args.http_port}/stats")
+    asyncio.run(serve(args.host, args.port, args.http_port))
+    return 0
+
+
+if __name__ == '__main__':
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        print("\n\nSMTP sink stopped")
+        sys.exit(130)
@@ -0,0 +1,204 @@
+"""
+Soak Test Leak & Drift Detector
+Samples heap/RSS and server-side p95 (from the http_request_duration_ms buckets
+of each interval) from every replica, plus client throughput and p95, during a soak
+run, fits linear trends after a warm-up period and gives a pass/fail verdict for
+overnight endurance runs.
+
+Enabled automatically for SoakTestUser, or for any scenario with LOCUST_SOAK_ANALYSIS=1.
+Runs on the master (or a local runner); a failed verdict sets the exit code to 1.
+
+Thresholds (environment):
+  LOCUST_SOAK_SAMPLE_INTERVAL   seconds between samples            (default 30)
+  LOCUST_SOAK_WARMUP            seconds excluded from the fit      (default 120)
+  LOCUST_SOAK_MAX_HEAP_SLOPE_MB heap growth per replica, MB/min    (default 1.0)
+  LOCUST_SOAK_MAX_RSS_SLOPE_MB  RSS growth per replica, MB/min     (default 2.0)
+  LOCUST_SOAK_MAX_RPS_DECAY_PCT throughput decay, % of mean / hour (default 10)
+  LOCUST_SOAK_MAX_P95_DRIFT_MS  p95 drift per replica and client, ms/min (default 1.0)
+  LOCUST_SOAK_REPORT            JSON report path                   (default soak-report-<time>.json)
+
+Usage:
+locust -f scenarios.py SoakTestUser --headless -u 50 -r 5 -t 8h
+"""
+
+import json
+import os
+import time
+from datetime import datetime
+
+from locust import events
+from locust.runners import WorkerRunner
+
+from latency_breakdown import histogram_buckets, histogram_quantile
+from prom_metrics import ReplicaSampler, metric_value
+
+MB = 1024 * 1024
+MIN_SAMPLES = 5
+
+SAMPLE_INTERVAL = float(os.getenv('LOCUST_SOAK_SAMPLE_INTERVAL', 30))
+WARMUP = float(os.getenv('LOCUST_SOAK_WARMUP', 120))
+MAX_HEAP_SLOPE_MB = float(os.getenv('LOCUST_SOAK_MAX_HEAP_SLOPE_MB', 1.0))
+MAX_RSS_SLOPE_MB = float(os.getenv('LOCUST_SOAK_MAX_RSS_SLOPE_MB', 2.0))
+MAX_RPS_DECAY_PCT = float(os.getenv('LOCUST_SOAK_MAX_RPS_DECAY_PCT', 10))
+MAX_P95_DRIFT_MS = float(os.getenv('LOCUST_SOAK_MAX_P95_DRIFT_MS', 1.0))
+REPORT_PATH = os.getenv('LOCUST_SOAK_REPORT')
+
+_state = {'sampler': None, 'started': None, 'client': [], 'replicas': {}, 'buckets': {}}
+
+
+def linear_slope(points):
+    """Least-squares slope of [(x, y), ...] (units of y per unit of x)"""
+    n = len(points)
+    if n < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    var_x = sum((x - mean_x) ** 2 for x, _ in points)
+    if var_x == 0:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / var_x
+
+
+def soak_enabled(environment):
+    if os.getenv('LOCUST_SOAK_ANALYSIS', '').lower() in ('1', 'true', 'yes'):
+        return True
+    return any(cls.__name__ == 'SoakTestUser' for cls in environment.user_classes)
+
+
+def interval_p95(target, samples):
+    """Server-side p95 of the requests a replica served since its previous sample"""
+    buckets = {}
+    for bounds in histogram_buckets({target: samples}).values():
+        for le, count in bounds.items():
+            buckets[le] = buckets.get(le, 0) + count
+    prev = _state['buckets'].get(target)
+    _state['buckets'][target] = buckets
+    # First sample, or counters reset by a restart: no interval to measure
+    if not prev or any(count < prev.get(le, 0) for le, count in buckets.items()):
+        return None
+    return histogram_quantile(0.95, {le: count - prev.get(le, 0) for le, count in buckets.items()})
+
+
+def _record(environment):
+    def on_sample(ts, scrapes):
+        minutes = (ts - _state['started']) / 60
+        total = environment.stats.total
+        _state['client'].append({
+            'minute': minutes,
+            'rps': total.current_rps,
+            'p95_ms': total.get_current_response_time_percentile(0.95) or 0,
+        })
+        for target, samples in scrapes.items():
+            series = _state['replicas'].setdefault(target, [])
+            if samples is None:
+                series.append({'minute': minutes, 'up': False})
+                continue
+            series.append({
+                'minute': minutes,
+                'up': True,
+                'rss': metric_value(samples, 'process_resident_memory_bytes'),
+                'heap': metric_value(samples, 'nodejs_heap_size_used_bytes'),
+                'start_time': metric_value(samples, 'process_start_time_seconds'),
+                'p95_ms': interval_p95(target, samples),
+            })
+    return on_sample
+
+
+def analyze(client, replicas, warmup_min):
+    """Fit trends and return (verdict, checks)"""
+    checks = []
+
+    def check(name, value, limit, unit, failed):
+        checks.append({
+            'check': name,
+            'value': round(value, 4) if value is not None else None,
+            'limit': limit,
+            'unit': unit,
+            'status': 'INCONCLUSIVE' if value is None else ('FAIL' if failed else 'PASS'),
+        })
+
+    for target, series in replicas.items():
+        up = [s for s in series if s['up']]
+        starts = {s['start_time'] for s in up if s['start_time'] is not None}
+        if len(starts) > 1:
+            checks.append({'check': f'{target} restarts', 'value': len(starts) - 1, 'limit': 0,
+                           'unit': 'restarts', 'status': 'FAIL'})
+        if len(up) < len(series):
+            checks.append({'check': f'{target} scrape failures', 'value': len(series) - len(up),
+                           'limit': None, 'unit': 'samples', 'status': 'WARN'})
+
+        fitted = [s for s in up if s['minute'] >= warmup_min]
+        for key, limit, label in (('heap', MAX_HEAP_SLOPE_MB, 'heap'), ('rss', MAX_RSS_SLOPE_MB, 'RSS')):
+            points = [(s['minute'], s[key] / MB) for s in fitted if s[key] is not None]
+            slope = linear_slope(points) if len(points) >= MIN_SAMPLES else None
+            check(f'{target} {label} growth', slope, limit, 'MB/min', slope is not None and slope > limit)
+
+        p95_points = [(s['minute'], s['p95_ms']) for s in fitted if s.get('p95_ms') is not None]
+        drift = linear_slope(p95_points) if len(p95_points) >= MIN_SAMPLES else None
+        check(f'{target} p95 drift', drift, MAX_P95_DRIFT_MS, 'ms/min',
+              drift is not None and drift > MAX_P95_DRIFT_MS)
+
+    fitted = [c for c in client if c['minute'] >= warmup_min]
+    rps_points = [(c['minute'], c['rps']) for c in fitted]
+    mean_rps = sum(y for _, y in rps_points) / len(rps_points) if rps_points else 0
+    rps_slope = linear_slope(rps_points) if len(rps_points) >= MIN_SAMPLES and mean_rps > 0 else None
+    decay = -rps_slope * 60 / mean_rps * 100 if rps_slope is not None else None
+    check('throughput decay', decay, MAX_RPS_DECAY_PCT, '%/hour', decay is not None and decay > MAX_RPS_DECAY_PCT)
+
+    p95_points = [(c['minute'], c['p95_ms']) for c in fitted if c['p95_ms']]
+    drift = linear_slope(p95_points) if len(p95_points) >= MIN_SAMPLES else None
+    check('client p95 drift', drift, MAX_P95_DRIFT_MS, 'ms/min', drift is not None and drift > MAX_P95_DRIFT_MS)
+
+    statuses = {c['status'] for c in checks}
+    if 'FAIL' in statuses:
+        verdict = 'FAIL'
+    elif statuses <= {'INCONCLUSIVE', 'WARN'}:
+        verdict = 'INCONCLUSIVE'
+    else:
+        verdict = 'PASS'
+    return verdict, checks
+
+
+@events.test_start.add_listener
+def on_test_start(environment, **kwargs):
+    if isinstance(environment.runner, WorkerRunner) or not soak_enabled(environment):
+        return
+    _state.update(started=time.time(), client=[], replicas={}, buckets={})
+    sampler = ReplicaSampler(_record(environment), interval=SAMPLE_INTERVAL)
+    _state['sampler'] = sampler
+    sampler.start()
+    print(f"🔬 Soak analysis enabled: sampling {len(sampler.targets)} replicas every {SAMPLE_INTERVAL:.0f}s")
+
+
+@events.test_stop.add_listener
+def on_test_stop(environment, **kwargs):
+    sampler = _state['sampler']
+    if sampler is None:
+        return
+    sampler.stop()
+    sampler.sample_now()
+    _state['sampler'] = None
+
+    verdict, checks = analyze(_state['client'], _state['replicas'], WARMUP / 60)
+
+    print(f"\n🔬 Soak Analysis ({len(_state['client'])} samples, first {WARMUP:.0f}s excluded):")
+    icons = {'PASS': '✅', 'FAIL': '❌', 'WARN': 'ℹ️ ', 'INCONCLUSIVE': 'ℹ️ '}
+    for c in checks:
+        value = 'n/a' if c['value'] is None else c['value']
+        limit = '' if c['limit'] is None else f" (limit {c['limit']})"
+        print(f"  {icons[c['status']]} {c['check']}: {value} {c['unit']}{limit}")
+    print(f"  Verdict: {verdict}")
+
+    path = REPORT_PATH or f"soak-report-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    with open(path, 'w') as f:
+        json.dump({
+            'verdict': verdict,
+            'checks': checks,
+            'warmup_seconds': WARMUP,
+            'client': _state['client'],
+            'replicas': _state['replicas'],
+        }, f, indent=2)
+    print(f"  Report: {path}")
+
+    if verdict == 'FAIL':
+        environment.process_exit_code = 1
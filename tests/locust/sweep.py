@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Workload-Mix Sweep Runner
+Runs a grid of short headless MixUser runs (scenarios.py), one locust process per
+point with its own LOCUST_MIX_* parameters and run tag, and reports the
+throughput / p95 surface across read ratio, search share and borrow share.
+
+Parallel points share the system under test; use --parallel 1 for isolated
+measurements and higher values only to explore the space quickly.
+
+Before the grid, a short smoke run of MixUser against mock_backend.py (every task
+weighted) must complete without task exceptions and must reach the detail and
+borrow requests; otherwise the sweep stops, since its surface would describe a mix
+that never ran. --no-smoke skips it.
+
+Usage:
+python sweep.py --read-ratios 0.5,0.8,0.95 --search-shares 0,0.2,0.5 --borrow-shares 0.5
+python sweep.py --users 100 --run-time 2m --parallel 2 --host http://localhost:3000
+"""
+
+import argparse
+import csv
+import itertools
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import workload_mix
+from common import print_header, start_stand_in
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_HOST = os.getenv('LOCUST_HOST', 'http://localhost:3000')
+SMOKE_MIX = (0.5, 0.5, 0.5)  # Every MixUser task gets a non-zero weight
+SMOKE_REQUIRED = ('[Mix] View Book Details', '[Mix] Create Borrow', '[Mix] Create Book', '[Mix] Search Books')
+
+
+def parse_floats(text):
+    return [float(v) for v in text.split(',') if v.strip()]
+
+
+def run_headless(user_class, csv_prefix, users, spawn_rate, run_time, host, env=None,
+                 locustfile='scenarios.py', extra_args=()):
+    """Run one headless locust process writing <csv_prefix>_stats.csv; returns exit code"""
+    cmd = [
+        sys.executable, '-m', 'locust', '-f', os.path.join(HERE, locustfile), user_class,
+        '--headless', '-u', str(users), '-r', str(spawn_rate), '-t', run_time,
+        '--host', host, '--csv', csv_prefix, '--only-summary', '--loglevel', 'WARNING',
+        *extra_args,
+    ]
+    with open(f'{csv_prefix}.log', 'w') as log:
+        proc = subprocess.run(cmd, cwd=HERE, env={**os.environ, **(env or {})},
+                              stdout=log, stderr=subprocess.STDOUT)
+    return proc.returncode
+
+
+def read_aggregate(csv_prefix):
+    """Aggregated row of a locust --csv stats file as numbers, or None if missing"""
+    path = f'{csv_prefix}_stats.csv'
+    if not os.path.exists(path):
+        return None
+    with open(path, newline='') as f:
+        for row in csv.DictReader(f):
+            if row.get('Name') == 'Aggregated':
+                requests = int(row['Request Count'])
+                failures = int(row['Failure Count'])
+                return {
+                    'requests': requests,
+                    'failures': failures,
+                    'failure_rate': failures / requests if requests else 0.0,
+                    'rps': float(row['Requests/s']),
+                    'avg_ms': float(row['Average Response Time']),
+                    'p50_ms': float(row['50%']),
+                    'p95_ms': float(row['95%']),
+                    'p99_ms': float(row['99%']),
+                }
+    return None
+
+
+def read_exceptions(csv_prefix):
+    """[(count, message)] from a locust --csv exceptions file (tasks that raised)"""
+    path = f'{csv_prefix}_exceptions.csv'
+    if not os.path.exists(path):
+        return []
+    with open(path, newline='') as f:
+        return [(int(row['Count']), row['Message']) for row in csv.DictReader(f)]
+
+
+def request_names(csv_prefix):
+    path = f'{csv_prefix}_stats.csv'
+    if not os.path.exists(path):
+        return set()
+    with open(path, newline='') as f:
+        return {row['Name'] for row in csv.DictReader(f) if int(row['Request Count'] or 0)}
+
+
+def smoke_test(out_dir):
+    """Short MixUser run against mock_backend.py; returns a list of problems"""
+    read_ratio, search_share, borrow_share = SMOKE_MIX
+    env = {
+        'LOCUST_MIX_READ_RATIO': str(read_ratio),
+        'LOCUST_MIX_SEARCH_SHARE': str(search_share),
+        'LOCUST_MIX_BORROW_SHARE': str(borrow_share),
+        'LOCUST_RUN_TAG': f'smoke-{os.path.basename(out_dir)}',
+    }
+    prefix = os.path.join(out_dir, 'smoke')
+    proc, host = start_stand_in('--books', '20')
+    try:
+        run_headless('MixUser', prefix, 5, 5, '15s', host, env)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=5)
+
+    problems = [f"raised {count}x: {message}" for count, message in read_exceptions(prefix)]
+    names = request_names(prefix)
+    if not names:
+        problems.append(f"no stats written (see {prefix}.log)")
+    else:
+        problems += [f"never sent '{name}'" for name in SMOKE_REQUIRED if name not in names]
+    return problems
+
+
+def run_point(point, args, out_dir):
+    read_ratio, search_share, borrow_share = point
+    tag = f'r{read_ratio:g}-s{search_share:g}-b{borrow_share:g}'
+    env = {
+        'LOCUST_MIX_READ_RATIO': str(read_ratio),
+        'LOCUST_MIX_SEARCH_SHARE': str(search_share),
+        'LOCUST_MIX_BORROW_SHARE': str(borrow_share),
+        'LOCUST_RUN_TAG': f'sweep-{os.path.basename(out_dir)}-{tag}',
+    }
+    prefix = os.path.join(out_dir, tag)
+    code = run_headless('MixUser', prefix, args.users, args.spawn_rate, args.run_time, args.host, env)
+    stats = read_aggregate(prefix)
+    exceptions = sum(count for count, _ in read_exceptions(prefix))
+    print(f"{'✅' if stats and not exceptions else '❌'} {tag} (exit {code}"
+          f"{f', {exceptions} task exceptions' if exceptions else ''})")
+    return {
+        'tag': tag,
+        'read_ratio': read_ratio,
+        'search_share': search_share,
+        'borrow_share': borrow_share,
+        'exit_code': code,
+        'exceptions': exceptions,
+        **(stats or {}),
+    }
+
+
+def print_surface(results, read_ratios, search_shares, borrow_shares):
+    """One rps/p95 grid per borrow share: rows = read ratio, columns = search share"""
+    by_point = {(r['read_ratio'], r['search_share'], r['borrow_share']): r for r in results}
+    for b in borrow_shares:
+        print_header(f"Throughput / p95 surface (borrow share {b:g})")
+        corner = 'read \\ search'
+        print(f"{corner:<14}" + ''.join(f"{s:>18g}" for s in search_shares))
+        for r in read_ratios:
+            cells = []
+            for s in search_shares:
+                res = by_point.get((r, s, b), {})
+                if res.get('exceptions'):
+                    cells.append('raised')
+                elif 'rps' in res:
+                    cells.append(f"{res['rps']:>8.1f}/{res['p95_ms']:>6.0f}ms")
+                else:
+                    cells.append('failed')
+            print(f"{r:<14g}" + ''.join(f"{c:>18}" for c in cells))
+    print("\nCells: requests/s / p95")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sweep MixUser across read/search/borrow parameters')
+    parser.add_argument('--read-ratios', type=parse_floats, default=[0.5, 0.8, 0.95])
+    parser.add_argument('--search-shares', type=parse_floats, default=[0.0, 0.2])
+    parser.add_argument('--borrow-shares', type=parse_floats, default=[0.5])
+    parser.add_argument('-u', '--users', type=int, default=50)
+    parser.add_argument('-r', '--spawn-rate', type=float, default=10)
+    parser.add_argument('-t', '--run-time', default='1m')
+    parser.add_argument('--parallel', type=int, default=1, help='Concurrent locust processes')
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--out', default=None, help='Output directory (default: sweep-results/<timestamp>)')
+    parser.add_argument('--no-smoke', action='store_true', help='Skip the MixUser smoke run against mock_backend.py')
+    args = parser.parse_args()
+
+    points = list(itertools.product(args.read_ratios, args.search_shares, args.borrow_shares))
+    try:
+        for point in points:
+            workload_mix.mix_weights(*point)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 2
+
+    out_dir = args.out or os.path.join(HERE, 'sweep-results', datetime.now().strftime('%Y%m%d-%H%M%S'))
+    os.makedirs(out_dir, exist_ok=True)
+
+    if not args.no_smoke:
+        problems = smoke_test(out_dir)
+        if problems:
+            print("❌ MixUser smoke run against mock_backend.py failed:")
+            for problem in problems:
+                print(f"   {problem}")
+            return 1
+        print("✅ MixUser smoke run against mock_backend.py passed")
+
+    print_header(f"Workload Mix Sweep: {len(points)} points, {args.parallel} in parallel")
+    with ThreadPoolExecutor(max_workers=max(1, args.parallel)) as pool:
+        results = list(pool.map(lambda p: run_point(p, args, out_dir), points))
+
+    fields = ['tag', 'read_ratio', 'search_share', 'borrow_share', 'exit_code', 'exceptions', 'requests', 'failures',
+              'failure_rate', 'rps', 'avg_ms', 'p50_ms', 'p95_ms', 'p99_ms']
+    surface_path = os.path.join(out_dir, 'surface.csv')
+    with open(surface_path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fields, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(results)
+
+    print_surface(results, args.read_ratios, args.search_shares, args.borrow_shares)
+    print(f"\n✅ Surface written to {surface_path}")
+    return 0 if all('rps' in r and not r['exceptions'] for r in results) else 1
+
+
+if __name__ == '__main__':
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        print("\n\nSweep interrupted by user")
+        sys.exit(130)
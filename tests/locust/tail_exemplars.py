@@ -0,0 +1,178 @@
+"""
+Tail-Latency Exemplars
+Keeps the N slowest requests of every request name per interval in a bounded
+min-heap: O(1) for a request faster than the current minimum, O(log N) otherwise.
+Each exemplar carries the timestamp, user, URL, status, response size, serving
+replica, request ID and timing headers, so a p99 spike can be traced to the
+backend log lines of the same request (backend/index.js logs the X-Request-Id
+that nginx sets).
+
+Workers ship their heaps with every stats report and the master merges them;
+the merged exemplars are written at test stop.
+
+Enable with LOCUST_EXEMPLARS=<N per name per interval>; LOCUST_EXEMPLAR_INTERVAL
+is the interval in seconds (default 60) and LOCUST_EXEMPLARS_REPORT the JSON
+path (default exemplars-<time>.json).
+
+Usage:
+LOCUST_EXEMPLARS=10 locust -f locustfile.py --headless -u 50 -r 10 -t 10m
+docker compose logs backend | grep <request_id>
+"""
+
+import heapq
+import itertools
+import json
+import os
+import time
+from datetime import datetime
+
+from locust import events
+from locust.runners import WorkerRunner
+
+KEEP = int(os.getenv('LOCUST_EXEMPLARS', 0))
+INTERVAL = float(os.getenv('LOCUST_EXEMPLAR_INTERVAL', 60))
+REPORT_PATH = os.getenv('LOCUST_EXEMPLARS_REPORT')
+
+# (interval start, request_type, name) -> min-heap of (response_time, seq, exemplar)
+_heaps = {}
+_seq = itertools.count()
+
+
+class ExemplarUser:
+    """Mixin naming the user in every request event's context (reported in exemplars)"""
+
+    def context(self):
+        return {'user': f'{type(self).__name__}-{id(self):x}'}
+
+
+def parse_server_timing(value):
+    """'app;dur=12.5, db;dur=3' -> {'app': 12.5, 'db': 3.0}"""
+    timings = {}
+    for metric in value.split(','):
+        name, *params = [p.strip() for p in metric.split(';')]
+        for param in params:
+            key, _, raw = param.partition('=')
+            if key == 'dur' and name:
+                try:
+                    timings[name] = float(raw.strip('"'))
+                except ValueError:
+                    pass
+    return timings
+
+
+def response_timing(headers):
+    """Server-Timing entries plus nginx's time to upstream headers, in ms"""
+    timing = parse_server_timing(headers.get('Server-Timing') or '')
+    # "0.012" or "0.010, 0.005" when nginx retried another replica: the last one answered
+    upstream = (headers.get('X-Upstream-Header-Time') or '').split(',')[-1].strip()
+    try:
+        timing['upstream_header'] = round(float(upstream) * 1000, 1)
+    except ValueError:
+        pass
+    return timing
+
+
+def push(heap, item):
+    """Keep the KEEP slowest items in heap"""
+    if len(heap) < KEEP:
+        heapq.heappush(heap, item)
+    elif item[0] > heap[0][0]:
+        heapq.heapreplace(heap, item)
+
+
+def exemplar(request_type, response_time, response_length, response, context, exception, ts, url):
+    headers = getattr(response, 'headers', None) or {}
+    entry = {
+        'ts': round(ts, 3),
+        'time': datetime.fromtimestamp(ts).isoformat(timespec='milliseconds'),
+        'user': (context or {}).get('user'),
+        'method': request_type,
+        'url': url,
+        'status': getattr(response, 'status_code', 0) or 0,
+        'response_time_ms': round(response_time, 1),
+        'size': response_length,
+        'replica': headers.get('X-Served-By'),
+        'upstream': headers.get('X-Upstream-Addr'),
+        'request_id': headers.get('X-Request-Id'),
+        'timing': response_timing(headers),
+    }
+    if exception:
+        entry['error'] = str(exception)[:200]
+    return entry
+
+
+@events.request.add_listener
+def on_request(request_type, name, response_time, response_length, response=None, context=None,
+               exception=None, start_time=None, url=None, **kwargs):
+    if not KEEP or response_time is None:
+        return
+    ts = start_time or time.time() - response_time / 1000
+    key = (int(ts // INTERVAL * INTERVAL), request_type, name)
+    heap = _heaps.get(key)
+    if heap is None:
+        heap = _heaps[key] = []
+    elif len(heap) >= KEEP and response_time <= heap[0][0]:
+        return
+    push(heap, (response_time, next(_seq), exemplar(
+        request_type, response_time, response_length, response, context, exception, ts, url)))
+
+
+@events.report_to_master.add_listener
+def on_report_to_master(client_id, data):
+    if KEEP and _heaps:
+        data['tail_exemplars'] = [[start, t, n, [e for _, _, e in heap]] for (start, t, n), heap in _heaps.items()]
+        _heaps.clear()
+
+
+@events.worker_report.add_listener
+def on_worker_report(client_id, data):
+    for start, request_type, name, entries in data.get('tail_exemplars', []):
+        heap = _heaps.setdefault((start, request_type, name), [])
+        for entry in entries:
+            entry.setdefault('worker', client_id)
+            push(heap, (entry['response_time_ms'], next(_seq), entry))
+
+
+@events.test_start.add_listener
+def on_test_start(environment, **kwargs):
+    _heaps.clear()
+    if KEEP and not isinstance(environment.runner, WorkerRunner):
+        print(f"🐢 Tail exemplars enabled: {KEEP} slowest per request name every {INTERVAL:.0f}s")
+
+
+@events.test_stop.add_listener
+def on_test_stop(environment, **kwargs):
+    if not KEEP or isinstance(environment.runner, WorkerRunner):
+        return
+
+    intervals = {}
+    slowest = {}
+    for (start, request_type, name), heap in sorted(_heaps.items()):
+        entries = [e for _, _, e in sorted(heap, reverse=True)]
+        bucket = intervals.setdefault(start, {
+            'start': datetime.fromtimestamp(start).isoformat(timespec='seconds'),
+            'requests': {},
+        })
+        bucket['requests'][f'{request_type} {name}'] = entries
+        top = slowest.get((request_type, name))
+        if top is None or entries[0]['response_time_ms'] > top['response_time_ms']:
+            slowest[(request_type, name)] = entries[0]
+
+    print(f"\n🐢 Tail Exemplars ({len(intervals)} intervals of {INTERVAL:.0f}s, up to {KEEP} per name):")
+    ranked = sorted(slowest.items(), key=lambda item: item[1]['response_time_ms'], reverse=True)
+    for (request_type, name), e in ranked[:10]:
+        app = e['timing'].get('app')
+        print(f"  {request_type + ' ' + name:<40.39}{e['response_time_ms']:>8.0f}ms  "
+              f"{e['status']:>3}  {e['replica'] or e['upstream'] or '-':<14.14}"
+              f"{'' if app is None else f'app={app:.0f}ms  '}{e['request_id'] or ''}")
+    if ranked and not any(e['request_id'] for _, e in ranked):
+        print("  ℹ️  No X-Request-Id headers seen; run against the nginx/backend in this repo to correlate logs")
+
+    path = REPORT_PATH or f"exemplars-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    with open(path, 'w') as f:
+        json.dump({
+            'keep': KEEP,
+            'interval_seconds': INTERVAL,
+            'intervals': [intervals[start] for start in sorted(intervals)],
+        }, f, indent=2)
+    print(f"  Report: {path}")
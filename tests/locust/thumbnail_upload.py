@@ -0,0 +1,196 @@
+"""
+Thumbnail Upload Pool & Report
+For ThumbnailUploadUser (scenarios.py): PNG thumbnails of the sizes in
+LOCUST_THUMBNAIL_SIZES are generated once per process and the same buffers are
+reused by every upload, so the load generator does no image encoding per request.
+Pixels are random noise, which does not compress, so each PNG is close to its
+nominal size.
+
+During the run every replica's RSS, V8 heap and external (Buffer) memory is sampled;
+at test stop upload throughput, latency per image size and the per-replica memory
+growth are reported. Upload counts seen by cloudinary_stub.py are included when
+LOCUST_CLOUDINARY_STUB is reachable.
+
+Environment:
+  LOCUST_THUMBNAIL_SIZES           comma-separated sizes, k/m suffixes   (default 32k,256k,1m,4m)
+  LOCUST_THUMBNAIL_VARIANTS        distinct images per size              (default 4)
+  LOCUST_THUMBNAIL_SAMPLE_INTERVAL seconds between replica samples       (default 5)
+  LOCUST_CLOUDINARY_STUB           stub base URL                         (default http://cloudinary-stub:8090)
+  LOCUST_THUMBNAIL_REPORT          JSON report path                      (default thumbnail-upload-<time>.json)
+
+The backend rejects files over 5 MB (shared/middlewares/uploadCloudinary.js).
+"""
+
+import json
+import os
+import random
+import struct
+import time
+import zlib
+from datetime import datetime
+
+import requests
+from locust import events
+from locust.runners import WorkerRunner
+
+from prom_metrics import ReplicaSampler, metric_value
+
+MB = 1024 * 1024
+NAME_PREFIX = '[Upload] Thumbnail '
+SIZES = os.getenv('LOCUST_THUMBNAIL_SIZES', '32k,256k,1m,4m')
+VARIANTS = int(os.getenv('LOCUST_THUMBNAIL_VARIANTS', 4))
+SAMPLE_INTERVAL = float(os.getenv('LOCUST_THUMBNAIL_SAMPLE_INTERVAL', 5))
+STUB_URL = os.getenv('LOCUST_CLOUDINARY_STUB', 'http://cloudinary-stub:8090')
+REPORT_PATH = os.getenv('LOCUST_THUMBNAIL_REPORT')
+
+_pool = {}
+_state = {'sampler': None, 'started': None, 'replicas': {}, 'stub': None}
+
+
+def parse_size(spec):
+    """'32k' | '1m' | '5000' -> bytes"""
+    spec = spec.strip().lower()
+    scale = {'k': 1024, 'm': MB}.get(spec[-1:], 1)
+    try:
+        size = int(float(spec[:-1] if scale > 1 else spec) * scale)
+    except ValueError:
+        size = 0
+    if size <= 0:
+        raise ValueError(f"Invalid thumbnail size '{spec}' (e.g. 64k, 1m)")
+    return size
+
+
+def make_png(target_bytes, seed):
+    """Noise RGB PNG of roughly target_bytes"""
+    side = max(1, int(((target_bytes - 60) / 3) ** 0.5))
+    rng = random.Random(seed)
+    raw = b''.join(b'\x00' + rng.randbytes(side * 3) for _ in range(side))
+
+    def chunk(tag, data):
+        return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data))
+
+    return (b'\x89PNG\r\n\x1a\n'
+            + chunk(b'IHDR', struct.pack('>IIBBBBB', side, side, 8, 2, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(raw, 1))
+            + chunk(b'IEND', b''))
+
+
+def image_pool():
+    """{size label: [png bytes, ...]}, generated on first use"""
+    if not _pool:
+        for label in (s.strip() for s in SIZES.split(',') if s.strip()):
+            size = parse_size(label)
+            _pool[label] = [make_png(size, f'{label}/{v}') for v in range(VARIANTS)]
+    return _pool
+
+
+def enabled(environment):
+    return any(cls.__name__ == 'ThumbnailUploadUser' for cls in environment.user_classes)
+
+
+def stub_stats():
+    try:
+        resp = requests.get(f'{STUB_URL.rstrip("/")}/stats', timeout=5)
+    except requests.exceptions.RequestException:
+        return None
+    return resp.json() if resp.status_code == 200 else None
+
+
+def _record(ts, scrapes):
+    for target, samples in scrapes.items():
+        if samples is None:
+            continue
+        _state['replicas'].setdefault(target, []).append({
+            'second': ts - _state['started'],
+            'rss': metric_value(samples, 'process_resident_memory_bytes'),
+            'heap': metric_value(samples, 'nodejs_heap_size_used_bytes'),
+            'external': metric_value(samples, 'nodejs_external_memory_bytes'),
+        })
+
+
+def memory_summary(series):
+    summary = {}
+    for key in ('rss', 'heap', 'external'):
+        values = [s[key] for s in series if s[key] is not None]
+        if values:
+            summary[key] = {
+                'start_mb': round(values[0] / MB, 1),
+                'peak_mb': round(max(values) / MB, 1),
+                'end_mb': round(values[-1] / MB, 1),
+            }
+    return summary
+
+
+@events.test_start.add_listener
+def on_test_start(environment, **kwargs):
+    if not enabled(environment):
+        return
+    pool = image_pool()
+    if isinstance(environment.runner, WorkerRunner):
+        return
+    _state.update(started=time.time(), replicas={}, stub=stub_stats())
+    sampler = ReplicaSampler(_record, interval=SAMPLE_INTERVAL)
+    _state['sampler'] = sampler
+    sampler.start()
+    held = sum(len(b) for buffers in pool.values() for b in buffers)
+    print(f"🖼️  Thumbnail pool: {', '.join(f'{label} x{len(b)}' for label, b in pool.items())} "
+          f"({held / MB:.1f} MB per process)")
+
+
+@events.test_stop.add_listener
+def on_test_stop(environment, **kwargs):
+    sampler = _state['sampler']
+    if sampler is None:
+        return
+    sampler.stop()
+    sampler.sample_now()
+    _state['sampler'] = None
+    elapsed = time.time() - _state['started']
+
+    by_size = []
+    uploaded = 0
+    for label, buffers in image_pool().items():
+        entry = environment.stats.entries.get((NAME_PREFIX + label, 'POST'))
+        if not entry or not entry.num_requests:
+            continue
+        ok = entry.num_requests - entry.num_failures
+        uploaded += ok * sum(len(b) for b in buffers) / len(buffers)
+        by_size.append({
+            'size': label,
+            'bytes': len(buffers[0]),
+            'uploads': entry.num_requests,
+            'failures': entry.num_failures,
+            'uploads_per_s': ok / elapsed if elapsed else 0,
+            **{f'p{q * 100:g}_ms': entry.get_response_time_percentile(q) for q in (0.5, 0.95, 0.99)},
+        })
+
+    stub = None
+    before, after = _state['stub'], stub_stats()
+    if before and after:
+        stub = {k: after[k] - before[k] for k in ('uploads', 'bytes', 'errors')}
+
+    report = {
+        'elapsed_s': elapsed,
+        'uploads': sum(r['uploads'] - r['failures'] for r in by_size),
+        'upload_mb_per_s': uploaded / MB / elapsed if elapsed else 0,
+        'by_size': by_size,
+        'replicas': {target: memory_summary(series) for target, series in _state['replicas'].items()},
+        'stub': stub,
+        'samples': _state['replicas'],
+    }
+
+    print(f"\n🖼️  Thumbnail Uploads ({report['uploads']} ok, {report['upload_mb_per_s']:.2f} MB/s):")
+    print(f"  {'Size':<8}{'bytes':>10}{'uploads':>9}{'fail':>6}{'up/s':>8}{'p50':>7}{'p95':>7}{'p99':>7}")
+    for r in by_size:
+        print(f"  {r['size']:<8}{r['bytes']:>10}{r['uploads']:>9}{r['failures']:>6}{r['uploads_per_s']:>8.2f}"
+              f"{r['p50_ms']:>7.0f}{r['p95_ms']:>7.0f}{r['p99_ms']:>7.0f}")
+    for target, summary in report['replicas'].items():
+        print(f"  {target}: " + ', '.join(
+            f"{key} {m['start_mb']} -> peak {m['peak_mb']} MB" for key, m in summary.items()))
+    if stub:
+        print(f"  Cloudinary stub: {stub['uploads']} uploads, {stub['bytes'] / MB:.1f} MB, {stub['errors']} errors")
+
+    path = REPORT_PATH or f"thumbnail-upload-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"  Report: {path}")
@@ -9,15 +9,11 @@ import time
 import sys
 from datetime import datetime
 
+from common import print_header
+
 METRICS_URL = 'http://localhost:3000/metrics'
 TIMEOUT = 5
 
-def print_header(text):
-    """Print formatted header"""
-    print(f"\n{'='*60}")
-    print(f"  {text}")
-    print(f"{'='*60}\n")
-
 def print_success(text):
     """Print success message"""
     print(f"✅ {text}")
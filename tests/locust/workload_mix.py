@@ -0,0 +1,55 @@
+"""
+Parametric Workload Mix
+Derives task weights for MixUser (scenarios.py) from three parameters instead of
+hard-coded ratios:
+
+- read_ratio:   fraction of tasks that are reads
+- search_share: fraction of reads that are searches
+- borrow_share: fraction of writes that are borrow requests (the rest create books)
+
+Parameters come from LOCUST_MIX_READ_RATIO, LOCUST_MIX_SEARCH_SHARE and
+LOCUST_MIX_BORROW_SHARE so each sweep point can run in its own locust process.
+"""
+
+import os
+
+# Non-search reads split between listing, detail views and notifications
+BROWSE_SPLIT = {
+    'browse_books': 0.6,
+    'view_book_details': 0.3,
+    'view_notifications': 0.1,
+}
+
+DEFAULT_MIX = {
+    'read_ratio': 0.95,
+    'search_share': 0.1,
+    'borrow_share': 0.5,
+}
+
+
+def mix_weights(read_ratio, search_share, borrow_share, scale=1000):
+    """Integer task weights (summing to ~scale) for the given mix parameters"""
+    for name, value in (('read_ratio', read_ratio), ('search_share', search_share),
+                        ('borrow_share', borrow_share)):
+        if not 0.0 <= value <= 1.0:
+            raise ValueError(f"{name} must be between 0 and 1, got {value}")
+
+    reads = read_ratio * scale
+    writes = (1.0 - read_ratio) * scale
+    weights = {
+        'search_books': reads * search_share,
+        'create_borrow': writes * borrow_share,
+        'create_book': writes * (1.0 - borrow_share),
+    }
+    for name, share in BROWSE_SPLIT.items():
+        weights[name] = reads * (1.0 - search_share) * share
+
+    return {name: int(round(w)) for name, w in weights.items()}
+
+
+def mix_from_env():
+    """Mix parameters from LOCUST_MIX_* environment variables"""
+    return {
+        name: float(os.getenv(f'LOCUST_MIX_{name.upper()}', default))
+        for name, default in DEFAULT_MIX.items()
+    }